@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+# (path into the results, True when larger is better)
+METRICS: list[tuple[str, bool]] = [
+    ("layers.transport_round_trip.p50_us", False),
+    ("layers.transport_round_trip.p99_us", False),
+    ("layers.scpi_query.p50_us", False),
+    ("layers.scpi_query.p99_us", False),
+    ("layers.parse_primary_value.p50_us", False),
+    ("layers.reading_construct.p50_us", False),
+    ("layers.csv_write_row.p50_us", False),
+    ("logger.csv_rows_per_second", True),
+    ("logger.npylog_rows_per_second", True),
+    ("logger.background_enqueue_per_second", True),
+    ("logger.background_rows_per_second", True),
+    ("history.store_bytes_per_reading", False),
+    ("history.store_appends_per_second", True),
+    ("history.trend_bytes_per_reading", False),
+    ("history.trend_appends_per_second", True),
+    ("startup.first_frame_ms", False),
+    ("startup.import_ms", False),
+]
+# Steady-state growth hovers around zero, so a relative change means nothing; compare it in absolute bytes.
+MEMORY_GROWTH_PATH = "memory.steady_growth_bytes_per_reading"
+MEMORY_GROWTH_TOLERANCE_BYTES = 1.0
+
+
+def _lookup(results: dict, path: str) -> float | None:
+    node = results
+    for key in path.split("."):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return float(node) if isinstance(node, (int, float)) else None
+
+
+def _poll_rate_metrics(results: dict) -> dict[str, float]:
+    metrics = {}
+    for entry in results.get("poll_rate", []):
+        mode = "batched" if entry["batched"] else "serial"
+        metrics[f"poll_rate.rows{entry['rows']}.{mode}.readings_per_second"] = entry["readings_per_second"]
+    return metrics
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[tuple[str, float, float, float, bool]]:
+    rows = []
+    for path, higher_is_better in METRICS:
+        before = _lookup(baseline, path)
+        after = _lookup(candidate, path)
+        if before is None or after is None:
+            continue
+        rows.append(_row(path, before, after, higher_is_better, threshold))
+    before = _lookup(baseline, MEMORY_GROWTH_PATH)
+    after = _lookup(candidate, MEMORY_GROWTH_PATH)
+    if before is not None and after is not None:
+        regressed = after > max(before, 0.0) + MEMORY_GROWTH_TOLERANCE_BYTES
+        rows.append((MEMORY_GROWTH_PATH, before, after, after - before, regressed))
+    before_rates = _poll_rate_metrics(baseline)
+    after_rates = _poll_rate_metrics(candidate)
+    for path in sorted(before_rates.keys() & after_rates.keys()):
+        rows.append(_row(path, before_rates[path], after_rates[path], True, threshold))
+    return rows
+
+
+def _row(path: str, before: float, after: float, higher_is_better: bool, threshold: float):
+    change = (after - before) / before if before else 0.0
+    regressed = (change < -threshold) if higher_is_better else (change > threshold)
+    return path, before, after, change, regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    candidate = json.loads(Path(args.candidate).read_text(encoding="utf-8"))
+    rows = compare(baseline, candidate, args.threshold)
+    print(
+        f"baseline {baseline['environment'].get('git_commit')} -> "
+        f"candidate {candidate['environment'].get('git_commit')}"
+    )
+    for path, before, after, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        delta = f"{change:+8.2f}" if path == MEMORY_GROWTH_PATH else f"{change:+8.1%}"
+        print(f"{path:60} {before:14.2f} {after:14.2f} {delta} {flag}".rstrip())
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
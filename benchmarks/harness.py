@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from dmm_app.metrics import Histogram
+from dmm_app.models import InstrumentType
+from dmm_app.simulator import SimulatedInstrument, SimulatedTransport, SimulatorSettings
+
+
+class LatencyHistogram(Histogram):
+    # Finer buckets than the live metrics (four per octave, ~19% relative error) from 1 us to ~17 s.
+    def __init__(self):
+        super().__init__("latency_seconds", "Benchmark latency.", lowest=1e-6, octaves=24, buckets_per_octave=4)
+
+    def summary(self) -> dict:
+        snapshot = self.snapshot()
+        return {
+            "count": snapshot.count,
+            "mean_us": snapshot.mean * 1e6,
+            "p50_us": snapshot.percentile(0.50) * 1e6,
+            "p90_us": snapshot.percentile(0.90) * 1e6,
+            "p99_us": snapshot.percentile(0.99) * 1e6,
+            "max_us": snapshot.maximum * 1e6,
+            "buckets": [
+                {"le_us": None if math.isinf(bound) else round(bound * 1e6, 3), "count": count}
+                for bound, count in zip(snapshot.bounds, snapshot.counts)
+                if count
+            ],
+        }
+
+
+def simulated_transport(
+    instrument: InstrumentType = InstrumentType.OWON_SPE6103,
+    latency_seconds: float = 0.0,
+    baudrate: int | None = None,
+) -> SimulatedTransport:
+    transport = SimulatedTransport(
+        SimulatedInstrument(
+            SimulatorSettings(instrument=instrument, latency_seconds=latency_seconds, baudrate=baudrate, seed=0)
+        )
+    )
+    transport.open()
+    return transport
+
+
+def timed(histogram: LatencyHistogram, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    histogram.record(time.perf_counter() - started)
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def environment() -> dict:
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    Path(path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.harness import LatencyHistogram, environment, simulated_transport, timed, write_results
+from dmm_app.logging_util import BackgroundLogger, CsvLogger, create_logger
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+from dmm_app.poller import CycleStats, PollingWorker, PollRequest, parse_primary_value
+from dmm_app.reading_store import ReadingStore
+from dmm_app.scpi import SCPIClient
+from dmm_app.trend import TrendBuffer
+
+QUERIES = {
+    MeasurementFunction.VOLTAGE: ("MEASure:VOLTage?", "V"),
+    MeasurementFunction.CURRENT: ("MEASure:CURRent?", "A"),
+}
+
+
+def _requests(rows: int) -> list[PollRequest]:
+    functions = list(QUERIES)
+    requests = []
+    for slot in range(rows):
+        function = functions[slot % len(functions)]
+        command, unit = QUERIES[function]
+        requests.append(PollRequest(slot_index=slot, function=function, query_command=command, unit=unit))
+    return requests
+
+
+def _sample_reading(slot: int = 0) -> Reading:
+    now = datetime.now()
+    return Reading(
+        timestamp=now,
+        slot_index=slot,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103,SIM0001,FV:V1.0",
+        function=MeasurementFunction.VOLTAGE,
+        raw_response="5.000000E+00",
+        value=5.0,
+        unit="V",
+        scheduled_at=now,
+        issued_at=now,
+    )
+
+
+def bench_layers(iterations: int, latency: float, baudrate: int | None) -> dict:
+    transport = simulated_transport(latency_seconds=latency, baudrate=baudrate)
+    scpi = SCPIClient(transport)
+    transport_hist = LatencyHistogram()
+    query_hist = LatencyHistogram()
+    parse_hist = LatencyHistogram()
+    build_hist = LatencyHistogram()
+
+    payload = b"MEASure:VOLTage?\n"
+    for _ in range(iterations):
+        timed(transport_hist, lambda: (transport.write(payload), transport.read_until(b"\n")))
+        raw = timed(query_hist, scpi.query, "MEASure:VOLTage?")
+        timed(parse_hist, parse_primary_value, raw)
+        timed(build_hist, _sample_reading)
+
+    with tempfile.TemporaryDirectory() as directory:
+        logger = CsvLogger(str(Path(directory) / "layers.csv"))
+        log_hist = LatencyHistogram()
+        reading = _sample_reading()
+        for _ in range(iterations):
+            timed(log_hist, logger.write_readings, (reading,))
+        logger.close()
+
+    return {
+        "iterations": iterations,
+        "transport_round_trip": transport_hist.summary(),
+        "scpi_query": query_hist.summary(),
+        "parse_primary_value": parse_hist.summary(),
+        "reading_construct": build_hist.summary(),
+        "csv_write_row": log_hist.summary(),
+    }
+
+
+def _run_worker(rows: int, batch: bool, seconds: float, latency: float, baudrate: int | None) -> dict:
+    transport = simulated_transport(latency_seconds=latency, baudrate=baudrate)
+    scpi = SCPIClient(transport)
+    readings = 0
+    cycles: list[CycleStats] = []
+    errors: list[str] = []
+
+    def on_reading(_reading: Reading) -> None:
+        nonlocal readings
+        readings += 1
+
+    # A 1 us interval makes every tick late, so the worker polls back-to-back: the rate it reaches is the ceiling.
+    worker = PollingWorker(
+        scpi=scpi,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="SIM",
+        measurements=_requests(rows),
+        interval_seconds=1e-6,
+        on_reading=on_reading,
+        on_error=errors.append,
+        batch_queries=batch,
+        on_cycle=cycles.append,
+    )
+    started = time.perf_counter()
+    worker.start()
+    time.sleep(seconds)
+    worker.stop()
+    worker.join(timeout=5.0)
+    elapsed = time.perf_counter() - started
+
+    cycle_hist = LatencyHistogram()
+    for stats in cycles:
+        cycle_hist.record(stats.duration_seconds)
+    return {
+        "rows": rows,
+        "batched": batch,
+        "cycles_per_second": len(cycles) / elapsed,
+        "readings_per_second": readings / elapsed,
+        "errors": len(errors),
+        "cycle_duration": cycle_hist.summary(),
+    }
+
+
+def bench_poll_rate(max_rows: int, seconds: float, latency: float, baudrate: int | None) -> list[dict]:
+    results = []
+    for rows in range(1, max_rows + 1):
+        results.append(_run_worker(rows, False, seconds, latency, baudrate))
+        if rows > 1:
+            results.append(_run_worker(rows, True, seconds, latency, baudrate))
+    return results
+
+
+def bench_logger(rows: int, batch_size: int) -> dict:
+    readings = [_sample_reading(slot % 4) for slot in range(batch_size)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, path in (("csv", "rows.csv"), ("npylog", "rows.npylog")):
+            logger = create_logger(str(Path(directory) / path))
+            started = time.perf_counter()
+            for _ in range(rows // batch_size):
+                logger.write_readings(readings)
+            logger.close()
+            elapsed = time.perf_counter() - started
+            results[f"{name}_rows_per_second"] = (rows // batch_size) * batch_size / elapsed
+
+        background = BackgroundLogger(CsvLogger(str(Path(directory) / "background.csv")), max_queue=rows)
+        reading = readings[0]
+        started = time.perf_counter()
+        for _ in range(rows):
+            background.write_reading(reading)
+        enqueued = time.perf_counter() - started
+        background.close()
+        elapsed = time.perf_counter() - started
+        results["background_enqueue_per_second"] = rows / enqueued
+        results["background_rows_per_second"] = background.stats.written / elapsed
+        results["background_dropped"] = background.stats.dropped
+    results["rows"] = rows
+    return results
+
+
+def bench_memory(seconds: float, sample_seconds: float) -> dict:
+    transport = simulated_transport()
+    scpi = SCPIClient(transport)
+    with tempfile.TemporaryDirectory() as directory:
+        logger = BackgroundLogger(CsvLogger(str(Path(directory) / "memory.csv")))
+        samples: list[tuple[float, int]] = []
+        readings = 0
+
+        def on_reading(reading: Reading) -> None:
+            nonlocal readings
+            readings += 1
+            logger.write_reading(reading)
+
+        gc.collect()
+        tracemalloc.start()
+        worker = PollingWorker(
+            scpi=scpi,
+            instrument=InstrumentType.OWON_SPE6103,
+            device_idn="SIM",
+            measurements=_requests(2),
+            interval_seconds=0.001,
+            on_reading=on_reading,
+            on_error=lambda _err: None,
+            batch_queries=True,
+        )
+        started = time.perf_counter()
+        worker.start()
+        stop = threading.Event()
+        while not stop.wait(sample_seconds):
+            elapsed = time.perf_counter() - started
+            samples.append((elapsed, tracemalloc.get_traced_memory()[0]))
+            if elapsed >= seconds:
+                stop.set()
+        worker.stop()
+        worker.join(timeout=5.0)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        logger.close()
+
+    # Ignore the first half as warm-up (queues, caches and the CSV buffer filling) and fit a line to the rest.
+    steady = samples[len(samples) // 2 :]
+    slope = 0.0
+    if len(steady) >= 2:
+        mean_t = sum(t for t, _ in steady) / len(steady)
+        mean_m = sum(m for _, m in steady) / len(steady)
+        denominator = sum((t - mean_t) ** 2 for t, _ in steady)
+        if denominator:
+            slope = sum((t - mean_t) * (m - mean_m) for t, m in steady) / denominator
+    return {
+        "seconds": seconds,
+        "readings": readings,
+        "traced_bytes_start": samples[0][1] if samples else 0,
+        "traced_bytes_end": samples[-1][1] if samples else 0,
+        "traced_bytes_peak": peak,
+        "steady_growth_bytes_per_second": slope,
+        "steady_growth_bytes_per_reading": slope * seconds / readings if readings else 0.0,
+        "samples": [{"t": round(t, 2), "bytes": m} for t, m in samples],
+    }
+
+
+def _traced_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build()
+        return built, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_history(rows: int) -> dict:
+    template = _sample_reading()
+
+    def build() -> list[Reading]:
+        # Distinct timestamps, values and replies per reading, so nothing is shared between them as in a real run.
+        return [
+            Reading(
+                timestamp=datetime.fromtimestamp(template.timestamp.timestamp() + index),
+                slot_index=index % 2,
+                instrument=template.instrument,
+                device_idn=template.device_idn,
+                function=template.function,
+                raw_response=f"{5.0 + index * 1e-6:.6E}",
+                value=5.0 + index * 1e-6,
+                unit=template.unit,
+            )
+            for index in range(rows)
+        ]
+
+    readings, list_bytes = _traced_bytes(build)
+
+    store = ReadingStore(max_rows=rows)
+    started = time.perf_counter()
+    store.extend(readings)
+    store_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    series = store.slot_series(0)
+    series_seconds = time.perf_counter() - started
+
+    # What the GUI retains per row: one TrendBuffer per slot, fed with float timestamps and values.
+    slots = sorted({reading.slot_index for reading in readings})
+    per_slot = -(-rows // len(slots))
+    buffers = {slot: TrendBuffer(capacity=per_slot) for slot in slots}
+    started = time.perf_counter()
+    for reading in readings:
+        buffers[reading.slot_index].append(reading.timestamp.timestamp(), reading.value)
+    append_seconds = time.perf_counter() - started
+    # Measured once filled: the buffers grow as points arrive.
+    trend_bytes = sum(buffer.nbytes for buffer in buffers.values())
+    return {
+        "rows": rows,
+        "reading_list_bytes_per_reading": list_bytes / rows,
+        "store_bytes_per_reading": store.nbytes / rows,
+        "store_appends_per_second": rows / store_seconds,
+        "store_slot_series_ms": series_seconds * 1e3,
+        "slot_series_points": len(series[0]),
+        "trend_bytes_per_reading": trend_bytes / rows,
+        "trend_appends_per_second": rows / append_seconds,
+    }
+
+
+# Runs in a child process so every measurement is a cold start. time.monotonic() is system-wide, so the child's
+# timestamps are comparable with the parent's spawn time.
+STARTUP_PROBE = """
+import sys, time
+from dmm_app import main as entry
+from PySide6.QtCore import QTimer
+
+app = entry.QApplication(sys.argv[:1])
+window = entry.DMMAppWindow()
+window.show()
+loaded = ",".join(name for name in ("numpy", "asyncio", "serial") if name in sys.modules)
+
+def first_frame():
+    print("first_frame", time.monotonic(), loaded, flush=True)
+    print(FIRST_FRAME_MARK, file=sys.stderr, flush=True)
+
+def poll_ready():
+    if window.startup_finished:
+        print("ready", time.monotonic(), flush=True)
+        app.quit()
+    else:
+        QTimer.singleShot(5, poll_ready)
+
+QTimer.singleShot(0, first_frame)
+QTimer.singleShot(0, poll_ready)
+app.exec()
+"""
+STARTUP_TIMEOUT_SECONDS = 60.0
+FIRST_FRAME_MARK = "-- first frame --"
+
+
+def _import_times(stderr: str) -> tuple[float, float, dict[str, float]]:
+    # `-X importtime` lines: "import time: self_us | cumulative_us | <indent>name". Top-level entries (no indent)
+    # add up to the total import time; those logged before the probe's marker were on the first-frame path.
+    total = 0.0
+    before_first_frame = None
+    cumulative: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if line == FIRST_FRAME_MARK:
+            before_first_frame = total
+            continue
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        try:
+            _, cumulative_us, name = line[len("import time:") :].split("|", 2)
+            microseconds = float(cumulative_us)
+        except ValueError:
+            continue
+        if not name.startswith("  "):
+            total += microseconds
+        cumulative[name.strip()] = microseconds
+    if before_first_frame is None:
+        before_first_frame = total
+    return (
+        before_first_frame / 1e3,
+        total / 1e3,
+        {name: microseconds / 1e3 for name, microseconds in cumulative.items()},
+    )
+
+
+def _startup_run(profile_imports: bool) -> dict:
+    environment = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    # -X importtime slows imports noticeably, so frame timings come from separate, unprofiled runs.
+    options = ["-X", "importtime"] if profile_imports else []
+    started = time.monotonic()
+    completed = subprocess.run(
+        [sys.executable, *options, "-c", f"FIRST_FRAME_MARK = {FIRST_FRAME_MARK!r}\n{STARTUP_PROBE}"],
+        capture_output=True,
+        text=True,
+        timeout=STARTUP_TIMEOUT_SECONDS,
+        env=environment,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "probe failed")
+    marks = {}
+    loaded = ""
+    for line in completed.stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0] in ("first_frame", "ready"):
+            marks[fields[0]] = (float(fields[1]) - started) * 1e3
+            if fields[0] == "first_frame" and len(fields) > 2:
+                loaded = fields[2]
+    import_ms, total_import_ms, modules = _import_times(completed.stderr)
+    return {**marks, "import_ms": import_ms, "total_import_ms": total_import_ms, "modules": modules, "loaded": loaded}
+
+
+def bench_startup(runs: int) -> dict:
+    # Time from spawning the interpreter to the first event-loop pass after show() (first frame) and to the
+    # background startup work being applied (ready). Run-to-run noise is large, so medians are reported.
+    try:
+        samples = [_startup_run(profile_imports=False) for _ in range(runs)]
+        profiles = [_startup_run(profile_imports=True) for _ in range(max(1, runs // 3))]
+    except (OSError, RuntimeError, subprocess.SubprocessError) as exc:
+        return {"skipped": str(exc)}
+    slowest = sorted(profiles[-1]["modules"].items(), key=lambda item: item[1], reverse=True)
+    return {
+        "runs": runs,
+        "first_frame_ms": statistics.median(sample["first_frame"] for sample in samples),
+        "ready_ms": statistics.median(sample["ready"] for sample in samples),
+        # Imports before the first frame; background imports only count towards the total.
+        "import_ms": statistics.median(profile["import_ms"] for profile in profiles),
+        "total_import_ms": statistics.median(profile["total_import_ms"] for profile in profiles),
+        "loaded_before_first_frame": samples[-1]["loaded"].split(",") if samples[-1]["loaded"] else [],
+        "slowest_imports_ms": [[name, round(ms, 2)] for name, ms in slowest[:15]],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the acquisition stack against a simulated instrument.")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--quick", action="store_true", help="Short run for smoke testing")
+    parser.add_argument("--max-rows", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated per-query latency in seconds")
+    parser.add_argument("--baud", type=int, default=0, help="Simulated line rate; 0 measures software overhead only")
+    parser.add_argument(
+        "--only",
+        choices=["layers", "poll_rate", "logger", "memory", "history", "startup"],
+        action="append",
+        help="Run selected groups",
+    )
+    args = parser.parse_args(argv)
+
+    baudrate = args.baud or None
+    iterations = 2_000 if args.quick else 20_000
+    poll_seconds = 0.5 if args.quick else 3.0
+    log_rows = 20_000 if args.quick else 200_000
+    memory_seconds = 3.0 if args.quick else 60.0
+    history_rows = 50_000 if args.quick else 500_000
+    startup_runs = 3 if args.quick else 15
+    groups = set(args.only or ["layers", "poll_rate", "logger", "memory", "history", "startup"])
+
+    results: dict = {"environment": environment(), "config": vars(args)}
+    if "layers" in groups:
+        print("layers ...", flush=True)
+        results["layers"] = bench_layers(iterations, args.latency, baudrate)
+    if "poll_rate" in groups:
+        print("poll rate ...", flush=True)
+        results["poll_rate"] = bench_poll_rate(args.max_rows, poll_seconds, args.latency, baudrate)
+    if "logger" in groups:
+        print("logger ...", flush=True)
+        results["logger"] = bench_logger(log_rows, batch_size=500)
+    if "memory" in groups:
+        print("memory ...", flush=True)
+        results["memory"] = bench_memory(memory_seconds, sample_seconds=max(0.25, memory_seconds / 60))
+    if "history" in groups:
+        print("history ...", flush=True)
+        results["history"] = bench_history(history_rows)
+    if "startup" in groups:
+        print("startup ...", flush=True)
+        results["startup"] = bench_startup(startup_runs)
+
+    write_results(args.output, results)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+from dmm_app.alarms import AlarmEngine, AlarmEvent, LimitRule
+from dmm_app.commands import INSTRUMENT_PROFILES, InstrumentProfile, idn_matches_profile, with_burst
+from dmm_app.event_loop import EventLoopThread
+from dmm_app.metrics import AcquisitionMetrics
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading, SerialPortInfo, SerialSettings, Timebase
+from dmm_app.port_watcher import PORT_ADDED, PORT_REMOVED, PortEvent, reappeared
+from dmm_app.poller import AsyncPollingWorker, CycleStats, PollRequest, PollingWorker, build_poll_requests
+from dmm_app.recovery import AsyncSessionRecovery, RecoveryEvent, RecoveryPolicy, SessionRecovery
+from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+from dmm_app.steps import Step, Write, scpi_step, scpi_step_async
+from dmm_app.transport import SOCKET_POOL, AsyncTransport, SerialTransport, SocketTransport, Transport
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    name: str
+    instrument: InstrumentType
+    settings: SerialSettings
+    functions: tuple[MeasurementFunction, ...]
+    burst_samples: int = 0
+    alarm_rules: tuple[LimitRule, ...] = ()
+    # Buffer burst_samples readings per cycle with the generic SCPI trigger model (commands.SCPI_BURST) on an
+    # instrument whose profile does not define burst commands. The instrument's firmware must support it.
+    scpi_burst: bool = False
+
+    @property
+    def profile(self) -> InstrumentProfile:
+        profile = INSTRUMENT_PROFILES[self.instrument]
+        return with_burst(profile) if self.scpi_burst else profile
+
+
+@dataclass
+class InstrumentSession:
+    config: SessionConfig
+    transport: Transport | AsyncTransport
+    scpi: SCPIClient | AsyncSCPIClient
+    device_idn: str
+    requests: list[PollRequest]
+    setup_commands: list[str]
+    # Device node in use; differs from config.settings.port once the session follows a renamed adapter.
+    port: str
+    worker: PollingWorker | AsyncPollingWorker | None = field(default=None, repr=False)
+    metrics: AcquisitionMetrics | None = field(default=None, repr=False)
+    alarms: AlarmEngine | None = field(default=None, repr=False)
+    # The port as last seen before it disappeared, so it can be recognised by serial number when it returns.
+    unplugged: SerialPortInfo | None = field(default=None, repr=False)
+
+
+class AcquisitionManager:
+    def __init__(
+        self,
+        on_reading: Callable[[Reading], None],
+        on_error: Callable[[str, str], None],
+        on_cycle: Callable[[str, CycleStats], None] | None = None,
+        transport_factory: Callable[[SerialSettings], Transport] = SerialTransport,
+        collect_metrics: bool = False,
+        recovery_policy: RecoveryPolicy | None = None,
+        on_recovery: Callable[[str, RecoveryEvent], None] | None = None,
+        on_alarm: Callable[[str, AlarmEvent], None] | None = None,
+        async_transport_factory: Callable[[SerialSettings], AsyncTransport] | None = None,
+    ):
+        self._on_reading = on_reading
+        self._on_error = on_error
+        self._on_cycle = on_cycle
+        self._transport_factory = transport_factory
+        self._collect_metrics = collect_metrics
+        self._recovery_policy = recovery_policy
+        self._on_recovery = on_recovery
+        self._on_alarm = on_alarm
+        # With an async transport factory every session runs as an AsyncPollingWorker on one shared event loop
+        # thread instead of a thread per port.
+        self._async_transport_factory = async_transport_factory
+        self._event_loop: EventLoopThread | None = None
+        self._runs: list[concurrent.futures.Future] = []
+        self._sessions: list[InstrumentSession] = []
+        self._timebase: Timebase | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def sessions(self) -> list[InstrumentSession]:
+        return list(self._sessions)
+
+    @property
+    def timebase(self) -> Timebase | None:
+        return self._timebase
+
+    @property
+    def recovery_policy(self) -> RecoveryPolicy | None:
+        return self._recovery_policy
+
+    @recovery_policy.setter
+    def recovery_policy(self, policy: RecoveryPolicy | None) -> None:
+        # Applies from the next start(); None stops a session on its first connection error.
+        if self.is_running:
+            raise RuntimeError("Stop acquisition before changing the reconnect policy.")
+        self._recovery_policy = policy
+
+    def metrics(self) -> list[AcquisitionMetrics]:
+        return [session.metrics for session in self._sessions if session.metrics is not None]
+
+    @property
+    def is_running(self) -> bool:
+        return any(session.worker and session.worker.is_alive() for session in self._sessions) or any(
+            not run.done() for run in self._runs
+        )
+
+    def add_session(self, config: SessionConfig) -> InstrumentSession:
+        if self.is_running:
+            raise RuntimeError("Stop acquisition before adding instruments.")
+        if any(session.config.name == config.name for session in self._sessions):
+            raise ValueError(f"Session name already in use: {config.name}")
+        if any(session.config.settings.port == config.settings.port for session in self._sessions):
+            raise ValueError(f"Serial port already in use: {config.settings.port}")
+
+        profile = config.profile
+        # Slot indices are unique across sessions so the merged stream can be routed and logged per row.
+        first_slot = sum(len(session.requests) for session in self._sessions)
+        requests, setup_commands = _plan(config, first_slot)
+
+        metrics = None
+        if self._collect_metrics:
+            metrics = AcquisitionMetrics(
+                labels={"session": config.name, "instrument": config.instrument.name.lower()}
+            )
+        if self._async_transport_factory is not None:
+            transport = self._async_transport_factory(config.settings)
+            scpi = AsyncSCPIClient(transport, metrics=metrics)
+        else:
+            transport = self._transport_factory(config.settings)
+            scpi = SCPIClient(transport, metrics=metrics)
+        try:
+            if isinstance(scpi, AsyncSCPIClient):
+                device_idn = self._run_async(_identify_async(scpi, profile.idn_query))
+            else:
+                device_idn = _identify(scpi, profile.idn_query)
+        except Exception:
+            self._close_transport(transport)
+            raise
+        if device_idn == "UNKNOWN":
+            self._close_transport(transport)
+            raise ValueError(
+                f"{config.name}: no reply to {profile.idn_query} on {config.settings.port}. "
+                "Check cabling and SCPI mode."
+            )
+        if not idn_matches_profile(profile, device_idn):
+            self._close_transport(transport)
+            raise ValueError(
+                f"{config.name}: device on {config.settings.port} does not match {profile.instrument.value} "
+                f"(expected an ID containing one of: {', '.join(profile.idn_expected_tokens)}; "
+                f"received ID: {device_idn})."
+            )
+
+        session = InstrumentSession(
+            config=config,
+            transport=transport,
+            scpi=scpi,
+            device_idn=device_idn,
+            requests=requests,
+            setup_commands=setup_commands,
+            port=config.settings.port,
+            metrics=metrics,
+            alarms=self._session_alarms(config, profile),
+        )
+        self._sessions.append(session)
+        return session
+
+    def reconfigure_session(self, name: str, **changes: Any) -> InstrumentSession:
+        # Changes a session's functions, burst length or alarm rules between runs, keeping its connection.
+        # The instrument and port are fixed for the session's lifetime.
+        if self.is_running:
+            raise RuntimeError("Stop acquisition before reconfiguring instruments.")
+        session = self.session(name)
+        config = replace(session.config, **changes)
+        if (config.name, config.instrument, config.settings) != (
+            session.config.name,
+            session.config.instrument,
+            session.config.settings,
+        ):
+            raise ValueError(f"{name}: the name, instrument and port of a session cannot change.")
+        _plan(config, 0)
+        session.config = config
+        session.alarms = self._session_alarms(config, config.profile)
+        # Row counts may have changed, so later sessions' slots move too.
+        first_slot = 0
+        for each in self._sessions:
+            each.requests, each.setup_commands = _plan(each.config, first_slot)
+            first_slot += len(each.requests)
+        return session
+
+    def session(self, name: str) -> InstrumentSession:
+        for session in self._sessions:
+            if session.config.name == name:
+                return session
+        raise KeyError(f"No session named {name!r}.")
+
+    def set_session_metrics(self, name: str, metrics: AcquisitionMetrics | None) -> None:
+        # Queries record into `metrics` at once; poll cycles from the next start().
+        session = self.session(name)
+        session.metrics = metrics
+        session.scpi.metrics = metrics
+
+    def request(self, name: str, step: Step) -> Any:
+        # One write or query outside the polling workers (ID checks, snapshots), blocking until it completes;
+        # async sessions run it on the shared loop. Takes the transport lock like the workers.
+        session = self.session(name)
+        if isinstance(session.scpi, AsyncSCPIClient):
+            return self._run_async(scpi_step_async(session.scpi, step))
+        return scpi_step(session.scpi, step)
+
+    def start(self, interval_seconds: float) -> None:
+        with self._lock:
+            if self.is_running:
+                return
+            for session in self._sessions:
+                for setup_command in session.setup_commands:
+                    self.request(session.config.name, Write(setup_command))
+
+            self._timebase = Timebase.now()
+            for session in self._sessions:
+                profile = session.config.profile
+                name = session.config.name
+                if session.alarms is not None:
+                    session.alarms.reset()
+                worker_class = AsyncPollingWorker if isinstance(session.scpi, AsyncSCPIClient) else PollingWorker
+                session.worker = worker_class(
+                    scpi=session.scpi,
+                    instrument=session.config.instrument,
+                    device_idn=session.device_idn,
+                    measurements=session.requests,
+                    interval_seconds=interval_seconds,
+                    on_reading=self._on_reading,
+                    on_error=lambda err, n=name: self._on_error(n, err),
+                    batch_queries=profile.supports_compound_query,
+                    on_cycle=None if self._on_cycle is None else (lambda stats, n=name: self._on_cycle(n, stats)),
+                    timebase=self._timebase,
+                    metrics=session.metrics,
+                    recovery=self._session_recovery(session, profile),
+                    on_recovery=None
+                    if self._on_recovery is None
+                    else (lambda event, n=name: self._on_recovery(n, event)),
+                    alarms=session.alarms,
+                )
+            for session in self._sessions:
+                if isinstance(session.worker, AsyncPollingWorker):
+                    self._runs.append(self._event_loop.submit(session.worker.run()))
+                else:
+                    session.worker.start()
+
+    def _session_alarms(self, config: SessionConfig, profile: InstrumentProfile) -> AlarmEngine | None:
+        if not config.alarm_rules:
+            return None
+        # Rules act on the instrument that produced the reading; rows are numbered across all sessions.
+        return AlarmEngine(
+            config.alarm_rules,
+            safe_state_commands=profile.safe_state_commands,
+            on_event=None if self._on_alarm is None else (lambda event, n=config.name: self._on_alarm(n, event)),
+        )
+
+    def _session_recovery(
+        self, session: InstrumentSession, profile: InstrumentProfile
+    ) -> SessionRecovery | AsyncSessionRecovery | None:
+        if self._recovery_policy is None:
+            return None
+        recovery_class = AsyncSessionRecovery if isinstance(session.scpi, AsyncSCPIClient) else SessionRecovery
+        return recovery_class(session.scpi, profile, session.setup_commands, self._recovery_policy)
+
+    def _run_async(self, coroutine):
+        # Blocking call into the shared loop, for setup and teardown outside the polling workers.
+        if self._event_loop is None:
+            self._event_loop = EventLoopThread()
+            self._event_loop.start()
+        return self._event_loop.submit(coroutine).result()
+
+    def _close_transport(self, transport: Transport | AsyncTransport) -> None:
+        try:
+            if isinstance(transport, AsyncTransport):
+                self._run_async(transport.close())
+            elif isinstance(transport, SocketTransport):
+                # Closes the connection unless another session still holds it from the pool.
+                SOCKET_POOL.release(transport)
+            else:
+                transport.close()
+        except Exception:
+            pass
+
+    def handle_port_event(self, event: PortEvent) -> list[str]:
+        # Fed by a PortWatcher. Sessions whose device reappears retry at once instead of waiting out the
+        # reconnect backoff; returns the names of the sessions that were woken.
+        woken = []
+        for session in self._sessions:
+            if event.kind == PORT_REMOVED and event.port.device == session.port:
+                session.unplugged = event.port
+            elif event.kind == PORT_ADDED and reappeared(session.port, session.unplugged, event.port):
+                if session.worker is None or not session.worker.is_alive():
+                    continue
+                retarget = event.port.device if event.port.device != session.port else None
+                if not session.worker.reattach(retarget):
+                    continue
+                session.port = event.port.device
+                session.unplugged = None
+                woken.append(session.config.name)
+        return woken
+
+    def stop(self, timeout_seconds: float = 1.5) -> None:
+        with self._lock:
+            workers = [session.worker for session in self._sessions if session.worker]
+            for worker in workers:
+                worker.stop()
+            for worker in workers:
+                if isinstance(worker, PollingWorker):
+                    worker.join(timeout=timeout_seconds)
+            for run in self._runs:
+                try:
+                    run.result(timeout=timeout_seconds)
+                except Exception:
+                    pass
+            self._runs.clear()
+            for session in self._sessions:
+                session.worker = None
+
+    def close(self) -> None:
+        self.stop()
+        for session in self._sessions:
+            self._close_transport(session.transport)
+        self._sessions.clear()
+        if self._event_loop is not None:
+            self._event_loop.stop()
+            self._event_loop = None
+
+
+def _plan(config: SessionConfig, first_slot: int) -> tuple[list[PollRequest], list[str]]:
+    profile = config.profile
+    if any(rule.safe_state for rule in config.alarm_rules) and not profile.safe_state_commands:
+        raise ValueError(f"{config.name}: {profile.instrument.value} has no safe-state action for alarm rules.")
+    if config.scpi_burst and len(config.functions) > 1:
+        # One trigger fills one buffer with whichever function was configured last.
+        raise ValueError(f"{config.name}: the SCPI trigger model buffers a single measurement function.")
+    return build_poll_requests(
+        profile, list(config.functions), first_slot=first_slot, burst_samples=config.burst_samples
+    )
+
+
+def _identify(scpi: SCPIClient, idn_query: str) -> str:
+    scpi.transport.open()
+    return scpi.query(idn_query).strip() or "UNKNOWN"
+
+
+async def _identify_async(scpi: AsyncSCPIClient, idn_query: str) -> str:
+    await scpi.transport.open()
+    return (await scpi.query(idn_query)) or "UNKNOWN"
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Callable, Final
+
+from dmm_app.models import ALARM_RESPONSE_PREFIX, MeasurementFunction, Reading
+from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+from dmm_app.steps import Steps, Write, run_steps, run_steps_async, scpi_step, scpi_step_async
+
+TRIP: Final[str] = "trip"
+CLEAR: Final[str] = "clear"
+
+
+@dataclass(frozen=True)
+class LimitRule:
+    # Applies to readings of `function`, or of one row when `slot_index` is set (or both).
+    name: str
+    function: MeasurementFunction | None = None
+    slot_index: int | None = None
+    low: float | None = None
+    high: float | None = None
+    # Once tripped, the value must come back this far inside the limits before the rule re-arms.
+    hysteresis: float = 0.0
+    max_rate_per_second: float | None = None
+    # Consecutive violating readings needed to trip, so a single noisy sample does not act.
+    debounce: int = 1
+    safe_state: bool = False
+    commands: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            raise ValueError("Limit rule needs a name.")
+        if self.function is None and self.slot_index is None:
+            raise ValueError(f"Limit rule {self.name!r} must select a function or a row.")
+        if self.low is None and self.high is None and self.max_rate_per_second is None:
+            raise ValueError(f"Limit rule {self.name!r} sets no low, high or rate limit.")
+        if self.low is not None and self.high is not None and self.low >= self.high:
+            raise ValueError(f"Limit rule {self.name!r}: low limit must be below the high limit.")
+        if self.hysteresis < 0:
+            raise ValueError(f"Limit rule {self.name!r}: hysteresis must not be negative.")
+        if self.low is not None and self.high is not None and 2 * self.hysteresis >= self.high - self.low:
+            raise ValueError(f"Limit rule {self.name!r}: hysteresis leaves no band to clear into.")
+        if self.max_rate_per_second is not None and self.max_rate_per_second <= 0:
+            raise ValueError(f"Limit rule {self.name!r}: rate limit must be positive.")
+        if self.debounce < 1:
+            raise ValueError(f"Limit rule {self.name!r}: debounce must be at least 1 reading.")
+
+    def matches(self, reading: Reading) -> bool:
+        return (self.function is None or reading.function == self.function) and (
+            self.slot_index is None or reading.slot_index == self.slot_index
+        )
+
+    def violation(self, value: float, rate: float | None, unit: str) -> str | None:
+        suffix = f" {unit}" if unit else ""
+        if self.low is not None and value < self.low:
+            return f"{value:.6g}{suffix} below {self.low:.6g}{suffix}"
+        if self.high is not None and value > self.high:
+            return f"{value:.6g}{suffix} above {self.high:.6g}{suffix}"
+        if self.max_rate_per_second is not None and rate is not None and abs(rate) > self.max_rate_per_second:
+            return f"rate {rate:+.3g}{suffix}/s exceeds {self.max_rate_per_second:.3g}{suffix}/s"
+        return None
+
+    def cleared(self, value: float, rate: float | None) -> bool:
+        if self.low is not None and value < self.low + self.hysteresis:
+            return False
+        if self.high is not None and value > self.high - self.hysteresis:
+            return False
+        return self.max_rate_per_second is None or rate is None or abs(rate) <= self.max_rate_per_second
+
+
+@dataclass(frozen=True)
+class AlarmEvent:
+    rule: str
+    kind: str  # TRIP or CLEAR
+    slot_index: int
+    function: MeasurementFunction
+    value: float
+    message: str
+    timestamp: datetime
+    # From the reply arriving to the event being raised, including any safe-state writes.
+    latency_seconds: float
+    commands_sent: tuple[str, ...] = ()
+    action_error: str | None = None
+
+    def describe(self) -> str:
+        state = "tripped" if self.kind == TRIP else "cleared"
+        text = f"{self.rule} {state} on row {self.slot_index + 1}: {self.message}"
+        if self.commands_sent:
+            text += f"; sent {', '.join(self.commands_sent)}"
+        if self.action_error:
+            text += f"; action failed: {self.action_error}"
+        return f"{text} ({self.latency_seconds * 1000:.1f} ms after reply)"
+
+
+@dataclass(slots=True)
+class _RuleState:
+    violations: int = 0
+    tripped: bool = False
+    last_value: float = math.nan
+    last_time: float | None = None
+
+
+@dataclass(frozen=True)
+class _Decision:
+    rule: LimitRule
+    state: _RuleState
+    kind: str
+    message: str
+
+
+class AlarmEngine:
+    # Evaluated on the acquisition thread right after each reply is parsed, so a trip is acted on before the
+    # reading reaches the bridge, the logger or the GUI timer. Rules keep separate state per row.
+    def __init__(
+        self,
+        rules: Iterable[LimitRule],
+        safe_state_commands: tuple[str, ...] = (),
+        on_event: Callable[[AlarmEvent], None] | None = None,
+    ):
+        self._rules = tuple(rules)
+        self._safe_state_commands = tuple(safe_state_commands)
+        self._on_event = on_event
+        self._states: dict[tuple[int, int], _RuleState] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rules(self) -> tuple[LimitRule, ...]:
+        return self._rules
+
+    def tripped(self) -> list[tuple[str, int]]:
+        with self._lock:
+            return [(self._rules[index].name, slot) for (index, slot), state in self._states.items() if state.tripped]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def _commands_for(self, rule: LimitRule) -> tuple[str, ...]:
+        commands = (self._safe_state_commands if rule.safe_state else ()) + rule.commands
+        return tuple(dict.fromkeys(commands))
+
+    def evaluate(self, reading: Reading, received: float, scpi: SCPIClient | None) -> list[Reading]:
+        # Returns marker readings for any trips/clears so callers can log them next to the reading.
+        return run_steps(self.evaluate_steps(reading, received, scpi is not None), partial(scpi_step, scpi))
+
+    async def evaluate_async(self, reading: Reading, received: float, scpi: AsyncSCPIClient | None) -> list[Reading]:
+        # evaluate() for AsyncPollingWorker: the same rules and state, with the safe-state writes awaited.
+        steps = self.evaluate_steps(reading, received, scpi is not None)
+        return await run_steps_async(steps, partial(scpi_step_async, scpi))
+
+    def evaluate_steps(self, reading: Reading, received: float, connected: bool = True) -> Steps[list[Reading]]:
+        # The evaluation itself, yielding the safe-state writes; the polling workers drive it directly.
+        # Unparsed and overflow replies carry no value and neither trip nor clear a rule.
+        if reading.value is None or not self._rules:
+            return []
+        events = []
+        for decision in self._decide(reading):
+            sent: list[str] = []
+            error = None
+            if decision.kind == TRIP:
+                for command in self._commands_for(decision.rule):
+                    if not connected:
+                        error = "no instrument connection"
+                        break
+                    try:
+                        yield Write(command)
+                    except Exception as exc:
+                        error = str(exc) or type(exc).__name__
+                        break
+                    sent.append(command)
+            events.append(self._finish(decision, reading, received, tuple(sent), error))
+        return self._publish(reading, events)
+
+    def _decide(self, reading: Reading) -> list[_Decision]:
+        with self._lock:
+            return [
+                decision
+                for index, rule in enumerate(self._rules)
+                if rule.matches(reading) and (decision := self._update(index, rule, reading)) is not None
+            ]
+
+    def _update(self, index: int, rule: LimitRule, reading: Reading) -> _Decision | None:
+        state = self._states.setdefault((index, reading.slot_index), _RuleState())
+        value = reading.value
+        now = reading.timestamp.timestamp()
+        rate = None
+        if state.last_time is not None and now > state.last_time:
+            rate = (value - state.last_value) / (now - state.last_time)
+        state.last_value = value
+        state.last_time = now
+
+        if state.tripped:
+            if not rule.cleared(value, rate):
+                return None
+            state.tripped = False
+            state.violations = 0
+            message = f"{value:.6g} {reading.unit}".strip() + " back within limits"
+            return _Decision(rule, state, CLEAR, message)
+
+        reason = rule.violation(value, rate, reading.unit)
+        if reason is None:
+            state.violations = 0
+            return None
+        state.violations += 1
+        if state.violations < rule.debounce:
+            return None
+        # Latched now so a concurrent reading cannot trip twice; undone in _finish if the action fails.
+        state.tripped = True
+        return _Decision(rule, state, TRIP, reason)
+
+    def _finish(
+        self,
+        decision: _Decision,
+        reading: Reading,
+        received: float,
+        commands_sent: tuple[str, ...],
+        action_error: str | None,
+    ) -> AlarmEvent:
+        if action_error is not None:
+            # A failed action does not latch the rule: the next violating reading tries again.
+            with self._lock:
+                decision.state.tripped = False
+        return self._event(
+            decision.rule, decision.kind, reading, decision.message, received, commands_sent, action_error
+        )
+
+    def _publish(self, reading: Reading, events: list[AlarmEvent]) -> list[Reading]:
+        markers = []
+        for event in events:
+            markers.append(alarm_reading(reading, event))
+            if self._on_event is not None:
+                self._on_event(event)
+        return markers
+
+    @staticmethod
+    def _event(
+        rule: LimitRule,
+        kind: str,
+        reading: Reading,
+        message: str,
+        received: float,
+        commands_sent: tuple[str, ...] = (),
+        action_error: str | None = None,
+    ) -> AlarmEvent:
+        return AlarmEvent(
+            rule=rule.name,
+            kind=kind,
+            slot_index=reading.slot_index,
+            function=reading.function,
+            value=reading.value,
+            message=message,
+            timestamp=reading.timestamp,
+            latency_seconds=time.monotonic() - received,
+            commands_sent=commands_sent,
+            action_error=action_error,
+        )
+
+
+def alarm_reading(reading: Reading, event: AlarmEvent) -> Reading:
+    return replace(
+        reading,
+        raw_response=f"{ALARM_RESPONSE_PREFIX} {event.describe()}".replace("\n", " "),
+        value=None,
+    )
+
+
+def _function_from_text(text: str) -> MeasurementFunction:
+    for function in MeasurementFunction:
+        if text.lower() in (function.name.lower(), function.value.lower()):
+            return function
+    raise ValueError(f"unknown function {text!r}")
+
+
+def _optional_float(entry: dict, key: str) -> float | None:
+    value = entry.get(key)
+    return None if value is None else float(value)
+
+
+def rule_from_dict(entry: dict) -> LimitRule:
+    # Rows are numbered from 1 in files, as in the GUI and CLI output.
+    row = entry.get("row")
+    commands = entry.get("commands", ())
+    if isinstance(commands, str):
+        commands = (commands,)
+    return LimitRule(
+        name=str(entry.get("name", "")),
+        function=_function_from_text(entry["function"]) if entry.get("function") else None,
+        slot_index=None if row is None else int(row) - 1,
+        low=_optional_float(entry, "low"),
+        high=_optional_float(entry, "high"),
+        hysteresis=float(entry.get("hysteresis", 0.0)),
+        max_rate_per_second=_optional_float(entry, "max_rate_per_second"),
+        debounce=int(entry.get("debounce", 1)),
+        safe_state=bool(entry.get("safe_state", False)),
+        commands=tuple(str(command) for command in commands),
+    )
+
+
+def load_rules(path: str) -> list[LimitRule]:
+    # JSON: {"rules": [{"name": ..., "function": "current", "high": 1.5, ...}, ...]} or just the list.
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    entries = document.get("rules", []) if isinstance(document, dict) else document
+    if not isinstance(entries, list):
+        raise ValueError("Alarm rules must be a list.")
+    rules = []
+    for position, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Alarm rule {position} is not an object.")
+        try:
+            rules.append(rule_from_dict(entry))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Alarm rule {position}: {exc}") from exc
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("Alarm rule names must be unique.")
+    return rules
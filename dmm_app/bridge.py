@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Final
+
+from dmm_app.models import Reading
+
+# Never evicted from a full event queue: losing an error leaves polling running, losing an alarm hides a trip,
+# losing a recovery event leaves the status stuck on "Reconnecting..." and losing a port event leaves the port
+# list (and the reattach to a returning adapter) behind. None of them arrive faster than the reconnect backoff
+# or a hotplug, so keeping them cannot grow the queue quickly.
+DEFAULT_CRITICAL_EVENTS: Final[frozenset[str]] = frozenset({"error", "alarm", "recovery", "port"})
+
+
+@dataclass(frozen=True)
+class BridgeStats:
+    published: int
+    coalesced: int
+    dropped: int
+    sink_errors: int
+    dropped_events: int = 0
+
+
+@dataclass(frozen=True)
+class BridgeFrame:
+    latest: dict[int, Reading]
+    recent: list[Reading]
+    events: list[tuple[str, object]]
+    stats: BridgeStats
+
+
+class ReadingBridge:
+    def __init__(
+        self,
+        recent_limit: int = 256,
+        event_limit: int = 256,
+        critical_events: frozenset[str] = DEFAULT_CRITICAL_EVENTS,
+    ):
+        self._lock = threading.Lock()
+        self._latest: dict[int, Reading] = {}
+        # Bounded by hand like the events, so gap and alarm markers outlive a flood of ordinary readings.
+        self._recent: deque[Reading] = deque()
+        self._recent_limit = recent_limit
+        # Bounded by hand rather than with maxlen, so critical events are kept even when the queue is full.
+        self._events: deque[tuple[str, object]] = deque()
+        self._event_limit = event_limit
+        self._critical_events = critical_events
+        self._dropped_events = 0
+        self._coalesced_events: dict[str, object] = {}
+        self._sinks: dict[str, Callable[[Reading], None]] = {}
+        self._published = 0
+        self._coalesced = 0
+        self._dropped = 0
+        self._sink_errors = 0
+
+    def set_sink(self, name: str, sink: Callable[[Reading], None] | None) -> None:
+        sinks = dict(self._sinks)
+        if sink is None:
+            sinks.pop(name, None)
+        else:
+            sinks[name] = sink
+        # Swapping the whole dict keeps publish_reading lock-free on the producer thread.
+        self._sinks = sinks
+
+    def publish_reading(self, reading: Reading) -> None:
+        # Sinks (logger, trend buffers) see every reading on the producer thread; the GUI only sees what
+        # survives coalescing.
+        for sink in self._sinks.values():
+            try:
+                sink(reading)
+            except Exception:  # pragma: no cover - a sink failure must not stop acquisition
+                self._sink_errors += 1
+        with self._lock:
+            self._published += 1
+            # Alarm markers go to the console and sinks but must not replace the row's measured value.
+            if not reading.is_alarm:
+                if reading.slot_index in self._latest:
+                    self._coalesced += 1
+                self._latest[reading.slot_index] = reading
+            if len(self._recent) >= self._recent_limit:
+                self._dropped += 1
+                # Evict the oldest ordinary reading; with only markers queued, the new reading replaces the
+                # oldest marker if it is one too and is dropped otherwise.
+                recent = self._recent
+                oldest = recent[0]
+                if oldest.value is not None or not _is_marker(oldest):
+                    recent.popleft()
+                else:
+                    evict = next((index for index, queued in enumerate(recent) if not _is_marker(queued)), None)
+                    if evict is not None:
+                        del recent[evict]
+                    elif _is_marker(reading):
+                        recent.popleft()
+                    else:
+                        return
+            self._recent.append(reading)
+
+    def publish_event(self, kind: str, payload: object, coalesce: bool = False) -> None:
+        with self._lock:
+            if coalesce:
+                self._coalesced_events[kind] = payload
+                return
+            if len(self._events) >= self._event_limit:
+                # Evict the oldest non-critical event; with none queued, only a critical event may still go in.
+                evict = next(
+                    (index for index, (queued, _) in enumerate(self._events) if queued not in self._critical_events),
+                    None,
+                )
+                if evict is not None:
+                    del self._events[evict]
+                    self._dropped_events += 1
+                elif kind not in self._critical_events:
+                    self._dropped_events += 1
+                    return
+            self._events.append((kind, payload))
+
+    def stats(self) -> BridgeStats:
+        with self._lock:
+            return self._stats()
+
+    def drain(self) -> BridgeFrame:
+        with self._lock:
+            frame = BridgeFrame(
+                latest=self._latest,
+                recent=list(self._recent),
+                events=list(self._events) + list(self._coalesced_events.items()),
+                stats=self._stats(),
+            )
+            self._latest = {}
+            self._recent.clear()
+            self._events.clear()
+            self._coalesced_events.clear()
+        return frame
+
+    def _stats(self) -> BridgeStats:
+        return BridgeStats(
+            published=self._published,
+            coalesced=self._coalesced,
+            dropped=self._dropped,
+            sink_errors=self._sink_errors,
+            dropped_events=self._dropped_events,
+        )
+
+
+def _is_marker(reading: Reading) -> bool:
+    return reading.is_gap or reading.is_alarm
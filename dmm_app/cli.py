@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from dmm_app.acquisition import AcquisitionManager, SessionConfig
+from dmm_app.alarms import AlarmEvent, LimitRule, load_rules
+from dmm_app.commands import INSTRUMENT_PROFILES, profile_supports_burst
+from dmm_app.discovery import DiscoveryCache, discover_instruments
+from dmm_app.logging_util import BackgroundLogger, create_logger
+from dmm_app.metrics import write_metrics
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading, SerialSettings
+from dmm_app.poller import CycleStats
+from dmm_app.port_watcher import PortEvent, PortWatcher
+from dmm_app.recovery import RecoveryEvent, RecoveryPolicy
+from dmm_app.replay import AS_FAST_AS_POSSIBLE, ReplaySummary, ReplayWorker, log_layout
+from dmm_app.running_stats import ReadingStatistics, format_statistics
+from dmm_app.transport import (
+    AsyncSerialTransport,
+    SerialTransport,
+    SocketTransport,
+    Transport,
+    parse_socket_address,
+)
+
+MIN_INTERVAL_MS = 200
+MAX_INTERVAL_MS = 60_000
+AUTO_PORT = "auto"
+
+
+def _instrument_arg(text: str) -> InstrumentType:
+    for instrument in InstrumentType:
+        if text.lower() in (instrument.name.lower(), instrument.value.lower()):
+            return instrument
+    choices = ", ".join(instrument.name.lower() for instrument in InstrumentType)
+    raise argparse.ArgumentTypeError(f"unknown instrument {text!r} (choose from {choices})")
+
+
+def _function_arg(text: str) -> MeasurementFunction:
+    for function in MeasurementFunction:
+        if text.lower() in (function.name.lower(), function.value.lower()):
+            return function
+    choices = ", ".join(function.name.lower() for function in MeasurementFunction)
+    raise argparse.ArgumentTypeError(f"unknown function {text!r} (choose from {choices})")
+
+
+def _open_transport(settings: SerialSettings) -> Transport:
+    socket_settings = parse_socket_address(settings.port)
+    if socket_settings is not None:
+        return SocketTransport(socket_settings)
+    return SerialTransport(settings)
+
+
+def _format_reading(reading: Reading) -> str:
+    display = reading.raw_response if reading.value is None else f"{reading.value:.6g} {reading.unit}"
+    timestamp = reading.timestamp.isoformat(timespec="milliseconds")
+    return f"{timestamp} | Row {reading.slot_index + 1} | {reading.function.value}: {display}"
+
+
+def _print_statistics(statistics: ReadingStatistics, labels: dict[int, str]) -> None:
+    for slot_index, snapshot in statistics.snapshots().items():
+        label = labels.get(slot_index, f"Slot {slot_index + 1}")
+        summary = format_statistics(snapshot, statistics.unit(slot_index))
+        print(f"Row {slot_index + 1} {label}: {summary}", file=sys.stderr)
+
+
+def _speed_arg(text: str) -> float:
+    if text.lower() == "max":
+        return AS_FAST_AS_POSSIBLE
+    try:
+        speed = float(text.lower().rstrip("x"))
+    except ValueError:
+        speed = -1.0
+    if speed <= 0:
+        raise argparse.ArgumentTypeError(f"invalid speed {text!r} (use a positive factor such as 1, 100x, or 'max')")
+    return speed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m dmm_app.cli",
+        description="Poll a SCPI instrument without the GUI and log readings to CSV or .npylog.",
+    )
+    parser.add_argument("--instrument", type=_instrument_arg, help="mp730889 or owon_spe6103")
+    parser.add_argument(
+        "--port",
+        help=f"Serial port (e.g. /dev/ttyUSB0), tcp://host[:port], or '{AUTO_PORT}' to probe every serial port",
+    )
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument(
+        "--function",
+        dest="functions",
+        type=_function_arg,
+        action="append",
+        help="Measurement to poll; repeat for multiple rows (default: voltage)",
+    )
+    parser.add_argument("--interval", type=int, default=1000, help="Poll interval in ms (200-60000)")
+    parser.add_argument("--duration", type=float, default=0.0, help="Seconds to run; 0 runs until SIGINT/SIGTERM")
+    parser.add_argument("--output", help="Log file (.csv) or directory (.npylog); omit to only print readings")
+    parser.add_argument("--samples", type=int, default=1, help="Samples per cycle on profiles with burst support")
+    parser.add_argument(
+        "--scpi-burst",
+        action="store_true",
+        help="Buffer --samples readings per cycle with the generic SCPI trigger model (firmware must support it)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Do not print readings to stdout")
+    parser.add_argument(
+        "--no-reconnect", action="store_true", help="Exit on the first connection error instead of reconnecting"
+    )
+    parser.add_argument(
+        "--reconnect-attempts",
+        type=int,
+        help="Exit after this many failed reconnect attempts in a row (default: keep retrying)",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Poll on one asyncio event loop instead of a thread per port (serial ports on POSIX only)",
+    )
+    parser.add_argument(
+        "--metrics-file", help="Write timing metrics here; .prom for Prometheus text format, anything else for JSON"
+    )
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between metrics file updates")
+    parser.add_argument(
+        "--stats", action="store_true", help="Print running statistics per row to stderr periodically and at exit"
+    )
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between statistics summaries")
+    parser.add_argument(
+        "--alarms",
+        metavar="RULES",
+        help="JSON limit rules checked on every reading; tripped rules can switch the instrument to a safe state",
+    )
+    parser.add_argument(
+        "--replay", metavar="LOG", help="Replay a recorded .csv or .npylog log instead of polling an instrument"
+    )
+    parser.add_argument(
+        "--speed",
+        type=_speed_arg,
+        default=AS_FAST_AS_POSSIBLE,
+        help="Replay speed: 1 for real time, 100x for accelerated, 'max' (default) for as fast as possible",
+    )
+    parser.add_argument("--max-gap", type=float, help="Cap idle gaps in the replayed log to this many seconds")
+    return parser
+
+
+def _validate(parser: argparse.ArgumentParser, args: argparse.Namespace) -> tuple[MeasurementFunction, ...]:
+    if args.stats_interval <= 0:
+        parser.error("Statistics interval must be positive.")
+    if args.replay:
+        if args.instrument or args.port or args.functions or args.metrics_file:
+            parser.error("--replay takes the instrument and rows from the log; omit --instrument/--port/--function.")
+        if args.alarms:
+            parser.error("--alarms needs a live instrument and cannot be combined with --replay.")
+        if args.max_gap is not None and args.max_gap < 0:
+            parser.error("Maximum gap must not be negative.")
+        if args.output and Path(args.output).resolve() == Path(args.replay).resolve():
+            parser.error("--output must not be the log being replayed.")
+        return ()
+    if args.instrument is None or not args.port:
+        parser.error("--instrument and --port are required unless --replay is given.")
+    profile = INSTRUMENT_PROFILES[args.instrument]
+    functions = tuple(args.functions or [MeasurementFunction.VOLTAGE])
+    if len(set(functions)) != len(functions):
+        parser.error("Each measurement row must use a different function.")
+    if len(functions) > 1 and args.instrument != InstrumentType.OWON_SPE6103:
+        parser.error(f"{profile.instrument.value} cannot read voltage and current simultaneously.")
+    unsupported = [function.value for function in functions if function not in profile.commands]
+    if unsupported:
+        parser.error(f"{profile.instrument.value} does not support: {', '.join(unsupported)}")
+    if args.scpi_burst and len(functions) > 1:
+        parser.error("--scpi-burst buffers a single measurement function; give only one --function.")
+    if not MIN_INTERVAL_MS <= args.interval <= MAX_INTERVAL_MS:
+        parser.error(f"Interval must be an integer between {MIN_INTERVAL_MS} and {MAX_INTERVAL_MS} ms.")
+    if args.duration < 0:
+        parser.error("Duration must not be negative.")
+    if args.samples < 1:
+        parser.error("Samples per cycle must be a positive integer.")
+    if args.metrics_interval <= 0:
+        parser.error("Metrics interval must be positive.")
+    if args.reconnect_attempts is not None and (args.no_reconnect or args.reconnect_attempts < 1):
+        parser.error("--reconnect-attempts must be a positive integer and cannot be combined with --no-reconnect.")
+    if args.asyncio and (os.name == "nt" or parse_socket_address(args.port) is not None):
+        parser.error("--asyncio needs a serial port on a POSIX system.")
+    return functions
+
+
+def _acquire(
+    args: argparse.Namespace,
+    functions: tuple[MeasurementFunction, ...],
+    on_reading: Callable[[Reading], None],
+    stop_event: threading.Event,
+    report_statistics: Callable[[], None],
+    alarm_rules: tuple[LimitRule, ...] = (),
+) -> int:
+    profile = INSTRUMENT_PROFILES[args.instrument]
+    burst_samples = args.samples if args.scpi_burst or profile_supports_burst(profile) else 0
+    failed: set[str] = set()
+
+    def on_error(name: str, err: str) -> None:
+        # Workers only report an error once they have given up, so the session has stopped polling. With no
+        # session left there is nothing to wait for.
+        print(f"{name}: {err}", file=sys.stderr)
+        failed.add(name)
+        if len(failed) >= len(manager.sessions):
+            stop_event.set()
+
+    def on_cycle(name: str, stats: CycleStats) -> None:
+        if stats.skipped_ticks:
+            print(
+                f"{name}: cycle {stats.cycle_index} overran, skipped {stats.skipped_ticks} tick(s).",
+                file=sys.stderr,
+            )
+
+    def on_recovery(name: str, event: RecoveryEvent) -> None:
+        print(f"{name}: connection {event.kind} ({event.outage_seconds:.1f} s): {event.message}", file=sys.stderr)
+
+    def on_alarm(name: str, event: AlarmEvent) -> None:
+        print(f"{name}: ALARM {event.describe()}", file=sys.stderr)
+
+    manager = AcquisitionManager(
+        on_reading=on_reading,
+        on_error=on_error,
+        on_cycle=on_cycle,
+        transport_factory=_open_transport,
+        collect_metrics=bool(args.metrics_file),
+        recovery_policy=None if args.no_reconnect else RecoveryPolicy(max_attempts=args.reconnect_attempts),
+        on_recovery=on_recovery,
+        on_alarm=on_alarm,
+        async_transport_factory=AsyncSerialTransport if args.asyncio else None,
+    )
+
+    def on_port_event(event: PortEvent) -> None:
+        for name in manager.handle_port_event(event):
+            print(f"{name}: {event.port.device} is back; reconnecting now.", file=sys.stderr)
+
+    watcher = None
+    try:
+        session = manager.add_session(
+            SessionConfig(
+                name=args.port,
+                instrument=args.instrument,
+                settings=SerialSettings(port=args.port, baudrate=args.baud),
+                functions=functions,
+                burst_samples=burst_samples,
+                scpi_burst=args.scpi_burst,
+                alarm_rules=alarm_rules,
+            )
+        )
+        print(f"Connected to {args.port} ({profile.instrument.value}): {session.device_idn}", file=sys.stderr)
+        manager.start(args.interval / 1000.0)
+        # Only serial sessions that reconnect have anything to gain from hotplug events.
+        if not args.no_reconnect and parse_socket_address(args.port) is None:
+            watcher = PortWatcher(on_port_event)
+            watcher.start()
+        deadline = time.monotonic() + args.duration if args.duration else None
+        next_metrics = time.monotonic() + args.metrics_interval
+        next_stats = time.monotonic() + args.stats_interval
+        # Wake periodically so stdout is flushed even when readings are slow.
+        while not stop_event.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            stop_event.wait(1.0 if remaining is None else min(1.0, remaining))
+            sys.stdout.flush()
+            if args.metrics_file and time.monotonic() >= next_metrics:
+                write_metrics(args.metrics_file, manager.metrics())
+                next_metrics += args.metrics_interval
+            if time.monotonic() >= next_stats:
+                report_statistics()
+                next_stats += args.stats_interval
+    except Exception as exc:  # pragma: no cover - hardware dependency
+        print(f"Acquisition failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if watcher is not None:
+            watcher.stop()
+            watcher.join(timeout=1.0)
+        if args.metrics_file:
+            write_metrics(args.metrics_file, manager.metrics())
+        manager.close()
+    if failed:
+        print("Acquisition stopped: no instrument left to poll.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _replay(
+    args: argparse.Namespace,
+    on_reading: Callable[[Reading], None],
+    stop_event: threading.Event,
+    report_statistics: Callable[[], None],
+) -> int:
+    errors: list[str] = []
+    summaries: list[ReplaySummary] = []
+
+    def on_error(err: str) -> None:
+        errors.append(err)
+        stop_event.set()
+
+    def on_finished(summary: ReplaySummary) -> None:
+        summaries.append(summary)
+        stop_event.set()
+
+    worker = ReplayWorker.from_log(
+        args.replay,
+        on_reading=on_reading,
+        on_error=on_error,
+        speed=args.speed,
+        max_gap_seconds=args.max_gap,
+        on_finished=on_finished,
+    )
+    worker.start()
+    next_stats = time.monotonic() + args.stats_interval
+    while not stop_event.wait(1.0):
+        sys.stdout.flush()
+        if time.monotonic() >= next_stats:
+            report_statistics()
+            next_stats += args.stats_interval
+    worker.stop()
+    worker.join()
+    for err in errors:
+        print(err, file=sys.stderr)
+    for summary in summaries:
+        state = "Replayed" if summary.completed else "Stopped after"
+        print(
+            f"{state} {summary.readings} readings "
+            f"({summary.log_seconds:.1f} s of log in {summary.wall_seconds:.1f} s).",
+            file=sys.stderr,
+        )
+    return 1 if errors else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    functions = _validate(parser, args)
+
+    if args.replay:
+        try:
+            layout = log_layout(args.replay)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Cannot read {args.replay}: {exc}", file=sys.stderr)
+            return 1
+        labels = {slot_index: reading.function.value for slot_index, reading in layout.items()}
+    else:
+        profile = INSTRUMENT_PROFILES[args.instrument]
+        alarm_rules: tuple[LimitRule, ...] = ()
+        if args.alarms:
+            try:
+                alarm_rules = tuple(load_rules(args.alarms))
+            except (OSError, ValueError) as exc:
+                print(f"Cannot read alarm rules from {args.alarms}: {exc}", file=sys.stderr)
+                return 1
+        labels = {slot_index: function.value for slot_index, function in enumerate(functions)}
+        if args.port == AUTO_PORT:
+            found = [
+                result
+                for result in discover_instruments(cache=DiscoveryCache())
+                if result.instrument == args.instrument
+            ]
+            if not found:
+                print(f"No {profile.instrument.value} found on any serial port.", file=sys.stderr)
+                return 1
+            # --baud is ignored here: the probe already found the rate the instrument answers at.
+            args.port, args.baud = found[0].port, found[0].baudrate
+            print(f"Discovered {profile.instrument.value} on {args.port} at {args.baud} baud.", file=sys.stderr)
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, _frame) -> None:
+        print(f"Received {signal.Signals(signum).name}, stopping.", file=sys.stderr)
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    logger = BackgroundLogger(create_logger(args.output)) if args.output else None
+    statistics = ReadingStatistics() if args.stats else None
+
+    def on_reading(reading: Reading) -> None:
+        if logger is not None:
+            logger.write_reading(reading)
+        if statistics is not None:
+            statistics.add_reading(reading)
+        if not args.quiet:
+            print(_format_reading(reading))
+
+    def report_statistics() -> None:
+        if statistics is not None:
+            _print_statistics(statistics, labels)
+
+    exit_code = 0
+    try:
+        if args.replay:
+            exit_code = _replay(args, on_reading, stop_event, report_statistics)
+        else:
+            exit_code = _acquire(args, functions, on_reading, stop_event, report_statistics, alarm_rules)
+    finally:
+        sys.stdout.flush()
+        report_statistics()
+        if logger is not None:
+            logger.close()
+            stats = logger.stats
+            print(f"Logged {stats.written} readings, dropped {stats.dropped}.", file=sys.stderr)
+            if logger.error:
+                print(f"Logging error: {logger.error}", file=sys.stderr)
+                exit_code = exit_code or 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
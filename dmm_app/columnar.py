@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Final
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - import guard for environments without numpy
+    np = None
+
+# Shared by the .npylog log, the in-memory ReadingStore and the trend buffers, so all of them encode time,
+# labels and numeric replies the same way.
+MISSING_TIME_NS: Final[int] = -(2**63)
+NO_CATEGORY: Final[int] = -1
+
+
+def to_ns(value: datetime | None) -> int:
+    # Rounded to whole microseconds first: that is all a datetime holds, and it keeps float error out of the ns.
+    if value is None:
+        return MISSING_TIME_NS
+    return round(value.timestamp() * 1_000_000) * 1000
+
+
+def from_ns(value: int) -> datetime | None:
+    return None if value == MISSING_TIME_NS else datetime.fromtimestamp(value / 1e9)
+
+
+def numeric_reply(value: float) -> str:
+    # Stands in for a numeric reply whose text was not kept; 12 significant digits round-trip any instrument's
+    # reading without the float noise of repr().
+    return f"{value:.12g}"
+
+
+class CategoryTable:
+    # Interns repeated labels (instrument, IDN, function, unit, non-numeric replies) as small integer codes.
+    def __init__(self, labels: Iterable[str] = ()):
+        self._labels: list[str] = list(labels)
+        self._codes: dict[str, int] = {label: code for code, label in enumerate(self._labels)}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @property
+    def labels(self) -> list[str]:
+        return self._labels
+
+    def code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._codes[label] = code
+            self._labels.append(label)
+        return code
+
+    def label(self, code: int) -> str:
+        return "" if code == NO_CATEGORY else self._labels[code]
+
+
+class MirroredColumns:
+    # A ring of NumPy columns. Every row is written at i and i + capacity, so the retained window is always one
+    # contiguous slice of each column and readers get views without concatenating a wrapped ring. Not locked;
+    # owners hold their own lock around appends and while using views.
+    def __init__(self, dtypes: dict[str, str], capacity: int):
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install dependencies first.")
+        if capacity < 1:
+            raise ValueError("Column ring must hold at least one row.")
+        self._dtypes = dict(dtypes)
+        self._allocate(capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns)
+
+    def _allocate(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._columns = [np.empty(2 * capacity, dtype=dtype) for dtype in self._dtypes.values()]
+        self._head = 0
+        self._count = 0
+
+    def append(self, row: Sequence) -> None:
+        # `row` holds one value per column, in the order the dtypes were given.
+        position = self._head
+        mirror = position + self._capacity
+        for column, value in zip(self._columns, row):
+            column[position] = value
+            column[mirror] = value
+        self._head = (position + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+
+    def resize(self, capacity: int) -> None:
+        # Keeps the newest rows that fit. Views taken before the resize keep pointing at the old arrays.
+        if capacity < 1:
+            raise ValueError("Column ring must hold at least one row.")
+        keep = min(self._count, capacity)
+        retained = [column[:keep].copy() for column in self.window(self._count - keep).values()]
+        self._allocate(capacity)
+        for column, values in zip(self._columns, retained):
+            column[:keep] = values
+            column[capacity : capacity + keep] = values
+        self._head = keep % capacity
+        self._count = keep
+
+    def window(self, start: int = 0, stop: int | None = None) -> dict[str, np.ndarray]:
+        # Views of rows [start, stop), counted from the oldest retained row like a list slice.
+        first, last, _ = slice(start, stop).indices(self._count)
+        offset = (self._head - self._count) % self._capacity
+        return {
+            name: column[offset + first : offset + max(first, last)]
+            for name, column in zip(self._dtypes, self._columns)
+        }
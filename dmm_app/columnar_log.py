@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from itertools import repeat
+from pathlib import Path
+from typing import Final
+
+from dmm_app.columnar import NO_CATEGORY, CategoryTable, from_ns, numeric_reply, to_ns
+from dmm_app.logging_util import read_csv_log
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - import guard for environments without numpy
+    np = None
+
+CATEGORY_COLUMNS: Final[tuple[str, ...]] = ("instrument", "device_idn", "function", "unit", "raw_response")
+# Verbatim UTF-8 reply text of numeric rows (empty for the others, whose text is in the raw_response category).
+RAW_TEXT_COLUMN: Final[str] = "raw_text"
+CATEGORIES_FILE: Final[str] = "categories.json"
+CHUNK_PATTERN: Final[str] = "chunk-*.npz"
+CHUNK_PREFIX: Final[str] = "chunk-"
+READ_BATCH_ROWS: Final[int] = 4096
+DEFAULT_CHUNK_ROWS: Final[int] = 65_536
+# Rows wait in memory until a chunk is cut, so this bounds what a crash can lose. Shorter means more, smaller
+# files for slow logs (one per 10 s is 8,640 a day).
+DEFAULT_MAX_CHUNK_SECONDS: Final[float] = 10.0
+
+
+class ColumnarLogger:
+    def __init__(
+        self, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, max_chunk_seconds: float = DEFAULT_MAX_CHUNK_SECONDS
+    ):
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install dependencies first.")
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._chunk_rows = chunk_rows
+        self._max_chunk_seconds = max_chunk_seconds
+        self._categories = {name: CategoryTable() for name in CATEGORY_COLUMNS}
+        self._categories_dirty = False
+        self._load_categories()
+        # Appending to an existing log continues after its highest chunk; counting the files would reuse a
+        # number (and overwrite that chunk) if one had been removed.
+        chunks = _numbered_chunks(self._path)
+        self._chunk_index = chunks[-1][0] + 1 if chunks else 0
+        self._rows: dict[str, list] = {}
+        self._reset_rows()
+        self._chunk_started = time.monotonic()
+        self._closed = False
+
+    @property
+    def path(self) -> str:
+        return str(self._path)
+
+    def write_reading(self, reading: Reading) -> None:
+        self._append(reading)
+        if len(self._rows["timestamp_ns"]) >= self._chunk_rows:
+            self._write_chunk()
+
+    def write_readings(self, readings: Iterable[Reading]) -> None:
+        for reading in readings:
+            self.write_reading(reading)
+
+    def flush(self, fsync: bool = False) -> None:
+        # The background writer flushes every second; cutting a chunk each time would fragment a slow log, so
+        # a chunk is cut early only once it is max_chunk_seconds old (or when fsync is requested).
+        if fsync or time.monotonic() - self._chunk_started >= self._max_chunk_seconds:
+            self._write_chunk(fsync=fsync)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._write_chunk()
+        self._closed = True
+
+    def _load_categories(self) -> None:
+        categories_path = self._path / CATEGORIES_FILE
+        if not categories_path.exists():
+            return
+        stored = json.loads(categories_path.read_text(encoding="utf-8"))
+        for name in CATEGORY_COLUMNS:
+            self._categories[name] = CategoryTable(stored.get(name, []))
+
+    def _save_categories(self) -> None:
+        categories_path = self._path / CATEGORIES_FILE
+        temporary = categories_path.with_suffix(".tmp")
+        payload = {name: table.labels for name, table in self._categories.items()}
+        temporary.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        os.replace(temporary, categories_path)
+        self._categories_dirty = False
+
+    def _code(self, column: str, label: str) -> int:
+        table = self._categories[column]
+        known = len(table)
+        code = table.code(label)
+        if len(table) != known:
+            self._categories_dirty = True
+        return code
+
+    def _reset_rows(self) -> None:
+        self._rows = {
+            "timestamp_ns": [],
+            "scheduled_ns": [],
+            "issued_ns": [],
+            "slot": [],
+            "value": [],
+            "instrument": [],
+            "device_idn": [],
+            "function": [],
+            "unit": [],
+            "raw_response": [],
+            RAW_TEXT_COLUMN: [],
+        }
+
+    def _append(self, reading: Reading) -> None:
+        rows = self._rows
+        rows["timestamp_ns"].append(to_ns(reading.timestamp))
+        rows["scheduled_ns"].append(to_ns(reading.scheduled_at))
+        rows["issued_ns"].append(to_ns(reading.issued_at))
+        rows["slot"].append(reading.slot_index)
+        rows["value"].append(np.nan if reading.value is None else reading.value)
+        rows["instrument"].append(self._code("instrument", reading.instrument.value))
+        rows["device_idn"].append(self._code("device_idn", reading.device_idn))
+        rows["function"].append(self._code("function", reading.function.value))
+        rows["unit"].append(self._code("unit", reading.unit))
+        # Non-numeric text (gaps, errors) repeats and is interned; numeric replies are nearly all distinct, so
+        # they are kept per row and left to the chunk compression.
+        if reading.value is None:
+            rows["raw_response"].append(self._code("raw_response", reading.raw_response))
+            rows[RAW_TEXT_COLUMN].append("")
+        else:
+            rows["raw_response"].append(NO_CATEGORY)
+            rows[RAW_TEXT_COLUMN].append(reading.raw_response)
+
+    def _write_chunk(self, fsync: bool = False) -> None:
+        rows = self._rows
+        if rows["timestamp_ns"]:
+            if self._categories_dirty:
+                self._save_categories()
+            columns = {
+                "timestamp_ns": np.asarray(rows["timestamp_ns"], dtype=np.int64),
+                "scheduled_ns": np.asarray(rows["scheduled_ns"], dtype=np.int64),
+                "issued_ns": np.asarray(rows["issued_ns"], dtype=np.int64),
+                "slot": np.asarray(rows["slot"], dtype=np.int16),
+                "value": np.asarray(rows["value"], dtype=np.float64),
+            }
+            for name in CATEGORY_COLUMNS:
+                columns[name] = np.asarray(rows[name], dtype=np.int32)
+            # UTF-8 bytes rather than a str_ column: a quarter of the bytes to compress, so chunks write much faster.
+            columns[RAW_TEXT_COLUMN] = np.asarray(
+                [text.encode("utf-8") for text in rows[RAW_TEXT_COLUMN]], dtype=np.bytes_
+            )
+            chunk_path = self._path / f"{CHUNK_PREFIX}{self._chunk_index:06d}.npz"
+            with chunk_path.open("wb") as handle:
+                np.savez_compressed(handle, **columns)
+                if fsync:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            self._chunk_index += 1
+            self._reset_rows()
+        self._chunk_started = time.monotonic()
+
+
+def _numbered_chunks(path: Path) -> list[tuple[int, Path]]:
+    # In write order. Sorted by number, not name: the index outgrows its zero padding on very long runs.
+    chunks = []
+    for chunk_path in path.glob(CHUNK_PATTERN):
+        number = chunk_path.stem[len(CHUNK_PREFIX) :]
+        if number.isdigit():
+            chunks.append((int(number), chunk_path))
+    return sorted(chunks)
+
+
+def read_categories(path: str) -> dict[str, list[str]]:
+    categories_path = Path(path) / CATEGORIES_FILE
+    if not categories_path.exists():
+        return {name: [] for name in CATEGORY_COLUMNS}
+    return json.loads(categories_path.read_text(encoding="utf-8"))
+
+
+def iter_columnar_chunks(path: str) -> Iterator[dict[str, np.ndarray]]:
+    if np is None:
+        raise RuntimeError("numpy is not installed. Install dependencies first.")
+    for _, chunk_path in _numbered_chunks(Path(path)):
+        with np.load(chunk_path) as chunk:
+            yield {name: chunk[name] for name in chunk.files}
+
+
+def read_columnar_log(path: str) -> dict[str, np.ndarray]:
+    chunks = list(iter_columnar_chunks(path))
+    if not chunks:
+        return {}
+    # Chunks written before raw_text existed lack it; a column is returned only if every chunk has it.
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks])
+        for name in chunks[0]
+        if all(name in chunk for chunk in chunks)
+    }
+
+
+def read_columnar_readings(path: str) -> Iterator[Reading]:
+    # One chunk in memory at a time, so replaying a multi-GB log needs no more than a chunk's worth.
+    categories = read_categories(path)
+    instruments = [InstrumentType(label) for label in categories.get("instrument", [])]
+    functions = [MeasurementFunction(label) for label in categories.get("function", [])]
+    idns = categories.get("device_idn", [])
+    units = categories.get("unit", [])
+    raw_responses = categories.get("raw_response", [])
+    columns = ("timestamp_ns", "scheduled_ns", "issued_ns", "slot", "value", *CATEGORY_COLUMNS)
+    for chunk in iter_columnar_chunks(path):
+        # Converted a slice at a time: tolist() on a whole chunk would build millions of Python objects at once.
+        for start in range(0, len(chunk["timestamp_ns"]), READ_BATCH_ROWS):
+            stop = start + READ_BATCH_ROWS
+            texts = chunk[RAW_TEXT_COLUMN][start:stop].tolist() if RAW_TEXT_COLUMN in chunk else repeat(None)
+            rows = zip(*(chunk[name][start:stop].tolist() for name in columns), texts)
+            for timestamp_ns, scheduled_ns, issued_ns, slot, value, instrument, idn, function, unit, raw, text in rows:
+                is_number = value == value
+                if raw != NO_CATEGORY:
+                    raw_response = raw_responses[raw]
+                elif text is not None:
+                    raw_response = text.decode("utf-8", errors="replace")
+                else:
+                    # Older logs did not keep numeric replies verbatim; the value stands in for them.
+                    raw_response = numeric_reply(value) if is_number else ""
+                yield Reading(
+                    timestamp=from_ns(timestamp_ns),
+                    slot_index=slot,
+                    instrument=instruments[instrument],
+                    device_idn=idns[idn],
+                    function=functions[function],
+                    raw_response=raw_response,
+                    value=value if is_number else None,
+                    unit=units[unit],
+                    scheduled_at=from_ns(scheduled_ns),
+                    issued_at=from_ns(issued_ns),
+                )
+
+
+def convert_csv_log(csv_path: str, output_path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    logger = ColumnarLogger(output_path, chunk_rows=chunk_rows)
+    count = 0
+    try:
+        for reading in read_csv_log(csv_path):
+            logger.write_reading(reading)
+            count += 1
+    finally:
+        logger.close()
+    return count
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert CSV measurement logs to chunked columnar logs.")
+    parser.add_argument("csv_path")
+    parser.add_argument("output_path", help="Output directory, conventionally ending in .npylog")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    count = convert_csv_log(args.csv_path, args.output_path, chunk_rows=args.chunk_rows)
+    print(f"Converted {count} readings to {args.output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
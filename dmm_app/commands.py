@@ -1,16 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Final
 
 from dmm_app.models import InstrumentType, MeasurementFunction
 
 
+@dataclass(frozen=True)
+class BurstCommand:
+    # configure_commands may contain "{count}", replaced with the requested sample count.
+    configure_commands: tuple[str, ...]
+    trigger_command: str
+    fetch_command: str
+    max_samples: int
+    sample_interval_seconds: float
+
+    def configure_for(self, samples: int) -> tuple[str, ...]:
+        return tuple(command.format(count=samples) for command in self.configure_commands)
+
+
 @dataclass(frozen=True)
 class MeasurementCommand:
     function: MeasurementFunction
     prepare_commands: tuple[str, ...]
     query_command: str
     unit: str
+    burst: BurstCommand | None = None
 
 
 @dataclass(frozen=True)
@@ -19,6 +34,9 @@ class InstrumentProfile:
     idn_query: str
     idn_expected_tokens: tuple[str, ...]
     commands: dict[MeasurementFunction, MeasurementCommand]
+    supports_compound_query: bool = False
+    # Writes that put the instrument in a safe state (e.g. source output off) when a limit rule trips.
+    safe_state_commands: tuple[str, ...] = ()
 
 
 INSTRUMENT_PROFILES: dict[InstrumentType, InstrumentProfile] = {
@@ -59,10 +77,40 @@ INSTRUMENT_PROFILES: dict[InstrumentType, InstrumentProfile] = {
                 unit="A",
             ),
         },
+        supports_compound_query=True,
+        safe_state_commands=("OUTPut OFF",),
     ),
 }
 
 
+# The SCPI-1999 trigger model (SAMPle/TRIGger/INITiate/FETCh?) that many bench DMMs implement. Neither bundled
+# manual lists it, so no profile carries it; with_burst() adds it on request (SessionConfig.scpi_burst, CLI
+# --scpi-burst) for firmware that has it. The sample timer is set explicitly so readings can be stamped.
+SCPI_BURST_SAMPLE_SECONDS: Final[float] = 0.1
+SCPI_BURST: Final[BurstCommand] = BurstCommand(
+    configure_commands=(
+        "TRIGger:SOURce IMMediate",
+        "SAMPle:SOURce TIMer",
+        f"SAMPle:TIMer {SCPI_BURST_SAMPLE_SECONDS}",
+        "SAMPle:COUNt {count}",
+    ),
+    trigger_command="INITiate",
+    fetch_command="FETCh?",
+    max_samples=512,
+    sample_interval_seconds=SCPI_BURST_SAMPLE_SECONDS,
+)
+
+
+def with_burst(profile: InstrumentProfile, burst: BurstCommand = SCPI_BURST) -> InstrumentProfile:
+    return replace(
+        profile, commands={function: replace(command, burst=burst) for function, command in profile.commands.items()}
+    )
+
+
+def profile_supports_burst(profile: InstrumentProfile) -> bool:
+    return any(command.burst is not None for command in profile.commands.values())
+
+
 def idn_matches_profile(profile: InstrumentProfile, idn: str) -> bool:
     normalized = (idn or "").upper()
     return any(token in normalized for token in profile.idn_expected_tokens)
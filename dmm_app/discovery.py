@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Final
+
+from dmm_app.commands import INSTRUMENT_PROFILES, idn_matches_profile
+from dmm_app.models import InstrumentType, SerialPortInfo, SerialSettings
+from dmm_app.scpi import SCPIClient
+from dmm_app.transport import SERIAL_BAUD_RATES, SerialTransport
+
+# Most bench instruments ship at 9600 or 115200, so those go first; the rest follow fastest-first.
+_COMMON_BAUD_RATES: Final[tuple[int, ...]] = (9600, 115200)
+PROBE_BAUD_ORDER: Final[tuple[int, ...]] = _COMMON_BAUD_RATES + tuple(
+    sorted((rate for rate in SERIAL_BAUD_RATES if rate not in _COMMON_BAUD_RATES), reverse=True)
+)
+PROBE_BASE_TIMEOUT_SECONDS: Final[float] = 0.12
+# Long enough for a typical *IDN? reply; the per-baud timeout scales with how long these bytes take on the wire.
+PROBE_REPLY_BYTES: Final[int] = 64
+MAX_PROBE_WORKERS: Final[int] = 16
+CACHE_FILE_NAME: Final[str] = "discovery.json"
+
+
+@dataclass(frozen=True)
+class DiscoveryResult:
+    port: str
+    baudrate: int
+    instrument: InstrumentType
+    idn: str
+    serial_number: str | None = None
+
+
+def default_cache_path() -> Path:
+    if os.name == "nt":
+        base = Path(os.environ.get("APPDATA") or Path.home())
+    else:
+        base = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+    return base / "scpi-instrument-app" / CACHE_FILE_NAME
+
+
+def probe_timeout(baudrate: int) -> float:
+    return PROBE_BASE_TIMEOUT_SECONDS + PROBE_REPLY_BYTES * 10 / baudrate
+
+
+def match_instrument(idn: str) -> InstrumentType | None:
+    for instrument, profile in INSTRUMENT_PROFILES.items():
+        if idn_matches_profile(profile, idn):
+            return instrument
+    return None
+
+
+class DiscoveryCache:
+    # Keyed by USB serial number when the adapter reports one, so a device is recognised even if the OS
+    # hands it a different port name after replugging; otherwise keyed by port name.
+    def __init__(self, path: Path | None = None):
+        self._path = path or default_cache_path()
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(port: SerialPortInfo) -> str:
+        return f"sn:{port.serial_number}" if port.serial_number else f"port:{port.device}"
+
+    def lookup(self, port: SerialPortInfo) -> DiscoveryResult | None:
+        with self._lock:
+            entry = self._entries.get(self.key(port))
+        if entry is None:
+            return None
+        try:
+            instrument = InstrumentType[entry["instrument"]]
+        except KeyError:
+            return None
+        return DiscoveryResult(
+            port=port.device,
+            baudrate=int(entry["baudrate"]),
+            instrument=instrument,
+            idn=entry.get("idn", ""),
+            serial_number=port.serial_number,
+        )
+
+    def store(self, port: SerialPortInfo, result: DiscoveryResult) -> None:
+        with self._lock:
+            self._entries[self.key(port)] = {
+                "port": result.port,
+                "baudrate": result.baudrate,
+                "instrument": result.instrument.name,
+                "idn": result.idn,
+                "last_seen": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def forget(self, port: SerialPortInfo) -> None:
+        with self._lock:
+            self._entries.pop(self.key(port), None)
+
+    def save(self) -> None:
+        with self._lock:
+            payload = json.dumps(self._entries, indent=1, sort_keys=True)
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self._path.with_suffix(".tmp")
+            temporary.write_text(payload, encoding="utf-8")
+            os.replace(temporary, self._path)
+        except OSError:
+            # The cache only saves time; failing to write it must not break discovery.
+            pass
+
+    def _load(self) -> None:
+        try:
+            stored = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(stored, dict):
+            self._entries = {key: value for key, value in stored.items() if isinstance(value, dict)}
+
+
+def probe_port(
+    port: SerialPortInfo, baud_rates: tuple[int, ...] = PROBE_BAUD_ORDER, preferred_baud: int | None = None
+) -> DiscoveryResult | None:
+    order = list(baud_rates)
+    if preferred_baud is not None:
+        order = [preferred_baud] + [rate for rate in order if rate != preferred_baud]
+    idn_queries = list(dict.fromkeys(profile.idn_query for profile in INSTRUMENT_PROFILES.values()))
+    for baudrate in order:
+        transport = SerialTransport(
+            SerialSettings(port=port.device, baudrate=baudrate, timeout_seconds=probe_timeout(baudrate))
+        )
+        try:
+            transport.open()
+        except Exception:
+            # Busy, missing or permission denied: no other baud rate will do better.
+            return None
+        try:
+            scpi = SCPIClient(transport)
+            for idn_query in idn_queries:
+                idn = scpi.query(idn_query)
+                instrument = match_instrument(idn) if idn else None
+                if instrument is not None:
+                    return DiscoveryResult(
+                        port=port.device,
+                        baudrate=baudrate,
+                        instrument=instrument,
+                        idn=idn,
+                        serial_number=port.serial_number,
+                    )
+        except Exception:
+            pass
+        finally:
+            try:
+                transport.close()
+            except Exception:
+                pass
+    return None
+
+
+def discover_instruments(
+    ports: list[SerialPortInfo] | None = None,
+    cache: DiscoveryCache | None = None,
+    exclude: set[str] | None = None,
+    on_result: Callable[[DiscoveryResult], None] | None = None,
+) -> list[DiscoveryResult]:
+    if ports is None:
+        ports = SerialTransport.describe_serial_ports()
+    candidates = [port for port in ports if port.device not in (exclude or set())]
+    if not candidates:
+        return []
+
+    def probe(port: SerialPortInfo) -> DiscoveryResult | None:
+        cached = cache.lookup(port) if cache is not None else None
+        result = probe_port(port, preferred_baud=cached.baudrate if cached else None)
+        if cache is not None:
+            if result is not None:
+                cache.store(port, result)
+            elif cached is not None:
+                cache.forget(port)
+        if result is not None and on_result is not None:
+            on_result(result)
+        return result
+
+    # Each port is probed on its own thread; baud rates within one port are tried in sequence.
+    with ThreadPoolExecutor(max_workers=min(MAX_PROBE_WORKERS, len(candidates))) as executor:
+        results = [result for result in executor.map(probe, candidates) if result is not None]
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def cached_instruments(cache: DiscoveryCache, ports: list[SerialPortInfo] | None = None) -> list[DiscoveryResult]:
+    # No I/O: resolves cached devices to their current port names so known instruments are ready at launch.
+    if ports is None:
+        ports = SerialTransport.describe_serial_ports()
+    return [result for result in (cache.lookup(port) for port in ports) if result is not None]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Probe serial ports for supported SCPI instruments.")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor update the discovery cache")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else DiscoveryCache()
+    results = discover_instruments(cache=cache)
+    if args.json:
+        print(json.dumps([{**asdict(result), "instrument": result.instrument.name} for result in results], indent=1))
+    else:
+        for result in results:
+            print(f"{result.port}\t{result.baudrate}\t{result.instrument.value}\t{result.idn}")
+        if not results:
+            print("No supported instruments found.", file=sys.stderr)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-import queue
+import os
+from collections import deque
 from dataclasses import dataclass
+import threading
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QSignalBlocker, QTimer
+from PySide6.QtGui import QFontDatabase
 from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
@@ -16,20 +20,81 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMainWindow,
     QMessageBox,
+    QPlainTextEdit,
     QPushButton,
-    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from dmm_app.commands import INSTRUMENT_PROFILES, InstrumentProfile, idn_matches_profile
-from dmm_app.logging_util import CsvLogger
-from dmm_app.models import InstrumentType, MeasurementFunction, Reading, SerialSettings
-from dmm_app.poller import PollRequest, PollingWorker, parse_primary_value
-from dmm_app.scpi import SCPIClient
-from dmm_app.transport import SerialTransport
+from dmm_app.acquisition import AcquisitionManager, SessionConfig
+from dmm_app.alarms import TRIP, AlarmEvent, LimitRule, load_rules
+from dmm_app.bridge import DEFAULT_CRITICAL_EVENTS, BridgeStats, ReadingBridge
+from dmm_app.commands import INSTRUMENT_PROFILES, InstrumentProfile, profile_supports_burst
+from dmm_app.discovery import DiscoveryCache, DiscoveryResult, cached_instruments, discover_instruments
+from dmm_app.logging_util import COLUMNAR_LOG_SUFFIX, BackgroundLogger, create_logger
+from dmm_app.metrics import PROMETHEUS_SUFFIX, AcquisitionMetrics, Histogram, write_metrics
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading, SerialPortInfo, SerialSettings
+from dmm_app.poller import CycleStats, PollRequest, build_poll_requests, parse_primary_value
+from dmm_app.port_watcher import PORT_REMOVED, PortEvent, PortWatcher
+from dmm_app.recovery import RecoveryEvent, RecoveryPolicy
+from dmm_app.replay import AS_FAST_AS_POSSIBLE, ReplaySummary, ReplayWorker, log_layout
+from dmm_app.running_stats import ReadingStatistics, format_statistics
+from dmm_app.steps import Query, QueryMany, Write
+from dmm_app.transport import (
+    SOCKET_ADDRESS_PREFIX,
+    SERIAL_BAUD_RATES,
+    SOCKET_POOL,
+    AsyncSerialTransport,
+    SerialTransport,
+    Transport,
+    parse_socket_address,
+)
+
+if TYPE_CHECKING:
+    from dmm_app.trend_plot import TrendPlot
+
+BAUD_RATES = [str(rate) for rate in SERIAL_BAUD_RATES]
+OUTPUT_MAX_LINES = 5000
+METRICS_REFRESH_MS = 1000
+REPLAY_SPEEDS = {
+    "Real time": 1.0,
+    "10x": 10.0,
+    "100x": 100.0,
+    "1000x": 1000.0,
+    "As fast as possible": AS_FAST_AS_POSSIBLE,
+}
+# The window drives one instrument, as a single session of the manager the CLI uses for several.
+GUI_SESSION = "gui"
+# AsyncSerialTransport waits on the port's file descriptor, which Windows event loops cannot do.
+ASYNCIO_SUPPORTED = os.name != "nt"
+
+
+def _open_transport(settings: SerialSettings) -> Transport:
+    # tcp:// instruments share one pooled connection; the manager hands it back to the pool on disconnect.
+    socket_settings = parse_socket_address(settings.port)
+    if socket_settings is not None:
+        return SOCKET_POOL.acquire(socket_settings)
+    return SerialTransport(settings)
+
+
+class OutputConsole(QPlainTextEdit):
+    def __init__(self, max_lines: int = OUTPUT_MAX_LINES):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        # Pending lines beyond the block limit would be trimmed on insert anyway, so cap them here too.
+        self._pending: deque[str] = deque(maxlen=max_lines)
 
-BAUD_RATES = ["1200", "2400", "4800", "9600", "19200", "38400", "57600", "115200"]
+    def append_line(self, text: str) -> None:
+        self._pending.append(text)
+
+    def flush_pending(self) -> None:
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending.clear()
+        self.appendPlainText(text)
 
 
 @dataclass
@@ -37,8 +102,10 @@ class MeasurementRow:
     container: QWidget
     function_combo: QComboBox
     latest_label: QLabel
+    stats_label: QLabel
     remove_button: QPushButton
     last_valid_function: MeasurementFunction
+    plot: TrendPlot | None = None
 
 
 class DMMAppWindow(QMainWindow):
@@ -48,23 +115,49 @@ class DMMAppWindow(QMainWindow):
         self.resize(980, 640)
         self.setMinimumSize(860, 540)
 
-        self._transport: SerialTransport | None = None
-        self._scpi: SCPIClient | None = None
-        self._poller: PollingWorker | None = None
-        self._logger: CsvLogger | None = None
+        # Exists while connected; the session inside it tracks the port (and follows a renamed adapter).
+        self._acquisition: AcquisitionManager | None = None
+        self._replay: ReplayWorker | None = None
+        self._logger: BackgroundLogger | None = None
+        self._reported_log_drops = 0
         self._device_idn: str = "UNKNOWN"
-        self._events: queue.Queue[tuple[str, object]] = queue.Queue()
+        # Besides errors and alarms, the one-shot results that re-enable controls or finish startup must arrive.
+        self._bridge = ReadingBridge(
+            critical_events=DEFAULT_CRITICAL_EVENTS | {"ports", "trend", "discovery", "replay"}
+        )
+        self._shown_bridge_stats = BridgeStats(published=0, coalesced=0, dropped=0, sink_errors=0)
         self._measurement_rows: list[MeasurementRow] = []
+        self._reported_overruns = 0
+        self._metrics: AcquisitionMetrics | None = None
+        self._statistics = ReadingStatistics()
+        self._status_before_outage = ""
+        # Loaded with the first port scan, off the GUI thread.
+        self._discovery_cache: DiscoveryCache | None = None
+        self._discovery_thread: threading.Thread | None = None
+        self._port_scan_thread: threading.Thread | None = None
+        # Started after the first scan and seeded with its result, so the port list is only edited from then on.
+        self._port_watcher: PortWatcher | None = None
+        # Set once numpy and the plot widget are imported; rows created earlier get their plot then.
+        self._trend_plot_class: type[TrendPlot] | None = None
+        self._startup_pending = {"ports", "trend"}
+        self._alarm_rules: tuple[LimitRule, ...] = ()
+        self._tripped_alarms: dict[tuple[str, int], AlarmEvent] = {}
 
         self._build_ui()
-        self._refresh_ports()
         self._reload_functions_for_instrument()
+        # Queued behind the first show/paint so the background imports do not compete with it for the GIL.
+        QTimer.singleShot(0, self._start_background_startup)
 
         self._event_timer = QTimer(self)
         self._event_timer.setInterval(100)
         self._event_timer.timeout.connect(self._process_events)
         self._event_timer.start()
 
+        self._metrics_timer = QTimer(self)
+        self._metrics_timer.setInterval(METRICS_REFRESH_MS)
+        self._metrics_timer.timeout.connect(self._show_metrics)
+        self._metrics_timer.start()
+
     def _build_ui(self) -> None:
         root = QWidget(self)
         self.setCentralWidget(root)
@@ -81,14 +174,22 @@ class DMMAppWindow(QMainWindow):
         self._instrument_combo.currentIndexChanged.connect(self._on_instrument_changed)
         connection_layout.addWidget(self._instrument_combo, 1, 0)
 
-        connection_layout.addWidget(QLabel("Serial Port"), 0, 1)
+        connection_layout.addWidget(QLabel("Port"), 0, 1)
         self._port_combo = QComboBox()
+        self._port_combo.setEditable(True)
         self._port_combo.setMinimumWidth(260)
+        self._port_combo.setToolTip("Serial device, or tcp://host[:port] for raw SCPI sockets (default port 5025).")
         connection_layout.addWidget(self._port_combo, 1, 1)
 
+        port_buttons = QHBoxLayout()
         refresh_button = QPushButton("Refresh")
         refresh_button.clicked.connect(self._refresh_ports)
-        connection_layout.addWidget(refresh_button, 1, 2)
+        port_buttons.addWidget(refresh_button)
+        self._discover_button = QPushButton("Discover")
+        self._discover_button.setToolTip("Probe every serial port and baud rate for a supported instrument.")
+        self._discover_button.clicked.connect(self._discover_instruments)
+        port_buttons.addWidget(self._discover_button)
+        connection_layout.addLayout(port_buttons, 1, 2)
 
         connection_layout.addWidget(QLabel("Baud Rate"), 0, 3)
         self._baud_combo = QComboBox()
@@ -106,6 +207,13 @@ class DMMAppWindow(QMainWindow):
 
         self._status_label = QLabel("Disconnected")
         connection_layout.addWidget(self._status_label, 1, 6)
+
+        self._asyncio_checkbox = QCheckBox("asyncio")
+        self._asyncio_checkbox.setToolTip(
+            "Poll on the shared asyncio event loop instead of a polling thread (serial ports on Linux/macOS only)."
+        )
+        self._asyncio_checkbox.setEnabled(ASYNCIO_SUPPORTED)
+        connection_layout.addWidget(self._asyncio_checkbox, 0, 4)
         root_layout.addWidget(connection_box)
 
         measure_box = QGroupBox("Measurement")
@@ -128,6 +236,11 @@ class DMMAppWindow(QMainWindow):
         self._interval_input.setMaximumWidth(100)
         controls.addWidget(self._interval_input)
 
+        controls.addWidget(QLabel("Samples/cycle"))
+        self._burst_input = QLineEdit("1")
+        self._burst_input.setMaximumWidth(70)
+        controls.addWidget(self._burst_input)
+
         self._start_button = QPushButton("Start")
         self._start_button.clicked.connect(self._start_polling)
         controls.addWidget(self._start_button)
@@ -136,6 +249,13 @@ class DMMAppWindow(QMainWindow):
         self._stop_button.clicked.connect(self._stop_polling)
         controls.addWidget(self._stop_button)
 
+        self._reconnect_checkbox = QCheckBox("Auto-reconnect")
+        self._reconnect_checkbox.setChecked(True)
+        self._reconnect_checkbox.setToolTip(
+            "Reopen the port, re-validate *IDN? and resume polling after a connection error."
+        )
+        controls.addWidget(self._reconnect_checkbox)
+
         self._snapshot_button = QPushButton("Snapshot")
         self._snapshot_button.clicked.connect(self._take_snapshot)
         controls.addWidget(self._snapshot_button)
@@ -161,26 +281,240 @@ class DMMAppWindow(QMainWindow):
         logging_layout.addWidget(self._log_path_label, stretch=1)
         root_layout.addWidget(logging_box)
 
+        alarms_box = QGroupBox("Alarms")
+        alarms_layout = QHBoxLayout(alarms_box)
+        self._alarms_checkbox = QCheckBox("Enable alarms")
+        self._alarms_checkbox.setToolTip(
+            "Check limit rules on every reading in the acquisition thread; tripped rules can switch the output off."
+        )
+        self._alarms_checkbox.setEnabled(False)
+        alarms_layout.addWidget(self._alarms_checkbox)
+        self._alarm_rules_button = QPushButton("Load rules...")
+        self._alarm_rules_button.clicked.connect(self._choose_alarm_rules)
+        alarms_layout.addWidget(self._alarm_rules_button)
+        self._alarm_rules_label = QLabel("No rules loaded")
+        alarms_layout.addWidget(self._alarm_rules_label, stretch=1)
+        root_layout.addWidget(alarms_box)
+
+        replay_box = QGroupBox("Replay")
+        replay_layout = QHBoxLayout(replay_box)
+        self._replay_button = QPushButton("Replay log...")
+        self._replay_button.setToolTip("Play a recorded CSV or .npylog log through the display, plots and statistics.")
+        self._replay_button.clicked.connect(self._start_replay)
+        replay_layout.addWidget(self._replay_button)
+        replay_layout.addWidget(QLabel("Speed"))
+        self._replay_speed_combo = QComboBox()
+        self._replay_speed_combo.addItems(list(REPLAY_SPEEDS))
+        self._replay_speed_combo.setCurrentText("100x")
+        replay_layout.addWidget(self._replay_speed_combo)
+        replay_layout.addStretch(1)
+        root_layout.addWidget(replay_box)
+
+        metrics_box = QGroupBox("Timing metrics")
+        metrics_layout = QVBoxLayout(metrics_box)
+        metrics_controls = QHBoxLayout()
+        self._metrics_checkbox = QCheckBox("Collect timing metrics")
+        self._metrics_checkbox.setToolTip("Per-query write, first-byte and read times, lock waits and cycle timing.")
+        self._metrics_checkbox.toggled.connect(self._toggle_metrics)
+        metrics_controls.addWidget(self._metrics_checkbox)
+        self._metrics_reset_button = QPushButton("Reset")
+        self._metrics_reset_button.clicked.connect(self._reset_metrics)
+        metrics_controls.addWidget(self._metrics_reset_button)
+        self._metrics_export_button = QPushButton("Export")
+        self._metrics_export_button.clicked.connect(self._export_metrics)
+        metrics_controls.addWidget(self._metrics_export_button)
+        metrics_controls.addStretch(1)
+        metrics_layout.addLayout(metrics_controls)
+        self._metrics_label = QLabel("")
+        self._metrics_label.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self._metrics_label.setVisible(False)
+        metrics_layout.addWidget(self._metrics_label)
+        self._metrics_reset_button.setEnabled(False)
+        self._metrics_export_button.setEnabled(False)
+        root_layout.addWidget(metrics_box)
+
         output_box = QGroupBox("Output")
         output_layout = QVBoxLayout(output_box)
-        self._output = QTextEdit()
-        self._output.setReadOnly(True)
+        self._output = OutputConsole()
         output_layout.addWidget(self._output)
+        self._bridge_stats_label = QLabel("")
+        self.statusBar().addPermanentWidget(self._bridge_stats_label)
         root_layout.addWidget(output_box, stretch=1)
 
+    @property
+    def startup_finished(self) -> bool:
+        return not self._startup_pending
+
+    def _start_background_startup(self) -> None:
+        # Nothing here is needed to draw the first frame: port enumeration can take seconds on machines with many
+        # tty devices, and numpy (for the trend plots) is the largest import. Results arrive as bridge events.
+        self._refresh_ports()
+
+        def load_trend_support() -> None:
+            try:
+                from dmm_app.trend import TREND_AVAILABLE
+                from dmm_app.trend_plot import TrendPlot
+
+                self._bridge.publish_event("trend", TrendPlot if TREND_AVAILABLE else None)
+            except Exception:
+                self._bridge.publish_event("trend", None)
+
+        threading.Thread(target=load_trend_support, name="trend-import", daemon=True).start()
+
     def _refresh_ports(self) -> None:
-        ports = SerialTransport.list_serial_ports()
+        if self._port_watcher is not None and self._port_watcher.is_alive():
+            # Hotplug changes arrive by themselves; this only catches anything the watcher could not see.
+            self._port_watcher.rescan()
+            return
+        if self._port_scan_thread is not None and self._port_scan_thread.is_alive():
+            return
+        cache = self._discovery_cache
+
+        def run() -> None:
+            try:
+                scan_cache = cache if cache is not None else DiscoveryCache()
+                port_infos = SerialTransport.describe_serial_ports()
+                known = cached_instruments(scan_cache, port_infos)
+                self._bridge.publish_event("ports", (port_infos, known, scan_cache))
+            except Exception as exc:
+                self._bridge.publish_event("ports", exc)
+
+        self._port_scan_thread = threading.Thread(target=run, name="port-scan", daemon=True)
+        self._port_scan_thread.start()
+
+    def _show_ports(
+        self, outcome: tuple[list[SerialPortInfo], list[DiscoveryResult], DiscoveryCache] | Exception
+    ) -> None:
+        first_scan = "ports" in self._startup_pending
+        self._startup_pending.discard("ports")
+        if first_scan:
+            self._start_port_watcher(None if isinstance(outcome, Exception) else outcome[0])
+        if isinstance(outcome, Exception):
+            self._append_output(f"Port enumeration failed: {outcome}")
+            return
+        port_infos, known, cache = outcome
+        if self._discovery_cache is None:
+            self._discovery_cache = cache
+        ports = [port.device for port in port_infos]
         selected = self._port_combo.currentText()
-        self._port_combo.clear()
-        self._port_combo.addItems(ports)
-        if selected and selected in ports:
+        # The scan finishes after the window is up, so a port typed (or connected) meanwhile is kept.
+        keep_typed = first_scan or self._is_connected()
+        keep_selected = bool(selected) and selected not in ports and (
+            keep_typed or selected.lower().startswith(SOCKET_ADDRESS_PREFIX)
+        )
+        # Only ports that changed are removed or added, so an open dropdown and the entries in it stay put.
+        wanted = set(ports) | ({selected} if keep_selected else set())
+        for index in reversed(range(self._port_combo.count())):
+            if self._port_combo.itemText(index) not in wanted:
+                self._port_combo.removeItem(index)
+        listed = {self._port_combo.itemText(index) for index in range(self._port_combo.count())}
+        for port in [*ports, selected] if keep_selected else ports:
+            if port not in listed:
+                self._port_combo.addItem(port)
+        if keep_selected:
+            self._port_combo.setCurrentText(selected)
+        elif selected and selected in ports:
             self._port_combo.setCurrentText(selected)
         elif ports:
             self._port_combo.setCurrentIndex(0)
+            # Previously discovered instruments are matched by USB serial number, so they are preselected
+            # even if they came back under a different port name.
+            if known and not self._is_connected():
+                preferred = self._preferred_discovery(known)
+                self._apply_discovery(preferred)
+                self._append_output(f"Selected known {preferred.instrument.value} on {preferred.port}.")
         self._append_output(f"Port list refreshed ({len(ports)} found).")
 
+    def _start_port_watcher(self, initial: list[SerialPortInfo] | None) -> None:
+        self._port_watcher = PortWatcher(lambda event: self._bridge.publish_event("port", event), initial=initial)
+        self._port_watcher.start()
+
+    def _apply_port_event(self, event: PortEvent) -> None:
+        device = event.port.device
+        connected = self._acquisition.session(GUI_SESSION).port if self._acquisition is not None else None
+        # The manager remembers the unplugged port and, while polling, wakes the reconnect when it returns.
+        woken = self._acquisition.handle_port_event(event) if self._acquisition is not None else []
+        if event.kind == PORT_REMOVED:
+            if device == connected:
+                # Kept in the list: the adapter usually comes back under the same name.
+                self._append_output(f"Port removed: {device} (connected instrument unplugged).")
+                return
+            index = self._port_combo.findText(device)
+            if index >= 0:
+                self._port_combo.removeItem(index)
+            self._append_output(f"Port removed: {device}.")
+            return
+
+        if self._port_combo.findText(device) < 0:
+            self._port_combo.addItem(device)
+        known = self._discovery_cache.lookup(event.port) if self._discovery_cache is not None else None
+        self._append_output(f"Port added: {device}" + (f" (known {known.instrument.value})." if known else "."))
+        if connected is None:
+            if known is not None and not self._is_connected():
+                self._apply_discovery(known)
+                self._append_output(f"Selected known {known.instrument.value} on {known.port}.")
+            return
+        if not woken:
+            return
+        if device != connected:
+            # Same adapter (by USB serial number) under a new name: follow it.
+            index = self._port_combo.findText(connected)
+            if index >= 0:
+                self._port_combo.removeItem(index)
+            self._port_combo.setCurrentText(device)
+            self._status_before_outage = self._status_before_outage.replace(connected, device)
+            self._append_output(f"Instrument reappeared as {device}; reconnecting now.")
+        else:
+            self._append_output(f"Instrument reappeared on {device}; reconnecting now.")
+
+    def _discover_instruments(self) -> None:
+        if self._discovery_thread is not None and self._discovery_thread.is_alive():
+            return
+        # The connected port is busy and would only fail to open.
+        exclude = {self._port_combo.currentText().strip()} if self._is_connected() else set()
+        if self._discovery_cache is None:
+            self._discovery_cache = DiscoveryCache()
+        cache = self._discovery_cache
+
+        def run() -> None:
+            try:
+                self._bridge.publish_event("discovery", discover_instruments(cache=cache, exclude=exclude))
+            except Exception as exc:
+                self._bridge.publish_event("discovery", exc)
+
+        self._discover_button.setEnabled(False)
+        self._append_output("Probing serial ports for instruments...")
+        self._discovery_thread = threading.Thread(target=run, name="port-discovery", daemon=True)
+        self._discovery_thread.start()
+
+    def _show_discovery(self, outcome: list[DiscoveryResult] | Exception) -> None:
+        self._discover_button.setEnabled(True)
+        if isinstance(outcome, Exception):
+            self._append_output(f"Discovery failed: {outcome}")
+            return
+        if not outcome:
+            self._append_output("Discovery found no supported instruments.")
+            return
+        for result in outcome:
+            self._append_output(f"Found {result.instrument.value} on {result.port} @ {result.baudrate}: {result.idn}")
+        if not self._is_connected():
+            self._apply_discovery(self._preferred_discovery(outcome))
+
+    def _preferred_discovery(self, results: list[DiscoveryResult]) -> DiscoveryResult:
+        instrument = self._selected_instrument()
+        return next((result for result in results if result.instrument == instrument), results[0])
+
+    def _apply_discovery(self, result: DiscoveryResult) -> None:
+        self._instrument_combo.setCurrentText(result.instrument.value)
+        if self._port_combo.findText(result.port) < 0:
+            self._port_combo.addItem(result.port)
+        self._port_combo.setCurrentText(result.port)
+        if self._baud_combo.findText(str(result.baudrate)) < 0:
+            self._baud_combo.addItem(str(result.baudrate))
+        self._baud_combo.setCurrentText(str(result.baudrate))
+
     def _toggle_connection(self) -> None:
-        if self._transport and self._transport.is_open:
+        if self._is_connected():
             self._disconnect()
         else:
             self._connect()
@@ -192,7 +526,7 @@ class DMMAppWindow(QMainWindow):
         return INSTRUMENT_PROFILES[self._selected_instrument()]
 
     def _on_instrument_changed(self, _: int) -> None:
-        if self._transport and self._transport.is_open:
+        if self._is_connected():
             return
         self._reload_functions_for_instrument()
 
@@ -227,8 +561,11 @@ class DMMAppWindow(QMainWindow):
                 return
 
         row_widget = QWidget()
-        row_layout = QHBoxLayout(row_widget)
-        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_box = QVBoxLayout(row_widget)
+        row_box.setContentsMargins(0, 0, 0, 0)
+        row_box.setSpacing(4)
+        row_layout = QHBoxLayout()
+        row_box.addLayout(row_layout)
         row_layout.setSpacing(8)
 
         function_combo = QComboBox()
@@ -245,12 +582,27 @@ class DMMAppWindow(QMainWindow):
         remove_button = QPushButton("Remove")
         row_layout.addWidget(remove_button)
 
+        # On its own line under the latest value: the summary is too wide to share the control row.
+        stats_label = QLabel("")
+        stats_label.setWordWrap(True)
+        stats_label.setToolTip(
+            "Whole run: count, mean, standard deviation, min/max, P2 percentile estimates and linear drift.\n"
+            "Ripple is peak-to-peak over the most recent samples; EWMA tracks the smoothed level."
+        )
+        row_box.addWidget(stats_label)
+
+        plot = self._trend_plot_class() if self._trend_plot_class is not None else None
+        if plot is not None:
+            row_box.addWidget(plot)
+
         row = MeasurementRow(
             container=row_widget,
             function_combo=function_combo,
             latest_label=latest_label,
+            stats_label=stats_label,
             remove_button=remove_button,
             last_valid_function=function,
+            plot=plot,
         )
         remove_button.clicked.connect(lambda: self._remove_measurement_row(row))
         function_combo.currentIndexChanged.connect(lambda _idx, r=row: self._on_measurement_function_changed(r))
@@ -259,8 +611,20 @@ class DMMAppWindow(QMainWindow):
         self._measurement_rows_layout.addWidget(row_widget)
         self._refresh_measurement_controls()
 
+    def _enable_trend_plots(self, plot_class: type[TrendPlot] | None) -> None:
+        self._startup_pending.discard("trend")
+        self._trend_plot_class = plot_class
+        if plot_class is None:
+            return
+        for row in self._measurement_rows:
+            if row.plot is None:
+                row.plot = plot_class()
+                row.container.layout().addWidget(row.plot)
+        if self._is_polling():
+            self._bridge.set_sink("trend", self._make_trend_sink())
+
     def _add_measurement(self) -> None:
-        if self._poller and self._poller.is_alive():
+        if self._is_polling():
             return
         if self._selected_instrument() == InstrumentType.MP730889:
             QMessageBox.information(
@@ -272,7 +636,7 @@ class DMMAppWindow(QMainWindow):
         self._add_measurement_row()
 
     def _remove_measurement_row(self, row: MeasurementRow) -> None:
-        if self._poller and self._poller.is_alive():
+        if self._is_polling():
             return
         if len(self._measurement_rows) <= 1:
             return
@@ -285,7 +649,7 @@ class DMMAppWindow(QMainWindow):
 
     def _refresh_measurement_controls(self) -> None:
         profile = self._selected_profile()
-        is_polling = bool(self._poller and self._poller.is_alive())
+        is_polling = self._is_polling()
         row_count = len(self._measurement_rows)
         max_rows = len(profile.commands)
         can_multi = self._selected_instrument() == InstrumentType.OWON_SPE6103
@@ -303,9 +667,31 @@ class DMMAppWindow(QMainWindow):
             row.function_combo.setEnabled(not is_polling)
             row.remove_button.setEnabled(can_multi and (not is_polling) and row_count > 1)
 
+        can_burst = profile_supports_burst(profile)
+        self._burst_input.setEnabled(can_burst and not is_polling)
+        self._burst_input.setToolTip(
+            "Readings buffered by the instrument and fetched in one reply per cycle."
+            if can_burst
+            else f"{profile.instrument.value} does not support buffered acquisition; one reading per cycle."
+        )
+
+        # Cycle metrics are bound to the worker when polling starts, so collection only toggles between runs.
+        self._metrics_checkbox.setEnabled(not is_polling)
+        self._reconnect_checkbox.setEnabled(not is_polling)
+        # Rules are handed to the worker at start, like metrics.
+        self._alarms_checkbox.setEnabled(bool(self._alarm_rules) and not is_polling)
+        self._alarm_rules_button.setEnabled(not is_polling)
+
         self._start_button.setEnabled(not is_polling)
         self._stop_button.setEnabled(is_polling)
         self._snapshot_button.setEnabled(not is_polling)
+        self._replay_button.setEnabled(not is_polling)
+        self._replay_speed_combo.setEnabled(not is_polling)
+        is_replaying = self._replay is not None and self._replay.is_alive()
+        self._connect_button.setEnabled(not is_replaying)
+        self._log_checkbox.setEnabled(not is_replaying)
+        if not self._is_connected():
+            self._instrument_combo.setEnabled(not is_replaying)
 
     def _has_function_in_other_rows(
         self, target_row: MeasurementRow, function: MeasurementFunction
@@ -329,6 +715,9 @@ class DMMAppWindow(QMainWindow):
             )
             return
         row.last_valid_function = selected
+        if row.plot is not None:
+            row.plot.clear()
+        row.stats_label.setText("")
         self._refresh_measurement_controls()
 
     def _validate_unique_measurement_rows(self) -> bool:
@@ -351,11 +740,11 @@ class DMMAppWindow(QMainWindow):
         return False
 
     def _query_device_idn(self, announce: bool = True) -> str:
-        if not self._scpi:
+        if self._acquisition is None:
             return "UNKNOWN"
         profile = self._selected_profile()
         try:
-            response = self._scpi.query(profile.idn_query).strip()
+            response = self._acquisition.request(GUI_SESSION, Query(profile.idn_query)).strip()
             self._device_idn = response if response else "UNKNOWN"
             if announce:
                 self._append_output(f"{profile.idn_query} -> {self._device_idn}")
@@ -366,122 +755,114 @@ class DMMAppWindow(QMainWindow):
                 self._append_output(f"{profile.idn_query} failed: {exc}")
             return self._device_idn
 
-    def _validate_device_identity(self, profile_instrument: InstrumentType) -> bool:
-        profile = INSTRUMENT_PROFILES[profile_instrument]
-        if self._device_idn == "UNKNOWN":
-            QMessageBox.critical(
-                self,
-                "Identity Validation Failed",
-                "Unable to read device identity. Check cabling/SCPI mode and try again.",
-            )
-            return False
-        if idn_matches_profile(profile, self._device_idn):
-            return True
-
-        expected = ", ".join(profile.idn_expected_tokens)
-        QMessageBox.critical(
-            self,
-            "Instrument Mismatch",
-            (
-                "Selected instrument does not match connected device.\n\n"
-                f"Selected: {profile.instrument.value}\n"
-                f"Expected ID contains one of: {expected}\n"
-                f"Received ID: {self._device_idn}"
-            ),
-        )
-        return False
-
     def _connect(self) -> None:
         port = self._port_combo.currentText().strip()
         if not port:
             QMessageBox.critical(self, "Connection", "Select a serial port before connecting.")
             return
+        try:
+            socket_settings = parse_socket_address(port)
+        except ValueError as exc:
+            QMessageBox.critical(self, "Connection", str(exc))
+            return
         try:
             baud = int(self._baud_combo.currentText().strip())
         except ValueError:
             QMessageBox.critical(self, "Connection", "Baud rate must be an integer.")
             return
 
+        use_asyncio = self._asyncio_checkbox.isChecked()
+        if use_asyncio and socket_settings is not None:
+            QMessageBox.critical(self, "Connection", "asyncio polling needs a serial port; clear it for tcp:// links.")
+            return
+
+        self._release_acquisition()
+        instrument = self._selected_instrument()
+        acquisition = AcquisitionManager(
+            on_reading=self._bridge.publish_reading,
+            on_error=lambda name, err: self._bridge.publish_event("error", err),
+            on_cycle=lambda name, stats: self._bridge.publish_event("cycle", stats, coalesce=True),
+            transport_factory=_open_transport,
+            on_recovery=lambda name, event: self._bridge.publish_event("recovery", event),
+            on_alarm=lambda name, event: self._bridge.publish_event("alarm", event),
+            # The session then runs as an AsyncPollingWorker on the manager's EventLoopThread.
+            async_transport_factory=AsyncSerialTransport if use_asyncio else None,
+        )
         try:
-            settings = SerialSettings(port=port, baudrate=baud)
-            self._transport = SerialTransport(settings)
-            self._transport.open()
-            self._scpi = SCPIClient(self._transport)
-            self._connect_button.setText("Disconnect")
-            self._instrument_combo.setEnabled(False)
-            instrument = self._selected_instrument()
-            self._query_device_idn(announce=False)
-            if not self._validate_device_identity(instrument):
-                self._disconnect()
-                return
-            self._status_label.setText(f"Connected: {port} @ {baud} ({instrument.value})")
-            self._append_output(f"Connected to {port} at {baud} baud for {instrument.value}.")
-            self._append_output(f"Device ID: {self._device_idn}")
-        except Exception as exc:  # pragma: no cover - hardware dependency
-            self._transport = None
-            self._scpi = None
+            # Identifies the device and rejects it if it does not match the selected profile.
+            session = acquisition.add_session(
+                SessionConfig(
+                    name=GUI_SESSION,
+                    instrument=instrument,
+                    settings=SerialSettings(port=port, baudrate=baud),
+                    functions=tuple(self._selected_functions()),
+                )
+            )
+        except Exception as exc:
+            acquisition.close()
             QMessageBox.critical(self, "Connection failed", str(exc))
             self._status_label.setText("Disconnected")
-
+            self._refresh_measurement_controls()
+            return
+        acquisition.set_session_metrics(GUI_SESSION, self._metrics)
+        self._acquisition = acquisition
+        self._device_idn = session.device_idn
+        self._connect_button.setText("Disconnect")
+        self._instrument_combo.setEnabled(False)
+        self._asyncio_checkbox.setEnabled(False)
+        link = port if socket_settings is not None else f"{port} @ {baud}"
+        self._status_label.setText(f"Connected: {link} ({instrument.value})")
+        self._append_output(
+            f"Connected to {link} for {instrument.value}" + (" (asyncio event loop)." if use_asyncio else ".")
+        )
+        self._append_output(f"Device ID: {self._device_idn}")
         self._refresh_measurement_controls()
 
     def _disconnect(self) -> None:
         self._stop_polling()
-        if self._transport:
-            try:
-                self._transport.close()
-            except Exception:
-                pass
-        self._transport = None
-        self._scpi = None
+        self._release_acquisition()
         self._device_idn = "UNKNOWN"
         self._connect_button.setText("Connect")
         self._instrument_combo.setEnabled(True)
+        self._asyncio_checkbox.setEnabled(ASYNCIO_SUPPORTED)
         self._status_label.setText("Disconnected")
         self._append_output("Disconnected.")
         self._refresh_measurement_controls()
 
+    def _release_acquisition(self) -> None:
+        if self._acquisition is not None:
+            self._acquisition.close()
+        self._acquisition = None
+
+    def _is_connected(self) -> bool:
+        return self._acquisition is not None
+
+    def _is_polling(self) -> bool:
+        if self._replay is not None and self._replay.is_alive():
+            return True
+        return self._acquisition is not None and self._acquisition.is_running
+
     def _request_idn(self) -> None:
-        if not self._scpi:
+        if self._acquisition is None:
             QMessageBox.warning(self, "Not connected", "Connect to the instrument first.")
             return
         idn = self._query_device_idn(announce=True)
         if idn == "UNKNOWN":
             QMessageBox.critical(self, "ID query failed", "Failed to query device ID.")
 
-    def _build_poll_requests(self, profile: InstrumentProfile) -> tuple[list[PollRequest], list[str]]:
-        requests: list[PollRequest] = []
-        setup_commands: list[str] = []
-
-        for slot_index, row in enumerate(self._measurement_rows):
-            function = MeasurementFunction(row.function_combo.currentText())
-            command = profile.commands.get(function)
-            if command is None:
-                raise ValueError(f"{function.value} is not available for {profile.instrument.value}.")
-            requests.append(
-                PollRequest(
-                    slot_index=slot_index,
-                    function=function,
-                    query_command=command.query_command,
-                    unit=command.unit,
-                )
-            )
-            setup_commands.extend(command.prepare_commands)
+    def _selected_functions(self) -> list[MeasurementFunction]:
+        return [MeasurementFunction(row.function_combo.currentText()) for row in self._measurement_rows]
 
-        deduped_setup: list[str] = []
-        seen: set[str] = set()
-        for setup_command in setup_commands:
-            if setup_command in seen:
-                continue
-            seen.add(setup_command)
-            deduped_setup.append(setup_command)
-        return requests, deduped_setup
+    def _build_poll_requests(
+        self, profile: InstrumentProfile, burst_samples: int = 0
+    ) -> tuple[list[PollRequest], list[str]]:
+        return build_poll_requests(profile, self._selected_functions(), burst_samples=burst_samples)
 
     def _start_polling(self) -> None:
-        if not self._scpi:
+        if self._acquisition is None:
             QMessageBox.warning(self, "Not connected", "Connect to the instrument before starting polling.")
             return
-        if self._poller and self._poller.is_alive():
+        if self._is_polling():
             return
         if not self._validate_unique_measurement_rows():
             return
@@ -495,40 +876,138 @@ class DMMAppWindow(QMainWindow):
             return
 
         profile = self._selected_profile()
+        burst_samples = 0
+        if profile_supports_burst(profile):
+            try:
+                burst_samples = int(self._burst_input.text().strip())
+                if burst_samples < 1:
+                    raise ValueError
+            except ValueError:
+                QMessageBox.critical(self, "Samples/cycle", "Samples per cycle must be a positive integer.")
+                return
+
+        # Rows, burst length and rules may have changed since the last run; the connection is kept.
         try:
-            requests, setup_commands = self._build_poll_requests(profile)
-            for setup_command in setup_commands:
-                self._scpi.write(setup_command)
-        except Exception as exc:  # pragma: no cover - hardware dependency
+            session = self._acquisition.reconfigure_session(
+                GUI_SESSION,
+                functions=tuple(self._selected_functions()),
+                burst_samples=burst_samples,
+                alarm_rules=self._alarm_rules if self._alarms_checkbox.isChecked() else (),
+            )
+        except ValueError as exc:
             QMessageBox.critical(self, "Configuration failed", str(exc))
             return
+        self._acquisition.recovery_policy = RecoveryPolicy() if self._reconnect_checkbox.isChecked() else None
+        self._tripped_alarms.clear()
+        self.statusBar().clearMessage()
 
-        self._poller = PollingWorker(
-            scpi=self._scpi,
-            instrument=profile.instrument,
-            device_idn=self._device_idn,
-            measurements=requests,
-            interval_seconds=interval_ms / 1000.0,
-            on_reading=lambda reading: self._events.put(("reading", reading)),
-            on_error=lambda err: self._events.put(("error", err)),
+        self._reported_overruns = 0
+        self._attach_run_sinks()
+        try:
+            # Sends the setup commands, then starts the worker.
+            self._acquisition.start(interval_ms / 1000.0)
+        except Exception as exc:  # pragma: no cover - hardware dependency
+            self._stop_polling()
+            QMessageBox.critical(self, "Configuration failed", str(exc))
+            return
+        function_list = ", ".join(
+            request.function.value if not request.burst else f"{request.function.value} x{request.burst_samples}"
+            for request in session.requests
         )
-        self._poller.start()
-        function_list = ", ".join(request.function.value for request in requests)
         self._append_output(
             f"Polling started: {profile.instrument.value} [{function_list}], every {interval_ms} ms."
         )
         self._refresh_measurement_controls()
 
+    def _attach_run_sinks(self) -> None:
+        self._bridge.set_sink("trend", self._make_trend_sink())
+        # Statistics cover one polling run; the labels keep the final values after Stop.
+        self._statistics.reset()
+        for row in self._measurement_rows:
+            row.stats_label.setText("")
+        self._bridge.set_sink("statistics", self._statistics.add_reading)
+
+    def _start_replay(self) -> None:
+        if self._is_polling():
+            return
+        if self._is_connected():
+            QMessageBox.warning(self, "Replay", "Disconnect from the instrument before replaying a log.")
+            return
+        # The logger sink stays attached while logging is on, so replayed readings would land in the live log.
+        if self._log_checkbox.isChecked():
+            QMessageBox.warning(self, "Replay", "Disable logging before replaying a log.")
+            return
+        # Imported here: the columnar module pulls in numpy, which the window does not need to open.
+        from dmm_app.columnar_log import CATEGORIES_FILE
+
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Replay log",
+            "",
+            f"CSV files (*.csv);;Columnar binary logs ({CATEGORIES_FILE});;All files (*)",
+        )
+        if not path:
+            return
+        # A .npylog log is a directory; it is picked through the categories file inside it.
+        if os.path.basename(path) == CATEGORIES_FILE:
+            path = os.path.dirname(path)
+        try:
+            layout = log_layout(path)
+        except Exception as exc:
+            QMessageBox.critical(self, "Replay", f"Cannot read {path}: {exc}")
+            return
+        if not layout:
+            QMessageBox.warning(self, "Replay", "The log contains no readings.")
+            return
+
+        # Rebuild the rows from the log so slot indices land on matching rows, plots and statistics.
+        first = next(iter(layout.values()))
+        with QSignalBlocker(self._instrument_combo):
+            self._instrument_combo.setCurrentText(first.instrument.value)
+        self._clear_measurement_rows()
+        for reading in layout.values():
+            self._add_measurement_row(reading.function)
+
+        speed_label = self._replay_speed_combo.currentText()
+        self._replay = ReplayWorker.from_log(
+            path,
+            on_reading=self._bridge.publish_reading,
+            on_error=lambda err: self._bridge.publish_event("error", err),
+            speed=REPLAY_SPEEDS[speed_label],
+            on_finished=lambda summary: self._bridge.publish_event("replay", summary),
+        )
+        self._attach_run_sinks()
+        self._replay.start()
+        self._append_output(f"Replaying {path} ({first.instrument.value}, {speed_label.lower()}).")
+        self._refresh_measurement_controls()
+
+    def _show_replay_finished(self, summary: ReplaySummary) -> None:
+        if self._replay is not None:
+            # The worker reports just before exiting; let it finish so Stop is not announced as well.
+            self._replay.join(timeout=1.5)
+        if summary.completed:
+            self._append_output(
+                f"Replay finished: {summary.readings} readings, {summary.log_seconds:.1f} s of log "
+                f"in {summary.wall_seconds:.1f} s."
+            )
+        self._stop_polling()
+
     def _stop_polling(self) -> None:
-        if self._poller and self._poller.is_alive():
-            self._poller.stop()
-            self._poller.join(timeout=1.5)
+        if self._replay is not None and self._replay.is_alive():
+            self._replay.stop()
+            self._replay.join(timeout=1.5)
+            self._append_output("Replay stopped.")
+        self._replay = None
+        if self._acquisition is not None and self._acquisition.is_running:
+            self._acquisition.stop()
             self._append_output("Polling stopped.")
-        self._poller = None
+        self._bridge.set_sink("trend", None)
+        self._bridge.set_sink("statistics", None)
+        self._show_statistics()
         self._refresh_measurement_controls()
 
     def _take_snapshot(self) -> None:
-        if not self._scpi:
+        if self._acquisition is None:
             QMessageBox.warning(self, "Not connected", "Connect to the instrument before taking a snapshot.")
             return
         if not self._validate_unique_measurement_rows():
@@ -538,9 +1017,14 @@ class DMMAppWindow(QMainWindow):
         try:
             requests, setup_commands = self._build_poll_requests(profile)
             for setup_command in setup_commands:
-                self._scpi.write(setup_command)
-            for request in requests:
-                raw = self._scpi.query(request.query_command)
+                self._acquisition.request(GUI_SESSION, Write(setup_command))
+            commands = [request.query_command for request in requests]
+            issued_at = datetime.now()
+            if profile.supports_compound_query and len(commands) > 1:
+                raws = self._acquisition.request(GUI_SESSION, QueryMany(tuple(commands)))
+            else:
+                raws = [self._acquisition.request(GUI_SESSION, Query(command)) for command in commands]
+            for request, raw in zip(requests, raws):
                 reading = Reading(
                     timestamp=datetime.now(),
                     slot_index=request.slot_index,
@@ -550,6 +1034,7 @@ class DMMAppWindow(QMainWindow):
                     raw_response=raw,
                     value=parse_primary_value(raw),
                     unit=request.unit,
+                    issued_at=issued_at,
                 )
                 self._consume_reading(reading, label_prefix="Snapshot")
         except Exception as exc:  # pragma: no cover - hardware dependency
@@ -563,67 +1048,263 @@ class DMMAppWindow(QMainWindow):
                     self._log_checkbox.setChecked(False)
                     return
             if not self._logger:
-                self._logger = CsvLogger(self._log_path_label.text())
+                self._open_logger(self._log_path_label.text())
             self._append_output(f"Logging enabled: {self._logger.path}")
         else:
-            if self._logger:
-                self._logger.close()
-                self._logger = None
+            self._close_logger()
             self._append_output("Logging disabled.")
 
+    def _open_logger(self, path: str) -> None:
+        self._logger = BackgroundLogger(create_logger(path))
+        self._reported_log_drops = 0
+        self._bridge.set_sink("logger", self._logger.write_reading)
+
+    def _close_logger(self) -> None:
+        if not self._logger:
+            return
+        logger = self._logger
+        self._logger = None
+        self._bridge.set_sink("logger", None)
+        logger.close()
+        stats = logger.stats
+        self._append_output(f"Log closed: {stats.written} rows written, {stats.dropped} dropped.")
+
     def _choose_log_file(self) -> None:
-        path, _ = QFileDialog.getSaveFileName(
+        columnar_filter = f"Columnar binary logs (*{COLUMNAR_LOG_SUFFIX})"
+        path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Choose log file",
             "",
-            "CSV files (*.csv);;All files (*)",
+            f"CSV files (*.csv);;{columnar_filter};;All files (*)",
         )
         if not path:
             return
-        if not path.lower().endswith(".csv"):
-            path = f"{path}.csv"
-        if self._logger:
-            self._logger.close()
-            self._logger = None
+        suffix = COLUMNAR_LOG_SUFFIX if selected_filter == columnar_filter else ".csv"
+        if not path.lower().endswith((".csv", COLUMNAR_LOG_SUFFIX)):
+            path = f"{path}{suffix}"
+        self._close_logger()
         self._log_path_label.setText(path)
         if self._log_checkbox.isChecked():
-            self._logger = CsvLogger(path)
+            self._open_logger(path)
             self._append_output(f"Logging file set: {path}")
 
+    def _choose_alarm_rules(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(self, "Load alarm rules", "", "JSON files (*.json);;All files (*)")
+        if not path:
+            return
+        try:
+            rules = tuple(load_rules(path))
+        except (OSError, ValueError) as exc:
+            QMessageBox.critical(self, "Alarms", f"Cannot load alarm rules from {path}: {exc}")
+            return
+        self._alarm_rules = rules
+        self._alarm_rules_label.setText(f"{path} ({len(rules)} rules)")
+        self._alarms_checkbox.setChecked(bool(rules))
+        self._append_output(f"Alarm rules loaded: {', '.join(rule.name for rule in rules) or 'none'}.")
+        self._refresh_measurement_controls()
+
+    def _toggle_metrics(self, enabled: bool) -> None:
+        self._metrics = AcquisitionMetrics(labels={"session": "gui"}) if enabled else None
+        if self._acquisition is not None:
+            self._acquisition.set_session_metrics(GUI_SESSION, self._metrics)
+        self._metrics_label.setVisible(enabled)
+        self._metrics_reset_button.setEnabled(enabled)
+        self._metrics_export_button.setEnabled(enabled)
+        self._show_metrics()
+
+    def _reset_metrics(self) -> None:
+        if self._metrics:
+            self._metrics.reset()
+            self._show_metrics()
+
+    def _export_metrics(self) -> None:
+        if not self._metrics:
+            return
+        prometheus_filter = f"Prometheus text (*{PROMETHEUS_SUFFIX})"
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export metrics", "", f"JSON files (*.json);;{prometheus_filter}"
+        )
+        if not path:
+            return
+        if not path.lower().endswith((".json", PROMETHEUS_SUFFIX)):
+            path = f"{path}{PROMETHEUS_SUFFIX if selected_filter == prometheus_filter else '.json'}"
+        try:
+            write_metrics(path, [self._metrics])
+        except OSError as exc:
+            QMessageBox.critical(self, "Export metrics", str(exc))
+            return
+        self._append_output(f"Metrics exported: {path}")
+
+    def _show_metrics(self) -> None:
+        metrics = self._metrics
+        if metrics is None:
+            return
+        lines = [f"{'':<14}{'count':>8}{'p50':>11}{'p90':>11}{'p99':>11}{'max':>11}"]
+        rows: list[tuple[str, Histogram]] = [
+            ("write", metrics.write_seconds),
+            ("first byte", metrics.first_byte_seconds),
+            ("read", metrics.read_seconds),
+            ("lock wait", metrics.lock_wait_seconds),
+            ("cycle", metrics.cycle_seconds),
+            ("lateness", metrics.lateness_seconds),
+        ]
+        for label, histogram in rows:
+            snapshot = histogram.snapshot()
+            values = [snapshot.percentile(0.5), snapshot.percentile(0.9), snapshot.percentile(0.99), snapshot.maximum]
+            lines.append(
+                f"{label:<14}{snapshot.count:>8}" + "".join(f"{value * 1000:>8.2f} ms" for value in values)
+            )
+        reply = metrics.reply_bytes.snapshot()
+        lines.append(
+            f"Queries: {metrics.queries.value}  timeouts: {metrics.timeouts.value}  errors: {metrics.errors.value}  "
+            f"overruns: {metrics.overruns.value}  skipped ticks: {metrics.skipped_ticks.value}  "
+            f"mean reply: {reply.mean:.0f} B"
+        )
+        self._metrics_label.setText("\n".join(lines))
+
     def _process_events(self) -> None:
-        while True:
-            try:
-                kind, payload = self._events.get_nowait()
-            except queue.Empty:
-                break
-
-            if kind == "reading":
-                reading = payload
-                if isinstance(reading, Reading):
-                    self._consume_reading(reading)
+        frame = self._bridge.drain()
+        finished_replay: ReplaySummary | None = None
+        for kind, payload in frame.events:
+            if kind == "cycle":
+                stats = payload
+                if isinstance(stats, CycleStats) and stats.overruns > self._reported_overruns:
+                    self._reported_overruns = stats.overruns
+                    self._append_output(
+                        f"Poll overrun: cycle {stats.cycle_index + 1} took {stats.duration_seconds * 1000:.0f} ms "
+                        f"({stats.skipped_ticks} ticks skipped, {stats.overruns} overruns total)."
+                    )
+            elif kind == "recovery" and isinstance(payload, RecoveryEvent):
+                self._show_recovery(payload)
+            elif kind == "alarm" and isinstance(payload, AlarmEvent):
+                self._show_alarm(payload)
+            elif kind == "ports":
+                self._show_ports(payload)
+            elif kind == "port" and isinstance(payload, PortEvent):
+                self._apply_port_event(payload)
+            elif kind == "trend":
+                self._enable_trend_plots(payload)
+            elif kind == "discovery":
+                self._show_discovery(payload)
+            elif kind == "replay" and isinstance(payload, ReplaySummary):
+                finished_replay = payload
             elif kind == "error":
                 self._append_output(f"Polling error: {payload}")
                 self._stop_polling()
 
+        for reading in frame.recent:
+            self._append_output(self._format_reading_line(reading))
+        for reading in frame.latest.values():
+            self._show_latest(reading)
+        if frame.latest:
+            self._show_statistics()
+        # After this frame's readings, so the summary is the last line of the replay.
+        if finished_replay is not None:
+            self._show_replay_finished(finished_replay)
+        self._show_bridge_stats(frame.stats)
+        self._report_logger_health()
+        self._output.flush_pending()
+
+    def _show_recovery(self, event: RecoveryEvent) -> None:
+        if event.kind == "lost":
+            self._append_output(f"Connection lost: {event.message}. Reconnecting...")
+            self._status_before_outage = self._status_label.text()
+            self._status_label.setText("Reconnecting...")
+        elif event.kind == "retry":
+            self._append_output(f"Reconnect attempt {event.attempt} failed: {event.message}")
+        elif event.kind == "recovered":
+            self._append_output(f"Reconnected after {event.outage_seconds:.1f} s; polling resumed.")
+            self._status_label.setText(self._status_before_outage)
+        else:
+            self._append_output(f"Reconnect failed: {event.message}")
+
+    def _show_alarm(self, event: AlarmEvent) -> None:
+        self._append_output(f"ALARM {event.describe()}")
+        key = (event.rule, event.slot_index)
+        if event.kind == TRIP:
+            self._tripped_alarms[key] = event
+        else:
+            self._tripped_alarms.pop(key, None)
+        if self._tripped_alarms:
+            tripped = ", ".join(f"{rule} (row {slot + 1})" for rule, slot in self._tripped_alarms)
+            self.statusBar().showMessage(f"ALARM tripped: {tripped}")
+        else:
+            self.statusBar().showMessage(f"{event.rule} cleared on row {event.slot_index + 1}", 5000)
+
+    def _show_bridge_stats(self, stats: BridgeStats) -> None:
+        if stats == self._shown_bridge_stats:
+            return
+        self._shown_bridge_stats = stats
+        text = f"Readings: {stats.published} | coalesced: {stats.coalesced} | dropped from display: {stats.dropped}"
+        if stats.dropped_events:
+            text += f" | events dropped: {stats.dropped_events}"
+        self._bridge_stats_label.setText(text)
+
+    def _report_logger_health(self) -> None:
+        if not self._logger:
+            return
+        stats = self._logger.stats
+        if stats.dropped > self._reported_log_drops:
+            self._reported_log_drops = stats.dropped
+            detail = f" ({self._logger.error})" if self._logger.error else ""
+            self._append_output(
+                f"Logging behind: {stats.dropped} readings dropped, {stats.queue_depth} queued{detail}."
+            )
+
+    def _make_trend_sink(self):
+        # Rows cannot change while polling, so the worker thread gets a fixed slot -> buffer map and never
+        # touches widgets.
+        buffers = {
+            slot: row.plot.buffer for slot, row in enumerate(self._measurement_rows) if row.plot is not None
+        }
+
+        def append(reading: Reading) -> None:
+            buffer = buffers.get(reading.slot_index)
+            # Alarm markers annotate the reading before them; plotting them would break the trace like a gap.
+            if buffer is not None and not reading.is_alarm:
+                buffer.append(reading.timestamp.timestamp(), reading.value)
+
+        return append
+
     def _consume_reading(self, reading: Reading, label_prefix: str | None = None) -> None:
-        display = reading.raw_response if reading.value is None else f"{reading.value:.6g} {reading.unit}"
-        if 0 <= reading.slot_index < len(self._measurement_rows):
-            self._measurement_rows[reading.slot_index].latest_label.setText(display)
+        if not reading.is_alarm:
+            self._show_latest(reading)
+        if not reading.is_alarm and 0 <= reading.slot_index < len(self._measurement_rows):
+            plot = self._measurement_rows[reading.slot_index].plot
+            if plot is not None:
+                plot.buffer.append(reading.timestamp.timestamp(), reading.value)
+        self._append_output(self._format_reading_line(reading, label_prefix))
+        if self._log_checkbox.isChecked() and self._logger:
+            self._logger.write_reading(reading)
+
+    @staticmethod
+    def _format_display(reading: Reading) -> str:
+        return reading.raw_response if reading.value is None else f"{reading.value:.6g} {reading.unit}"
+
+    def _format_reading_line(self, reading: Reading, label_prefix: str | None = None) -> str:
         prefix = "" if not label_prefix else f"{label_prefix} | "
-        self._append_output(
+        return (
             f"{prefix}{reading.instrument.value} | Row {reading.slot_index + 1} | "
-            f"{reading.function.value}: {display}"
+            f"{reading.function.value}: {self._format_display(reading)}"
         )
-        if self._log_checkbox.isChecked() and self._logger:
-            self._logger.write_reading(reading)
+
+    def _show_latest(self, reading: Reading) -> None:
+        if 0 <= reading.slot_index < len(self._measurement_rows):
+            self._measurement_rows[reading.slot_index].latest_label.setText(self._format_display(reading))
+
+    def _show_statistics(self) -> None:
+        for slot_index, snapshot in self._statistics.snapshots().items():
+            if slot_index < len(self._measurement_rows):
+                text = format_statistics(snapshot, self._statistics.unit(slot_index))
+                self._measurement_rows[slot_index].stats_label.setText(text)
 
     def _append_output(self, text: str) -> None:
-        self._output.append(text)
+        self._output.append_line(text)
 
     def closeEvent(self, event) -> None:  # noqa: N802
+        if self._port_watcher is not None:
+            self._port_watcher.stop()
         self._stop_polling()
         self._disconnect()
-        if self._logger:
-            self._logger.close()
-            self._logger = None
+        self._close_logger()
         super().closeEvent(event)
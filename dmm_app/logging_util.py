@@ -1,9 +1,33 @@
 from __future__ import annotations
 
 import csv
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Protocol
 
-from dmm_app.models import Reading
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+
+CSV_COLUMNS = [
+    "timestamp",
+    "measurement_slot",
+    "device_name",
+    "device_idn",
+    "function",
+    "value",
+    "unit",
+    "raw_response",
+    "scheduled_at",
+    "issued_at",
+]
+
+
+COLUMNAR_LOG_SUFFIX = ".npylog"
 
 
 class CsvLogger:
@@ -11,21 +35,15 @@ class CsvLogger:
         self._path = Path(path)
         self._path.parent.mkdir(parents=True, exist_ok=True)
         file_exists = self._path.exists() and self._path.stat().st_size > 0
+        columns = CSV_COLUMNS
+        if file_exists:
+            # Appending to a log written by an older release keeps that file's column layout.
+            with self._path.open("r", newline="", encoding="utf-8") as existing:
+                columns = next(csv.reader(existing), None) or CSV_COLUMNS
         self._file = self._path.open("a", newline="", encoding="utf-8")
-        self._writer = csv.writer(self._file)
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
         if not file_exists:
-            self._writer.writerow(
-                [
-                    "timestamp",
-                    "measurement_slot",
-                    "device_name",
-                    "device_idn",
-                    "function",
-                    "value",
-                    "unit",
-                    "raw_response",
-                ]
-            )
+            self._writer.writeheader()
             self._file.flush()
 
     @property
@@ -33,20 +51,230 @@ class CsvLogger:
         return str(self._path)
 
     def write_reading(self, reading: Reading) -> None:
+        self._write_row(reading)
+        self._file.flush()
+
+    def write_readings(self, readings: Iterable[Reading]) -> None:
+        for reading in readings:
+            self._write_row(reading)
+
+    def flush(self, fsync: bool = False) -> None:
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def _write_row(self, reading: Reading) -> None:
         self._writer.writerow(
-            [
-                reading.timestamp.isoformat(timespec="seconds"),
-                reading.slot_index + 1,
-                reading.instrument.value,
-                reading.device_idn,
-                reading.function.value,
-                "" if reading.value is None else f"{reading.value:.12g}",
-                reading.unit,
-                reading.raw_response,
-            ]
+            {
+                "timestamp": reading.timestamp.isoformat(timespec="milliseconds"),
+                "measurement_slot": reading.slot_index + 1,
+                "device_name": reading.instrument.value,
+                "device_idn": reading.device_idn,
+                "function": reading.function.value,
+                "value": "" if reading.value is None else f"{reading.value:.12g}",
+                "unit": reading.unit,
+                "raw_response": reading.raw_response,
+                "scheduled_at": _format_optional_time(reading.scheduled_at),
+                "issued_at": _format_optional_time(reading.issued_at),
+            }
         )
-        self._file.flush()
 
     def close(self) -> None:
         if not self._file.closed:
             self._file.close()
+
+
+def _format_optional_time(value: datetime | None) -> str:
+    return "" if value is None else value.isoformat(timespec="milliseconds")
+
+
+def _parse_optional_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def read_csv_log(path: str) -> Iterator[Reading]:
+    with Path(path).open("r", newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            value = row.get("value") or ""
+            yield Reading(
+                timestamp=datetime.fromisoformat(row["timestamp"]),
+                slot_index=int(row["measurement_slot"]) - 1,
+                instrument=InstrumentType(row["device_name"]),
+                device_idn=row.get("device_idn") or "UNKNOWN",
+                function=MeasurementFunction(row["function"]),
+                raw_response=row.get("raw_response") or "",
+                value=float(value) if value else None,
+                unit=row.get("unit") or "",
+                scheduled_at=_parse_optional_time(row.get("scheduled_at")),
+                issued_at=_parse_optional_time(row.get("issued_at")),
+            )
+
+
+def create_logger(path: str) -> BatchLogger:
+    if path.lower().rstrip("/\\").endswith(COLUMNAR_LOG_SUFFIX):
+        from dmm_app.columnar_log import ColumnarLogger
+
+        return ColumnarLogger(path)
+    return CsvLogger(path)
+
+
+def read_log(path: str) -> Iterator[Reading]:
+    # Counterpart of create_logger: picks the reader from the same suffix convention.
+    if path.lower().rstrip("/\\").endswith(COLUMNAR_LOG_SUFFIX):
+        from dmm_app.columnar_log import read_columnar_readings
+
+        return read_columnar_readings(path)
+    return read_csv_log(path)
+
+
+class BatchLogger(Protocol):
+    @property
+    def path(self) -> str: ...
+
+    def write_reading(self, reading: Reading) -> None: ...
+
+    def write_readings(self, readings: Iterable[Reading]) -> None: ...
+
+    def flush(self, fsync: bool = False) -> None: ...
+
+    def close(self) -> None: ...
+
+
+@dataclass(frozen=True)
+class LoggerStats:
+    written: int
+    dropped: int
+    backpressure_waits: int
+    queue_depth: int
+
+
+class BackgroundLogger:
+    def __init__(
+        self,
+        logger: BatchLogger,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_rows: int = 500,
+        flush_seconds: float = 1.0,
+        fsync: bool = False,
+        block_when_full: bool = False,
+        block_timeout_seconds: float = 0.5,
+    ):
+        self._logger = logger
+        self._queue: queue.Queue[Reading | None] = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_rows = flush_rows
+        self._flush_seconds = flush_seconds
+        self._fsync = fsync
+        self._block_when_full = block_when_full
+        self._block_timeout_seconds = block_timeout_seconds
+        self._written = 0
+        self._dropped = 0
+        self._backpressure_waits = 0
+        self._error: Exception | None = None
+        self._closed = False
+        # Guards the counters and the closed flag; producers, the writer thread and close() all touch them.
+        self._state = threading.Condition()
+        # Producers between the closed check and their put; close() waits for them so no reading lands behind
+        # the sentinel, where it would be neither written nor counted.
+        self._putting = 0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="log-writer")
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        return self._logger.path
+
+    @property
+    def stats(self) -> LoggerStats:
+        with self._state:
+            return LoggerStats(
+                written=self._written,
+                dropped=self._dropped,
+                backpressure_waits=self._backpressure_waits,
+                queue_depth=self._queue.qsize(),
+            )
+
+    @property
+    def error(self) -> Exception | None:
+        return self._error
+
+    def write_reading(self, reading: Reading) -> None:
+        with self._state:
+            if self._closed:
+                # A producer thread may still hold this logger briefly after the GUI closes it; the reading is
+                # rejected and counted as dropped.
+                self._dropped += 1
+                return
+            self._putting += 1
+        queued, waited = self._put(reading)
+        with self._state:
+            self._putting -= 1
+            self._backpressure_waits += waited
+            if not queued:
+                self._dropped += 1
+            self._state.notify_all()
+
+    def _put(self, reading: Reading) -> tuple[bool, bool]:
+        try:
+            self._queue.put_nowait(reading)
+            return True, False
+        except queue.Full:
+            if not self._block_when_full:
+                return False, False
+        try:
+            self._queue.put(reading, timeout=self._block_timeout_seconds)
+            return True, True
+        except queue.Full:
+            return False, True
+
+    def close(self) -> None:
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            self._state.wait_for(lambda: self._putting == 0)
+        # The sentinel is queued behind every pending reading, so the writer drains them before exiting.
+        self._queue.put(None)
+        self._thread.join()
+        self._logger.close()
+
+    def _next_batch(self) -> tuple[list[Reading], bool]:
+        batch: list[Reading] = []
+        try:
+            item = self._queue.get(timeout=self._flush_seconds)
+        except queue.Empty:
+            return batch, False
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self._batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        unflushed = 0
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            try:
+                if batch:
+                    self._logger.write_readings(batch)
+                    with self._state:
+                        self._written += len(batch)
+                    unflushed += len(batch)
+                now = time.monotonic()
+                if unflushed and (
+                    stopping or unflushed >= self._flush_rows or now - last_flush >= self._flush_seconds
+                ):
+                    self._logger.flush(fsync=self._fsync)
+                    unflushed = 0
+                    last_flush = now
+            except Exception as exc:  # pragma: no cover - disk error path
+                with self._state:
+                    self._error = exc
+                    self._dropped += len(batch)
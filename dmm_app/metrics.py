@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Final
+
+METRIC_PREFIX: Final[str] = "dmm_"
+PROMETHEUS_SUFFIX: Final[str] = ".prom"
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    bounds: tuple[float, ...]
+    counts: tuple[int, ...]
+    count: int
+    total: float
+    maximum: float
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Histogram:
+    # Log-spaced buckets fixed at construction: memory never grows with the number of samples and
+    # recording is one log2 and a list increment. Values above the last bound land in an overflow bucket.
+    def __init__(self, name: str, help_text: str, lowest: float, octaves: int, buckets_per_octave: int = 2):
+        self.name = name
+        self.help_text = help_text
+        self._lowest = lowest
+        self._buckets_per_octave = buckets_per_octave
+        self._last = octaves * buckets_per_octave
+        self._bounds = tuple(lowest * 2 ** (index / buckets_per_octave) for index in range(self._last + 1))
+        self._counts = [0] * (self._last + 2)
+        self._count = 0
+        self._total = 0.0
+        self._maximum = 0.0
+        # One AcquisitionMetrics is written by both the poller and its SCPI client (the snapshot button also
+        # queries from the GUI thread) and read or reset from the GUI; the lock keeps count, total and buckets
+        # consistent. The bucket index is computed outside it.
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        if value <= self._lowest:
+            index = 0
+        else:
+            index = min(self._last + 1, math.ceil(math.log2(value / self._lowest) * self._buckets_per_octave))
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total += value
+            if value > self._maximum:
+                self._maximum = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        with self._lock:
+            return HistogramSnapshot(
+                bounds=self._bounds + (math.inf,),
+                counts=tuple(self._counts),
+                count=self._count,
+                total=self._total,
+                maximum=self._maximum,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (self._last + 2)
+            self._count = 0
+            self._total = 0.0
+            self._maximum = 0.0
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        # `+=` is a read-modify-write, so increments from several threads can be lost without it.
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self.value = 0
+
+
+def _seconds(name: str, help_text: str) -> Histogram:
+    # 1 us to ~16 s
+    return Histogram(name, help_text, lowest=1e-6, octaves=24)
+
+
+@dataclass
+class AcquisitionMetrics:
+    labels: dict[str, str] = field(default_factory=dict)
+    write_seconds: Histogram = field(
+        default_factory=lambda: _seconds("scpi_write_seconds", "Time to hand a command to the transport.")
+    )
+    first_byte_seconds: Histogram = field(
+        default_factory=lambda: _seconds("scpi_first_byte_seconds", "Time from end of write to first reply byte.")
+    )
+    read_seconds: Histogram = field(
+        default_factory=lambda: _seconds("scpi_read_seconds", "Time from first reply byte to complete reply.")
+    )
+    lock_wait_seconds: Histogram = field(
+        default_factory=lambda: _seconds("scpi_lock_wait_seconds", "Time spent waiting for the transport lock.")
+    )
+    reply_bytes: Histogram = field(
+        default_factory=lambda: Histogram("scpi_reply_bytes", "Bytes received per query.", lowest=1.0, octaves=20)
+    )
+    cycle_seconds: Histogram = field(
+        default_factory=lambda: _seconds("poll_cycle_seconds", "Duration of one polling cycle.")
+    )
+    lateness_seconds: Histogram = field(
+        default_factory=lambda: _seconds("poll_lateness_seconds", "Delay between scheduled and actual cycle start.")
+    )
+    queries: Counter = field(default_factory=lambda: Counter("scpi_queries", "Queries completed."))
+    timeouts: Counter = field(default_factory=lambda: Counter("scpi_timeouts", "Replies missing the terminator."))
+    errors: Counter = field(default_factory=lambda: Counter("scpi_errors", "Transport exceptions."))
+    overruns: Counter = field(default_factory=lambda: Counter("poll_overruns", "Cycles that overran the interval."))
+    skipped_ticks: Counter = field(
+        default_factory=lambda: Counter("poll_skipped_ticks", "Scheduled ticks dropped after overruns.")
+    )
+    reconnects: Counter = field(default_factory=lambda: Counter("reconnects", "Connections restored after a failure."))
+
+    def histograms(self) -> list[Histogram]:
+        return [
+            self.write_seconds,
+            self.first_byte_seconds,
+            self.read_seconds,
+            self.lock_wait_seconds,
+            self.reply_bytes,
+            self.cycle_seconds,
+            self.lateness_seconds,
+        ]
+
+    def counters(self) -> list[Counter]:
+        return [self.queries, self.timeouts, self.errors, self.overruns, self.skipped_ticks, self.reconnects]
+
+    def record_cycle(self, duration: float, lateness: float, missed_ticks: int) -> None:
+        self.cycle_seconds.record(duration)
+        self.lateness_seconds.record(max(0.0, lateness))
+        if missed_ticks:
+            self.overruns.inc()
+            self.skipped_ticks.inc(missed_ticks)
+
+    def reset(self) -> None:
+        for metric in (*self.histograms(), *self.counters()):
+            metric.reset()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str], extra: dict[str, str] | None = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in merged.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:.6g}"
+
+
+def to_prometheus(all_metrics: list[AcquisitionMetrics]) -> str:
+    if not all_metrics:
+        return ""
+    lines: list[str] = []
+    template = all_metrics[0]
+    for position, histogram in enumerate(template.histograms()):
+        name = METRIC_PREFIX + histogram.name
+        lines.append(f"# HELP {name} {histogram.help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for metrics in all_metrics:
+            snapshot = metrics.histograms()[position].snapshot()
+            cumulative = 0
+            for bound, count in zip(snapshot.bounds, snapshot.counts):
+                cumulative += count
+                labels = _format_labels(metrics.labels, {"le": _format_bound(bound)})
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(metrics.labels)
+            lines.append(f"{name}_sum{labels} {snapshot.total:.9g}")
+            lines.append(f"{name}_count{labels} {snapshot.count}")
+    for position, counter in enumerate(template.counters()):
+        name = f"{METRIC_PREFIX}{counter.name}_total"
+        lines.append(f"# HELP {name} {counter.help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for metrics in all_metrics:
+            lines.append(f"{name}{_format_labels(metrics.labels)} {metrics.counters()[position].value}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json(all_metrics: list[AcquisitionMetrics]) -> list[dict]:
+    exported = []
+    for metrics in all_metrics:
+        histograms = {}
+        for histogram in metrics.histograms():
+            snapshot = histogram.snapshot()
+            histograms[histogram.name] = {
+                "count": snapshot.count,
+                "sum": snapshot.total,
+                "mean": snapshot.mean,
+                "p50": snapshot.percentile(0.50),
+                "p90": snapshot.percentile(0.90),
+                "p99": snapshot.percentile(0.99),
+                "max": snapshot.maximum,
+                "buckets": [
+                    [None if math.isinf(bound) else bound, count]
+                    for bound, count in zip(snapshot.bounds, snapshot.counts)
+                    if count
+                ],
+            }
+        exported.append(
+            {
+                "labels": dict(metrics.labels),
+                "histograms": histograms,
+                "counters": {counter.name: counter.value for counter in metrics.counters()},
+            }
+        )
+    return exported
+
+
+def write_metrics(path: str, all_metrics: list[AcquisitionMetrics]) -> None:
+    # Written to a temporary file and renamed so scrapers (e.g. a node_exporter textfile collector) never
+    # read a half-written file.
+    target = Path(path)
+    if target.suffix == PROMETHEUS_SUFFIX:
+        text = to_prometheus(all_metrics)
+    else:
+        text = json.dumps(to_json(all_metrics), indent=1) + "\n"
+    temporary = target.with_name(target.name + ".tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, target)
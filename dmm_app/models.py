@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from enum import Enum
+from typing import Final
+
+# raw_response of the placeholder readings written when a connection drops, so log gaps are explicit.
+GAP_RESPONSE_PREFIX: Final[str] = "#GAP"
+# raw_response of the marker readings written when a limit rule trips or clears.
+ALARM_RESPONSE_PREFIX: Final[str] = "#ALARM"
 
 
 class InstrumentType(str, Enum):
@@ -26,6 +33,25 @@ class SerialSettings:
 
 
 @dataclass(frozen=True)
+class SerialPortInfo:
+    device: str
+    serial_number: str | None = None
+    description: str = ""
+    vid: int | None = None
+    pid: int | None = None
+
+
+@dataclass(frozen=True)
+class SocketSettings:
+    host: str
+    port: int = 5025
+    timeout_seconds: float = 1.0
+    connect_timeout_seconds: float = 3.0
+    keepalive: bool = True
+
+
+# Slotted: one Reading is created per sample, so dropping the per-instance __dict__ matters on the hot path.
+@dataclass(frozen=True, slots=True)
 class Reading:
     timestamp: datetime
     slot_index: int
@@ -35,3 +61,27 @@ class Reading:
     raw_response: str
     value: float | None
     unit: str
+    scheduled_at: datetime | None = None
+    issued_at: datetime | None = None
+
+    @property
+    def is_gap(self) -> bool:
+        return self.value is None and self.raw_response.startswith(GAP_RESPONSE_PREFIX)
+
+    @property
+    def is_alarm(self) -> bool:
+        return self.value is None and self.raw_response.startswith(ALARM_RESPONSE_PREFIX)
+
+
+@dataclass(frozen=True)
+class Timebase:
+    monotonic_anchor: float
+    wall_anchor: datetime
+
+    @classmethod
+    def now(cls) -> Timebase:
+        return cls(monotonic_anchor=time.monotonic(), wall_anchor=datetime.now())
+
+    def wall_time(self, monotonic_seconds: float) -> datetime:
+        # Wall-clock stamps are derived from one anchor so NTP steps cannot skew the sample grid.
+        return self.wall_anchor + timedelta(seconds=monotonic_seconds - self.monotonic_anchor)
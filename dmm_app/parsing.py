@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# SCPI instruments report overload/overrange as 9.9E37 (and -9.9E37); anything at or beyond it is not a reading.
+OVERFLOW_THRESHOLD: Final[float] = 9.9e37
+
+
+def is_overflow(value: float) -> bool:
+    return abs(value) >= OVERFLOW_THRESHOLD
+
+
+def _import_numpy():
+    # Deferred to the first array parse: is_overflow() sits on every polling path, and the threaded acquisition
+    # path must not pay for importing numpy.
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - import guard for environments without numpy
+        raise RuntimeError("numpy is not installed. Install dependencies first.") from None
+    return numpy
+
+
+def _mask_overflow(values: np.ndarray) -> np.ndarray:
+    np = _import_numpy()
+    overflow = np.abs(values) >= OVERFLOW_THRESHOLD
+    if not overflow.any():
+        return values
+    # Only copy when a sentinel is present, so clean binary blocks stay zero-copy views.
+    return np.where(overflow, np.nan, values)
+
+
+def parse_ascii_values(raw_response: str | bytes) -> np.ndarray:
+    np = _import_numpy()
+    text = raw_response.decode("ascii", errors="replace") if isinstance(raw_response, bytes) else raw_response
+    tokens = text.replace(",", " ").split()
+    try:
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        values = np.array([_parse_token(token) for token in tokens], dtype=np.float64)
+    return _mask_overflow(values)
+
+
+def _parse_token(token: str) -> float:
+    try:
+        return float(token)
+    except ValueError:
+        return float("nan")
+
+
+def binary_block_bounds(payload: bytes | bytearray | memoryview) -> tuple[int, int]:
+    view = memoryview(payload)
+    if len(view) < 2 or view[0] != ord("#"):
+        raise ValueError("Binary block must start with '#'.")
+    digits = view[1] - ord("0")
+    if not 0 <= digits <= 9:
+        raise ValueError("Invalid binary block header digit count.")
+    if digits == 0:
+        # Indefinite-length block: data runs to the terminating newline.
+        end = len(view) - 1 if len(view) > 2 and view[-1] == ord("\n") else len(view)
+        return 2, end - 2
+    header_end = 2 + digits
+    if len(view) < header_end:
+        raise ValueError("Binary block header is truncated.")
+    length = int(bytes(view[2:header_end]))
+    if len(view) < header_end + length:
+        raise ValueError(f"Binary block declares {length} bytes but only {len(view) - header_end} arrived.")
+    return header_end, length
+
+
+def parse_binary_block(payload: bytes | bytearray | memoryview, dtype: str = "<f4") -> np.ndarray:
+    np = _import_numpy()
+    offset, length = binary_block_bounds(payload)
+    data_type = np.dtype(dtype)
+    if length % data_type.itemsize:
+        raise ValueError(f"Binary block length {length} is not a multiple of {data_type.itemsize}-byte items.")
+    values = np.frombuffer(payload, dtype=data_type, count=length // data_type.itemsize, offset=offset)
+    if data_type.kind != "f":
+        return values
+    return _mask_overflow(values)
@@ -4,10 +4,31 @@ import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable
 
-from dmm_app.models import InstrumentType, MeasurementFunction, Reading
-from dmm_app.scpi import SCPIClient
+from dmm_app.alarms import AlarmEngine
+from dmm_app.commands import BurstCommand, InstrumentProfile
+from dmm_app.metrics import AcquisitionMetrics
+from dmm_app.models import GAP_RESPONSE_PREFIX, InstrumentType, MeasurementFunction, Reading, Timebase
+from dmm_app.parsing import is_overflow, parse_ascii_values
+from dmm_app.recovery import AsyncSessionRecovery, RecoveryEvent, SessionRecovery
+from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+from dmm_app.steps import (
+    Query,
+    QueryMany,
+    Recover,
+    Step,
+    Steps,
+    Wait,
+    Write,
+    run_steps,
+    run_steps_async,
+    scpi_step,
+    scpi_step_async,
+)
+
+if TYPE_CHECKING:
+    import asyncio
 
 
 def parse_primary_value(raw_response: str) -> float | None:
@@ -15,9 +36,10 @@ def parse_primary_value(raw_response: str) -> float | None:
     if not token:
         return None
     try:
-        return float(token)
+        value = float(token)
     except ValueError:
         return None
+    return None if is_overflow(value) else value
 
 
 @dataclass(frozen=True)
@@ -26,56 +48,441 @@ class PollRequest:
     function: MeasurementFunction
     query_command: str
     unit: str
+    burst: BurstCommand | None = None
+    burst_samples: int = 0
 
 
-class PollingWorker(threading.Thread):
+def build_poll_requests(
+    profile: InstrumentProfile,
+    functions: list[MeasurementFunction],
+    first_slot: int = 0,
+    burst_samples: int = 0,
+) -> tuple[list[PollRequest], list[str]]:
+    requests: list[PollRequest] = []
+    setup_commands: list[str] = []
+
+    for offset, function in enumerate(functions):
+        command = profile.commands.get(function)
+        if command is None:
+            raise ValueError(f"{function.value} is not available for {profile.instrument.value}.")
+        # Functions without burst support fall back to one query per cycle.
+        burst = command.burst if burst_samples > 1 else None
+        samples = min(burst_samples, burst.max_samples) if burst else 0
+        requests.append(
+            PollRequest(
+                slot_index=first_slot + offset,
+                function=function,
+                query_command=command.query_command,
+                unit=command.unit,
+                burst=burst,
+                burst_samples=samples,
+            )
+        )
+        setup_commands.extend(command.prepare_commands)
+        if burst:
+            setup_commands.extend(burst.configure_for(samples))
+
+    deduped_setup: list[str] = []
+    seen: set[str] = set()
+    for setup_command in setup_commands:
+        if setup_command in seen:
+            continue
+        seen.add(setup_command)
+        deduped_setup.append(setup_command)
+    return requests, deduped_setup
+
+
+@dataclass(frozen=True)
+class CycleStats:
+    cycle_index: int
+    scheduled_at: datetime
+    lateness_seconds: float
+    duration_seconds: float
+    overruns: int
+    skipped_ticks: int
+
+
+def _advance_deadline(deadline: float, finished: float, interval_seconds: float) -> tuple[float, int]:
+    deadline += interval_seconds
+    if finished <= deadline:
+        return deadline, 0
+    # Missed ticks are dropped rather than replayed so a slow reply never causes a burst.
+    missed = int((finished - deadline) // interval_seconds) + 1
+    return deadline + missed * interval_seconds, missed
+
+
+def _make_reading(
+    timebase: Timebase,
+    instrument: InstrumentType,
+    device_idn: str,
+    measurement: PollRequest,
+    raw: str,
+    scheduled: float,
+    issued: float,
+    received: float,
+) -> Reading:
+    return Reading(
+        timestamp=timebase.wall_time(received),
+        slot_index=measurement.slot_index,
+        instrument=instrument,
+        device_idn=device_idn,
+        function=measurement.function,
+        raw_response=raw,
+        value=parse_primary_value(raw),
+        unit=measurement.unit,
+        scheduled_at=timebase.wall_time(scheduled),
+        issued_at=timebase.wall_time(issued),
+    )
+
+
+def burst_timeout(measurement: PollRequest) -> float:
+    # The instrument only answers FETCh? once every sample is taken, so the wait scales with the burst length.
+    return measurement.burst_samples * measurement.burst.sample_interval_seconds + 1.0
+
+
+def _make_burst_readings(
+    timebase: Timebase,
+    instrument: InstrumentType,
+    device_idn: str,
+    measurement: PollRequest,
+    raw: str,
+    scheduled: float,
+    issued: float,
+) -> list[Reading]:
+    # Samples are taken by the instrument after the trigger, so each is stamped at its position in the burst.
+    interval = measurement.burst.sample_interval_seconds if measurement.burst else 0.0
+    tokens = raw.replace(",", " ").split()
+    # Unparsable tokens and overflow sentinels come back as NaN and are stored as missing values.
+    values = parse_ascii_values(raw).tolist()
+    return [
+        Reading(
+            timestamp=timebase.wall_time(issued + index * interval),
+            slot_index=measurement.slot_index,
+            instrument=instrument,
+            device_idn=device_idn,
+            function=measurement.function,
+            raw_response=token,
+            value=None if value != value else value,
+            unit=measurement.unit,
+            scheduled_at=timebase.wall_time(scheduled),
+            issued_at=timebase.wall_time(issued),
+        )
+        for index, (token, value) in enumerate(zip(tokens, values))
+    ]
+
+
+def _make_gap_readings(
+    timebase: Timebase,
+    instrument: InstrumentType,
+    device_idn: str,
+    measurements: list[PollRequest],
+    reason: str,
+    scheduled: float,
+    failed: float,
+) -> list[Reading]:
+    raw = f"{GAP_RESPONSE_PREFIX} {reason}".replace("\n", " ")
+    return [
+        Reading(
+            timestamp=timebase.wall_time(failed),
+            slot_index=measurement.slot_index,
+            instrument=instrument,
+            device_idn=device_idn,
+            function=measurement.function,
+            raw_response=raw,
+            value=None,
+            unit=measurement.unit,
+            scheduled_at=timebase.wall_time(scheduled),
+            issued_at=None,
+        )
+        for measurement in measurements
+    ]
+
+
+class _PollingLoop:
+    # The deadline grid, burst/batch/single queries, alarms, gap rows, metrics and reconnect decisions shared by
+    # PollingWorker and AsyncPollingWorker, written once as steps (see dmm_app.steps). The workers only carry the
+    # steps out, blocking on a thread or awaiting on an event loop.
     def __init__(
         self,
-        scpi: SCPIClient,
         instrument: InstrumentType,
         device_idn: str,
         measurements: list[PollRequest],
         interval_seconds: float,
         on_reading: Callable[[Reading], None],
         on_error: Callable[[str], None],
+        batch_queries: bool,
+        on_cycle: Callable[[CycleStats], None] | None,
+        timebase: Timebase | None,
+        metrics: AcquisitionMetrics | None,
+        recovering: bool,
+        alarms: AlarmEngine | None,
     ):
-        super().__init__(daemon=True)
-        self._scpi = scpi
         self._instrument = instrument
         self._device_idn = device_idn
         self._measurements = measurements
+        self._single = [measurement for measurement in measurements if measurement.burst is None]
         self._interval_seconds = interval_seconds
         self._on_reading = on_reading
         self._on_error = on_error
+        self._batch_queries = batch_queries
+        self._on_cycle = on_cycle
+        self._timebase = timebase
+        self._metrics = metrics
+        self._recovering = recovering
+        self._alarms = alarms
+
+    def _emit(self, reading: Reading, received: float) -> Steps[None]:
+        # Limits are checked (and safe-state writes sent) before the reading is handed on, so no consumer
+        # can delay the action.
+        markers = (yield from self._alarms.evaluate_steps(reading, received)) if self._alarms is not None else ()
+        self._on_reading(reading)
+        for marker in markers:
+            self._on_reading(marker)
+
+    def _build_reading(
+        self, measurement: PollRequest, raw: str, scheduled: float, issued: float, received: float
+    ) -> Reading:
+        return _make_reading(
+            self._timebase, self._instrument, self._device_idn, measurement, raw, scheduled, issued, received
+        )
+
+    def _poll_burst(self, measurement: PollRequest, scheduled: float) -> Steps[None]:
+        issued = time.monotonic()
+        yield Write(measurement.burst.trigger_command)
+        raw = yield Query(measurement.burst.fetch_command, timeout_seconds=burst_timeout(measurement))
+        received = time.monotonic()
+        for reading in _make_burst_readings(
+            self._timebase, self._instrument, self._device_idn, measurement, raw, scheduled, issued
+        ):
+            yield from self._emit(reading, received)
+
+    def _poll_cycle(self, scheduled: float, stop_event: threading.Event | asyncio.Event) -> Steps[None]:
+        for measurement in self._measurements:
+            if measurement.burst is not None and not stop_event.is_set():
+                yield from self._poll_burst(measurement, scheduled)
+
+        single = self._single
+        if self._batch_queries and len(single) > 1:
+            issued = time.monotonic()
+            raws = yield QueryMany(tuple(measurement.query_command for measurement in single))
+            received = time.monotonic()
+            for measurement, raw in zip(single, raws):
+                yield from self._emit(self._build_reading(measurement, raw, scheduled, issued, received), received)
+            return
+
+        for measurement in single:
+            if stop_event.is_set():
+                break
+            issued = time.monotonic()
+            raw = yield Query(measurement.query_command)
+            received = time.monotonic()
+            yield from self._emit(self._build_reading(measurement, raw, scheduled, issued, received), received)
+
+    def _wait_until(self, deadline: float) -> Steps[None]:
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            yield Wait(remaining)
+
+    def steps(self, stop_event: threading.Event | asyncio.Event) -> Steps[None]:
+        if self._timebase is None:
+            self._timebase = Timebase.now()
+        # Workers sharing a timebase also share the deadline grid, so their samples line up.
+        deadline = self._timebase.monotonic_anchor
+        cycle_index = 0
+        overruns = 0
+        skipped_ticks = 0
+
+        while not stop_event.is_set():
+            started = time.monotonic()
+            try:
+                yield from self._poll_cycle(deadline, stop_event)
+            except Exception as exc:  # pragma: no cover - hardware error path
+                if not self._recovering:
+                    self._on_error(str(exc))
+                    return
+                reason = str(exc) or type(exc).__name__
+                # Mark the gap before reconnecting, so the log shows it even if recovery never succeeds.
+                failed = time.monotonic()
+                for reading in _make_gap_readings(
+                    self._timebase, self._instrument, self._device_idn, self._measurements, reason, deadline, failed
+                ):
+                    self._on_reading(reading)
+                if not (yield Recover(reason)):
+                    if not stop_event.is_set():
+                        self._on_error(f"Connection could not be restored: {exc}")
+                    return
+                # Resume on the original grid; ticks that fell inside the outage are skipped, not replayed.
+                deadline, _ = _advance_deadline(deadline, time.monotonic(), self._interval_seconds)
+                yield from self._wait_until(deadline)
+                continue
+            finished = time.monotonic()
+
+            scheduled = deadline
+            deadline, missed = _advance_deadline(deadline, finished, self._interval_seconds)
+            if missed:
+                overruns += 1
+                skipped_ticks += missed
+            if self._metrics is not None:
+                self._metrics.record_cycle(finished - started, started - scheduled, missed)
+
+            if self._on_cycle is not None:
+                self._on_cycle(
+                    CycleStats(
+                        cycle_index=cycle_index,
+                        scheduled_at=self._timebase.wall_time(scheduled),
+                        lateness_seconds=started - scheduled,
+                        duration_seconds=finished - started,
+                        overruns=overruns,
+                        skipped_ticks=skipped_ticks,
+                    )
+                )
+            cycle_index += 1
+            yield from self._wait_until(deadline)
+
+
+class PollingWorker(threading.Thread):
+    def __init__(
+        self,
+        scpi: SCPIClient,
+        instrument: InstrumentType,
+        device_idn: str,
+        measurements: list[PollRequest],
+        interval_seconds: float,
+        on_reading: Callable[[Reading], None],
+        on_error: Callable[[str], None],
+        batch_queries: bool = False,
+        on_cycle: Callable[[CycleStats], None] | None = None,
+        timebase: Timebase | None = None,
+        metrics: AcquisitionMetrics | None = None,
+        recovery: SessionRecovery | None = None,
+        on_recovery: Callable[[RecoveryEvent], None] | None = None,
+        alarms: AlarmEngine | None = None,
+    ):
+        super().__init__(daemon=True)
+        self._scpi = scpi
         self._stop_event = threading.Event()
+        self._recovery = recovery
+        self._on_recovery = on_recovery
+        self._polling = _PollingLoop(
+            instrument=instrument,
+            device_idn=device_idn,
+            measurements=measurements,
+            interval_seconds=interval_seconds,
+            on_reading=on_reading,
+            on_error=on_error,
+            batch_queries=batch_queries,
+            on_cycle=on_cycle,
+            timebase=timebase,
+            metrics=metrics,
+            recovering=recovery is not None,
+            alarms=alarms,
+        )
 
     def stop(self) -> None:
         self._stop_event.set()
+        if self._recovery is not None:
+            self._recovery.wake()
+
+    def reattach(self, port: str | None = None) -> bool:
+        # Retries a lost connection now instead of after the backoff delay; see SessionRecovery.wake.
+        if self._recovery is None:
+            return False
+        self._recovery.wake(port)
+        return True
+
+    def _execute(self, step: Step) -> Any:
+        if isinstance(step, Wait):
+            return self._stop_event.wait(step.seconds)
+        if isinstance(step, Recover):
+            return self._recovery.recover(step.reason, self._stop_event, self._on_recovery)
+        return scpi_step(self._scpi, step)
 
     def run(self) -> None:
-        while not self._stop_event.is_set():
-            started = time.monotonic()
+        run_steps(self._polling.steps(self._stop_event), self._execute)
+
+
+class AsyncPollingWorker:
+    # PollingWorker's counterpart for one asyncio loop driving many ports; both run the same _PollingLoop steps.
+    # Await run() on the loop; stop() and reattach() may be called from any thread.
+    def __init__(
+        self,
+        scpi: AsyncSCPIClient,
+        instrument: InstrumentType,
+        device_idn: str,
+        measurements: list[PollRequest],
+        interval_seconds: float,
+        on_reading: Callable[[Reading], None],
+        on_error: Callable[[str], None],
+        batch_queries: bool = False,
+        on_cycle: Callable[[CycleStats], None] | None = None,
+        timebase: Timebase | None = None,
+        metrics: AcquisitionMetrics | None = None,
+        recovery: AsyncSessionRecovery | None = None,
+        on_recovery: Callable[[RecoveryEvent], None] | None = None,
+        alarms: AlarmEngine | None = None,
+    ):
+        self._scpi = scpi
+        self._recovery = recovery
+        self._on_recovery = on_recovery
+        self._polling = _PollingLoop(
+            instrument=instrument,
+            device_idn=device_idn,
+            measurements=measurements,
+            interval_seconds=interval_seconds,
+            on_reading=on_reading,
+            on_error=on_error,
+            batch_queries=batch_queries,
+            on_cycle=on_cycle,
+            timebase=timebase,
+            metrics=metrics,
+            recovering=recovery is not None,
+            alarms=alarms,
+        )
+        # Imported here rather than at module level so threaded polling never pays for asyncio.
+        import asyncio
+
+        self._stop_event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running = False
+
+    def stop(self) -> None:
+        # asyncio.Event is not thread-safe; once run() has started, the flag is set on the loop's own thread.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._stop_event.set)
+        else:
+            self._stop_event.set()
+        if self._recovery is not None:
+            self._recovery.wake()
+
+    def reattach(self, port: str | None = None) -> bool:
+        if self._recovery is None:
+            return False
+        self._recovery.wake(port)
+        return True
+
+    def is_alive(self) -> bool:
+        return self._running
+
+    async def _execute(self, step: Step) -> Any:
+        import asyncio
+
+        if isinstance(step, Wait):
             try:
-                for measurement in self._measurements:
-                    if self._stop_event.is_set():
-                        break
-                    raw = self._scpi.query(measurement.query_command)
-                    reading = Reading(
-                        timestamp=datetime.now(),
-                        slot_index=measurement.slot_index,
-                        instrument=self._instrument,
-                        device_idn=self._device_idn,
-                        function=measurement.function,
-                        raw_response=raw,
-                        value=parse_primary_value(raw),
-                        unit=measurement.unit,
-                    )
-                    self._on_reading(reading)
-            except Exception as exc:  # pragma: no cover - hardware error path
-                self._on_error(str(exc))
-                return
+                await asyncio.wait_for(self._stop_event.wait(), timeout=step.seconds)
+            except asyncio.TimeoutError:
+                return False
+            return True
+        if isinstance(step, Recover):
+            return await self._recovery.recover(step.reason, self._stop_event, self._on_recovery)
+        return await scpi_step_async(self._scpi, step)
+
+    async def run(self) -> None:
+        import asyncio
 
-            elapsed = time.monotonic() - started
-            remaining = self._interval_seconds - elapsed
-            if remaining > 0:
-                self._stop_event.wait(remaining)
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        try:
+            await run_steps_async(self._polling.steps(self._stop_event), self._execute)
+        finally:
+            self._running = False
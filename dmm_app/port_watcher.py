@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Callable, Final
+
+from dmm_app.models import SerialPortInfo
+from dmm_app.transport import SerialTransport
+
+PORT_ADDED: Final[str] = "added"
+PORT_REMOVED: Final[str] = "removed"
+INOTIFY: Final[str] = "inotify"
+POLLING: Final[str] = "polling"
+DEFAULT_WATCH_DIRECTORY: Final[str] = "/dev"
+DEFAULT_POLL_INTERVAL_SECONDS: Final[float] = 1.0
+# udev creates a node and its by-id links in several steps; one rescan after the burst sees all of them.
+DEFAULT_SETTLE_SECONDS: Final[float] = 0.2
+# Device node names pyserial can report: ttyUSB*, ttyACM*, ttyS*, ttyAMA*, cu.* on macOS, rfcomm*.
+SERIAL_NAME_PREFIXES: Final[tuple[str, ...]] = ("tty", "cu.", "rfcomm")
+
+_IN_MOVED_FROM: Final[int] = 0x00000040
+_IN_MOVED_TO: Final[int] = 0x00000080
+_IN_CREATE: Final[int] = 0x00000100
+_IN_DELETE: Final[int] = 0x00000200
+_IN_Q_OVERFLOW: Final[int] = 0x00004000
+_WATCH_MASK: Final[int] = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+_EVENT_HEADER: Final[struct.Struct] = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class PortEvent:
+    kind: str  # PORT_ADDED or PORT_REMOVED
+    port: SerialPortInfo
+
+
+def diff_ports(previous: dict[str, SerialPortInfo], current: Iterable[SerialPortInfo]) -> list[PortEvent]:
+    # Removals first, so a device that came back under the same name with another adapter reads as unplug + plug.
+    latest = {port.device: port for port in current}
+    events = [PortEvent(PORT_REMOVED, port) for device, port in previous.items() if latest.get(device) != port]
+    events.extend(PortEvent(PORT_ADDED, port) for device, port in latest.items() if previous.get(device) != port)
+    return events
+
+
+def reappeared(port: str, unplugged: SerialPortInfo | None, added: SerialPortInfo) -> bool:
+    # The same node name, or the same USB serial number under a new name (the OS may not reuse the old one).
+    if added.device == port:
+        return True
+    return bool(unplugged is not None and unplugged.serial_number and added.serial_number == unplugged.serial_number)
+
+
+def _open_inotify(directory: str) -> int | None:
+    if not sys.platform.startswith("linux") or not os.path.isdir(directory):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _serial_names_changed(data: bytes) -> bool:
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(data):
+        _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+        start = offset + _EVENT_HEADER.size
+        name = data[start : start + length].split(b"\0", 1)[0].decode(errors="replace")
+        offset = start + length
+        if mask & _IN_Q_OVERFLOW or name.startswith(SERIAL_NAME_PREFIXES):
+            return True
+    return False
+
+
+class PortWatcher(threading.Thread):
+    # Reports serial ports appearing and disappearing as PortEvents. On Linux an inotify watch on /dev wakes the
+    # thread only when device nodes change; elsewhere (or if inotify is unavailable) the directory listing, or on
+    # Windows the port list itself, is polled. Either way the full port description is only rebuilt after a change.
+    def __init__(
+        self,
+        on_event: Callable[[PortEvent], None],
+        scan: Callable[[], list[SerialPortInfo]] = SerialTransport.describe_serial_ports,
+        initial: Iterable[SerialPortInfo] | None = None,
+        directory: str = DEFAULT_WATCH_DIRECTORY,
+        poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        use_inotify: bool = True,
+    ):
+        super().__init__(name="port-watcher", daemon=True)
+        if poll_interval_seconds <= 0:
+            raise ValueError("Port poll interval must be positive.")
+        self._on_event = on_event
+        self._scan = scan
+        # With a starting list (from a scan the caller already made) only later changes are reported; without
+        # one, every port present at start is reported as added.
+        self._ports: dict[str, SerialPortInfo] = {port.device: port for port in initial or ()}
+        self._directory = directory
+        self._poll_interval_seconds = poll_interval_seconds
+        self._settle_seconds = settle_seconds
+        self._use_inotify = use_inotify
+        self._backend = POLLING
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._rescan_event = threading.Event()
+        # Self-pipe that interrupts the inotify wait for stop() and rescan(); select() on Windows takes sockets only.
+        self._wake_read, self._wake_write = os.pipe() if os.name != "nt" else (None, None)
+        if self._wake_write is not None:
+            os.set_blocking(self._wake_write, False)
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def ports(self) -> list[SerialPortInfo]:
+        with self._lock:
+            return list(self._ports.values())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake()
+
+    def rescan(self) -> None:
+        # Forces a scan on the watcher thread; only differences from the last scan are reported.
+        self._rescan_event.set()
+        self._wake()
+
+    def _wake(self) -> None:
+        with self._lock:
+            if self._wake_write is not None:
+                try:
+                    os.write(self._wake_write, b"\0")
+                except OSError:
+                    # A full pipe already holds a pending wake-up.
+                    pass
+
+    def run(self) -> None:
+        fd = _open_inotify(self._directory) if self._use_inotify and self._wake_read is not None else None
+        try:
+            # The watch is in place before the first scan, so nothing plugged in between is missed.
+            self._update()
+            if fd is not None:
+                self._backend = INOTIFY
+                self._watch_inotify(fd)
+            else:
+                self._watch_polling()
+        finally:
+            if fd is not None:
+                os.close(fd)
+            with self._lock:
+                pipe = (self._wake_read, self._wake_write)
+                self._wake_read = self._wake_write = None
+            for pipe_end in pipe:
+                if pipe_end is not None:
+                    os.close(pipe_end)
+
+    def _update(self) -> None:
+        try:
+            current = self._scan()
+        except Exception:
+            # Enumeration can fail transiently while a device is half set up; the next change retries.
+            return
+        with self._lock:
+            events = diff_ports(self._ports, current)
+            self._ports = {port.device: port for port in current}
+        for event in events:
+            self._on_event(event)
+
+    def _watch_inotify(self, fd: int) -> None:
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([fd, self._wake_read], [], [])
+            changed = False
+            if self._wake_read in readable:
+                os.read(self._wake_read, 512)
+            if fd in readable:
+                changed = self._drain_inotify(fd)
+            if self._stop_event.is_set():
+                break
+            if changed:
+                # Let the rest of the burst arrive, then fold it into the same rescan.
+                if self._stop_event.wait(self._settle_seconds):
+                    break
+                self._drain_inotify(fd)
+            if changed or self._rescan_event.is_set():
+                self._rescan_event.clear()
+                self._update()
+
+    @staticmethod
+    def _drain_inotify(fd: int) -> bool:
+        changed = False
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                return changed
+            if not data:
+                return changed
+            changed = _serial_names_changed(data) or changed
+
+    def _watch_polling(self) -> None:
+        # Listing a directory is far cheaper than building port descriptions (pyserial reads sysfs or the
+        # registry per port), so on POSIX the scan only runs when the listing changes.
+        listing = self._listing()
+        while not self._stop_event.wait(self._poll_interval_seconds):
+            current = self._listing()
+            if current is None or current != listing or self._rescan_event.is_set():
+                self._rescan_event.clear()
+                listing = current
+                self._update()
+
+    def _listing(self) -> frozenset[str] | None:
+        try:
+            return frozenset(name for name in os.listdir(self._directory) if name.startswith(SERIAL_NAME_PREFIXES))
+        except OSError:
+            return None
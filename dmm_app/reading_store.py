@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Final
+
+from dmm_app.columnar import NO_CATEGORY, CategoryTable, MirroredColumns, from_ns, numeric_reply, to_ns
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - import guard for environments without numpy
+    np = None
+
+# Instrument, function and unit tables hold a handful of labels; IDNs and non-numeric replies can be more varied.
+STORE_CATEGORY_DTYPES: Final[dict[str, str]] = {
+    "instrument": "int16",
+    "device_idn": "int32",
+    "function": "int16",
+    "unit": "int16",
+    "raw_response": "int32",
+}
+STORE_CATEGORY_COLUMNS: Final[tuple[str, ...]] = tuple(STORE_CATEGORY_DTYPES)
+STORE_DTYPES: Final[dict[str, str]] = {
+    "timestamp_ns": "int64",
+    "slot": "int16",
+    "value": "float64",
+    **STORE_CATEGORY_DTYPES,
+}
+DEFAULT_INITIAL_ROWS: Final[int] = 4096
+# 32 bytes per row, stored twice (see MirroredColumns), so 64 MiB when full; about 12 days of one reading per second.
+DEFAULT_MAX_ROWS: Final[int] = 1 << 20
+
+
+@dataclass(frozen=True)
+class StoreView:
+    # Zero-copy views into the store. They stay valid until the store grows or wraps past them; hold
+    # `ReadingStore.lock` while using them if a producer may still be appending, or copy what you keep.
+    timestamp_ns: np.ndarray
+    slot: np.ndarray
+    value: np.ndarray
+    codes: dict[str, np.ndarray]
+    categories: dict[str, list[str]]
+
+    def __len__(self) -> int:
+        return len(self.timestamp_ns)
+
+    def labels(self, column: str) -> list[str]:
+        table = self.categories[column]
+        return [table[code] if code != NO_CATEGORY else "" for code in self.codes[column].tolist()]
+
+
+class ReadingStore:
+    # Columnar in-memory history: int64 ns timestamps, int16 slots, float64 values, and small integer codes
+    # into interned tables for the repeated strings. Storage starts small and doubles up to max_rows, then
+    # behaves as a ring that overwrites the oldest rows.
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS, initial_rows: int = DEFAULT_INITIAL_ROWS):
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install dependencies first.")
+        if max_rows < 1:
+            raise ValueError("Reading store must hold at least one row.")
+        self._max_rows = max_rows
+        self._categories = {name: CategoryTable() for name in STORE_CATEGORY_COLUMNS}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._columns = MirroredColumns(STORE_DTYPES, min(initial_rows, max_rows))
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def capacity(self) -> int:
+        return self._columns.capacity
+
+    @property
+    def max_rows(self) -> int:
+        return self._max_rows
+
+    @property
+    def nbytes(self) -> int:
+        return self._columns.nbytes
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def append(self, reading: Reading) -> None:
+        categories = self._categories
+        with self._lock:
+            columns = self._columns
+            if len(columns) == columns.capacity < self._max_rows:
+                columns.resize(min(columns.capacity * 2, self._max_rows))
+            columns.append(
+                (
+                    to_ns(reading.timestamp),
+                    reading.slot_index,
+                    np.nan if reading.value is None else reading.value,
+                    categories["instrument"].code(reading.instrument.value),
+                    categories["device_idn"].code(reading.device_idn),
+                    categories["function"].code(reading.function.value),
+                    categories["unit"].code(reading.unit),
+                    # Numeric replies are described by value (rebuilt as in .npylog logs); only non-numeric text
+                    # (gaps, errors) is kept.
+                    NO_CATEGORY if reading.value is not None else categories["raw_response"].code(reading.raw_response),
+                )
+            )
+            self._version += 1
+
+    def extend(self, readings: Iterable[Reading]) -> None:
+        for reading in readings:
+            self.append(reading)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._columns.clear()
+            self._version += 1
+
+    def view(self, start: int = 0, stop: int | None = None) -> StoreView:
+        # Indices count from the oldest retained row, like a list slice.
+        with self._lock:
+            return self._view(start, stop)
+
+    def slot_series(self, slot_index: int) -> tuple[np.ndarray, np.ndarray]:
+        # Copies: a boolean selection cannot be a view. Timestamps are returned as float seconds for plotting.
+        with self._lock:
+            view = self._view(0, None)
+            mask = view.slot == slot_index
+            return view.timestamp_ns[mask] / 1e9, view.value[mask]
+
+    def _view(self, start: int, stop: int | None) -> StoreView:
+        columns = self._columns.window(start, stop)
+        return StoreView(
+            timestamp_ns=columns.pop("timestamp_ns"),
+            slot=columns.pop("slot"),
+            value=columns.pop("value"),
+            codes=columns,
+            categories={name: list(table.labels) for name, table in self._categories.items()},
+        )
+
+    def readings(self, start: int = 0, stop: int | None = None) -> Iterator[Reading]:
+        # Rebuilds Reading objects for consumers that need them; the store itself never holds any.
+        view = self.view(start, stop)
+        labels = {name: view.labels(name) for name in STORE_CATEGORY_COLUMNS}
+        for index, (timestamp_ns, slot, value) in enumerate(
+            zip(view.timestamp_ns.tolist(), view.slot.tolist(), view.value.tolist())
+        ):
+            is_number = value == value
+            yield Reading(
+                timestamp=from_ns(timestamp_ns),
+                slot_index=slot,
+                instrument=InstrumentType(labels["instrument"][index]),
+                device_idn=labels["device_idn"][index],
+                function=MeasurementFunction(labels["function"][index]),
+                raw_response=numeric_reply(value) if is_number else labels["raw_response"][index],
+                value=value if is_number else None,
+                unit=labels["unit"][index],
+            )
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+from dmm_app.commands import InstrumentProfile, idn_matches_profile
+from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+from dmm_app.steps import (
+    Query,
+    Reopen,
+    Step,
+    Steps,
+    Wait,
+    Write,
+    run_steps,
+    run_steps_async,
+    scpi_step,
+    scpi_step_async,
+)
+from dmm_app.transport import AsyncSerialTransport, SerialTransport, SocketTransport
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+@dataclass(frozen=True)
+class RecoveryPolicy:
+    initial_delay_seconds: float = 0.1
+    max_delay_seconds: float = 2.0
+    multiplier: float = 2.0
+    max_attempts: int | None = None
+
+
+@dataclass(frozen=True)
+class RecoveryEvent:
+    kind: str  # "lost", "retry", "recovered" or "failed"
+    attempt: int
+    message: str
+    outage_seconds: float
+
+
+class IdentityMismatchError(RuntimeError):
+    pass
+
+
+class _RecoveryCore:
+    # Policy, identity check and retarget state shared by SessionRecovery and AsyncSessionRecovery; the reconnect
+    # loop is written once as steps (see dmm_app.steps) that each of them drives.
+    def __init__(
+        self,
+        scpi: SCPIClient | AsyncSCPIClient,
+        profile: InstrumentProfile,
+        setup_commands: list[str],
+        policy: RecoveryPolicy | None = None,
+    ):
+        self._scpi = scpi
+        self._profile = profile
+        self._setup_commands = list(setup_commands)
+        self._policy = policy or RecoveryPolicy()
+        self._retarget_port: str | None = None
+
+    def _steps(
+        self,
+        reason: str,
+        stop_event: threading.Event | asyncio.Event,
+        on_event: Callable[[RecoveryEvent], None] | None,
+    ) -> Steps[bool]:
+        started = time.monotonic()
+
+        def emit(kind: str, attempt: int, message: str) -> None:
+            if on_event is not None:
+                on_event(RecoveryEvent(kind, attempt, message, time.monotonic() - started))
+
+        emit("lost", 0, reason)
+        delay = self._policy.initial_delay_seconds
+        attempt = 0
+        while not stop_event.is_set():
+            attempt += 1
+            try:
+                port, self._retarget_port = self._retarget_port, None
+                yield Reopen(port)
+                _check_identity(self._profile, (yield Query(self._profile.idn_query)).strip())
+                for setup_command in self._setup_commands:
+                    yield Write(setup_command)
+            except IdentityMismatchError as exc:
+                # A different instrument on the port will not fix itself; stop rather than poll the wrong device.
+                emit("failed", attempt, str(exc))
+                return False
+            except Exception as exc:
+                if self._policy.max_attempts is not None and attempt >= self._policy.max_attempts:
+                    emit("failed", attempt, f"Gave up after {attempt} attempts: {exc}")
+                    return False
+                emit("retry", attempt, f"{exc}; retrying in {delay:.1f} s")
+                # Woken early (port reappeared, or stop()): retry at once with the backoff reset.
+                if (yield Wait(delay)):
+                    delay = self._policy.initial_delay_seconds
+                else:
+                    delay = min(self._policy.max_delay_seconds, delay * self._policy.multiplier)
+                continue
+            if self._scpi.metrics is not None:
+                self._scpi.metrics.reconnects.inc()
+            emit("recovered", attempt, "Connection restored.")
+            return True
+        return False
+
+
+class SessionRecovery(_RecoveryCore):
+    def __init__(
+        self,
+        scpi: SCPIClient,
+        profile: InstrumentProfile,
+        setup_commands: list[str],
+        policy: RecoveryPolicy | None = None,
+    ):
+        super().__init__(scpi, profile, setup_commands, policy)
+        self._wake_event = threading.Event()
+
+    def wake(self, port: str | None = None) -> None:
+        # Cuts the current backoff wait short, e.g. when the device node has just reappeared. `port` moves a
+        # serial session to a new node name (same adapter, renamed by the OS) before the next attempt.
+        if port is not None:
+            self._retarget_port = port
+        self._wake_event.set()
+
+    def recover(
+        self,
+        reason: str,
+        stop_event: threading.Event,
+        on_event: Callable[[RecoveryEvent], None] | None = None,
+    ) -> bool:
+        return run_steps(self._steps(reason, stop_event, on_event), self._execute)
+
+    def _execute(self, step: Step) -> Any:
+        if isinstance(step, Wait):
+            # stop() on the worker also wakes this wait.
+            woken = self._wake_event.wait(step.seconds)
+            if woken:
+                self._wake_event.clear()
+            return woken
+        if isinstance(step, Reopen):
+            self._reopen(step.port)
+            return None
+        return scpi_step(self._scpi, step)
+
+    def _reopen(self, port: str | None) -> None:
+        transport = self._scpi.transport
+        if isinstance(transport, SocketTransport):
+            # A pooled socket may be shared with other sessions, so it is never closed here. SocketTransport
+            # drops a failed connection itself, and open() reconnects only if it has.
+            transport.open()
+            return
+        try:
+            transport.close()
+        except Exception:
+            pass
+        if port is not None and isinstance(transport, SerialTransport):
+            transport.retarget(port)
+        transport.open()
+
+
+class AsyncSessionRecovery(_RecoveryCore):
+    # SessionRecovery for AsyncPollingWorker: the same steps, with the I/O and the backoff wait awaited.
+    def __init__(
+        self,
+        scpi: AsyncSCPIClient,
+        profile: InstrumentProfile,
+        setup_commands: list[str],
+        policy: RecoveryPolicy | None = None,
+    ):
+        import asyncio
+
+        super().__init__(scpi, profile, setup_commands, policy)
+        self._wake_event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def wake(self, port: str | None = None) -> None:
+        # Safe to call from any thread.
+        if port is not None:
+            self._retarget_port = port
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake_event.set)
+        else:
+            self._wake_event.set()
+
+    async def recover(
+        self,
+        reason: str,
+        stop_event: asyncio.Event,
+        on_event: Callable[[RecoveryEvent], None] | None = None,
+    ) -> bool:
+        import asyncio
+
+        self._loop = asyncio.get_running_loop()
+        return await run_steps_async(self._steps(reason, stop_event, on_event), self._execute)
+
+    async def _execute(self, step: Step) -> Any:
+        import asyncio
+
+        if isinstance(step, Wait):
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=step.seconds)
+            except asyncio.TimeoutError:
+                return False
+            self._wake_event.clear()
+            return True
+        if isinstance(step, Reopen):
+            await self._reopen(step.port)
+            return None
+        return await scpi_step_async(self._scpi, step)
+
+    async def _reopen(self, port: str | None) -> None:
+        transport = self._scpi.transport
+        try:
+            await transport.close()
+        except Exception:
+            pass
+        if port is not None and isinstance(transport, AsyncSerialTransport):
+            transport.retarget(port)
+        await transport.open()
+
+
+def _check_identity(profile: InstrumentProfile, idn: str) -> None:
+    if not idn:
+        raise TimeoutError("No reply to identity query.")
+    if not idn_matches_profile(profile, idn):
+        raise IdentityMismatchError(f"Device no longer matches {profile.instrument.value} (received ID: {idn}).")
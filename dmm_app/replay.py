@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Callable, Final
+
+from dmm_app.logging_util import read_log
+from dmm_app.models import Reading
+
+AS_FAST_AS_POSSIBLE: Final[float] = 0.0
+# Readings due within this window are emitted together instead of sleeping for each one.
+MIN_WAIT_SECONDS: Final[float] = 0.002
+LAYOUT_SAMPLE_ROWS: Final[int] = 1000
+
+
+@dataclass(frozen=True)
+class ReplaySummary:
+    readings: int
+    completed: bool
+    wall_seconds: float
+    log_seconds: float
+
+
+def log_layout(path: str, sample_rows: int = LAYOUT_SAMPLE_ROWS) -> dict[int, Reading]:
+    # First reading per slot near the start of the log: enough to rebuild measurement rows before replaying.
+    layout: dict[int, Reading] = {}
+    for reading in itertools.islice(read_log(path), sample_rows):
+        layout.setdefault(reading.slot_index, reading)
+    return dict(sorted(layout.items()))
+
+
+class ReplayWorker(threading.Thread):
+    # Stands in for PollingWorker: recorded readings go to the same on_reading/on_error callbacks, paced by
+    # their original timestamps divided by `speed` (0 replays as fast as the consumer accepts them).
+    def __init__(
+        self,
+        readings: Iterable[Reading],
+        on_reading: Callable[[Reading], None],
+        on_error: Callable[[str], None],
+        speed: float = 1.0,
+        max_gap_seconds: float | None = None,
+        on_finished: Callable[[ReplaySummary], None] | None = None,
+    ):
+        super().__init__(daemon=True)
+        if speed < 0:
+            raise ValueError("Replay speed must not be negative.")
+        self._readings = readings
+        self._on_reading = on_reading
+        self._on_error = on_error
+        self._speed = speed
+        self._max_gap_seconds = max_gap_seconds
+        self._on_finished = on_finished
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def from_log(cls, path: str, **kwargs) -> ReplayWorker:
+        return cls(read_log(path), **kwargs)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        started = time.monotonic()
+        count = 0
+        log_elapsed = 0.0
+        previous = None
+        completed = False
+        try:
+            for reading in self._readings:
+                if self._stop_event.is_set():
+                    break
+                if previous is not None:
+                    step = (reading.timestamp - previous).total_seconds()
+                    # Timestamps that go backwards (clock steps, appended sessions) are replayed immediately.
+                    if step > 0:
+                        if self._max_gap_seconds is not None:
+                            step = min(step, self._max_gap_seconds)
+                        log_elapsed += step
+                previous = reading.timestamp
+                if self._speed:
+                    remaining = started + log_elapsed / self._speed - time.monotonic()
+                    if remaining > MIN_WAIT_SECONDS and self._stop_event.wait(remaining):
+                        break
+                self._on_reading(reading)
+                count += 1
+            else:
+                completed = True
+        except Exception as exc:
+            self._on_error(f"Replay failed after {count} readings: {exc}")
+            return
+        if self._on_finished is not None:
+            self._on_finished(ReplaySummary(count, completed, time.monotonic() - started, log_elapsed))
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Final
+
+from dmm_app.models import Reading
+
+DEFAULT_WINDOW: Final[int] = 256
+DEFAULT_EWMA_ALPHA: Final[float] = 0.1
+DEFAULT_QUANTILES: Final[tuple[float, ...]] = (0.5, 0.95, 0.99)
+SECONDS_PER_HOUR: Final[float] = 3600.0
+
+
+class RunningStats:
+    # Welford's update: numerically stable mean/variance without keeping samples.
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RollingStats:
+    # Fixed-size window: Welford add/remove for mean/variance and monotonic deques for min/max,
+    # so every update is O(1) amortised and memory is bounded by the window.
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        if window < 2:
+            raise ValueError("Rolling window must hold at least 2 samples.")
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self._values: deque[float] = deque(maxlen=self.window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._index = 0
+        self._minima: deque[tuple[int, float]] = deque()
+        self._maxima: deque[tuple[int, float]] = deque()
+
+    def add(self, value: float) -> None:
+        if len(self._values) == self.window:
+            self._remove(self._values[0])
+        self._values.append(value)
+        count = len(self._values)
+        delta = value - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (value - self._mean)
+
+        oldest = self._index - self.window
+        while self._minima and self._minima[-1][1] >= value:
+            self._minima.pop()
+        self._minima.append((self._index, value))
+        if self._minima[0][0] <= oldest:
+            self._minima.popleft()
+        while self._maxima and self._maxima[-1][1] <= value:
+            self._maxima.pop()
+        self._maxima.append((self._index, value))
+        if self._maxima[0][0] <= oldest:
+            self._maxima.popleft()
+        self._index += 1
+
+    def _remove(self, value: float) -> None:
+        count = len(self._values) - 1
+        if count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / count
+        # Removal can leave a tiny negative residue after cancellation.
+        self._m2 = max(0.0, self._m2 - delta * (value - self._mean))
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def std(self) -> float:
+        count = len(self._values)
+        return math.sqrt(self._m2 / (count - 1)) if count > 1 else 0.0
+
+    @property
+    def minimum(self) -> float:
+        return self._minima[0][1] if self._minima else math.nan
+
+    @property
+    def maximum(self) -> float:
+        return self._maxima[0][1] if self._maxima else math.nan
+
+
+class Ewma:
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("EWMA alpha must be in (0, 1].")
+        self.alpha = alpha
+        self.value = math.nan
+
+    def reset(self) -> None:
+        self.value = math.nan
+
+    def add(self, value: float) -> None:
+        self.value = value if math.isnan(self.value) else self.value + self.alpha * (value - self.value)
+
+
+class P2Quantile:
+    # Jain & Chlamtac's P-squared estimator: five markers adjusted with piecewise-parabolic interpolation,
+    # giving a running quantile estimate without storing the samples.
+    def __init__(self, quantile: float):
+        if not 0.0 < quantile < 1.0:
+            raise ValueError("Quantile must be in (0, 1).")
+        self.quantile = quantile
+        self.reset()
+
+    def reset(self) -> None:
+        p = self.quantile
+        self._heights: list[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        positions = self._positions
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index in range(5):
+            self._desired[index] += self._increments[index]
+        for index in (1, 2, 3):
+            offset = self._desired[index] - positions[index]
+            if (offset >= 1 and positions[index + 1] - positions[index] > 1) or (
+                offset <= -1 and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                candidate = self._parabolic(index, step)
+                if not heights[index - 1] < candidate < heights[index + 1]:
+                    candidate = heights[index] + step * (heights[index + step] - heights[index]) / (
+                        positions[index + step] - positions[index]
+                    )
+                heights[index] = candidate
+                positions[index] += step
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        below = positions[index] - positions[index - 1]
+        above = positions[index + 1] - positions[index]
+        return heights[index] + step / (positions[index + 1] - positions[index - 1]) * (
+            (below + step) * (heights[index + 1] - heights[index]) / above
+            + (above - step) * (heights[index] - heights[index - 1]) / below
+        )
+
+    @property
+    def value(self) -> float:
+        heights = self._heights
+        if not heights:
+            return math.nan
+        if len(heights) < 5:
+            return heights[round(self.quantile * (len(heights) - 1))]
+        return heights[2]
+
+
+class DriftEstimator:
+    # Least-squares slope of value against time, updated online from co-moments.
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._origin: float | None = None
+        self._count = 0
+        self._mean_time = 0.0
+        self._mean_value = 0.0
+        self._co_moment = 0.0
+        self._time_moment = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        if self._origin is None:
+            self._origin = timestamp
+        # Relative times keep the moments small; absolute epoch seconds would lose precision.
+        elapsed = timestamp - self._origin
+        self._count += 1
+        time_delta = elapsed - self._mean_time
+        self._mean_time += time_delta / self._count
+        self._mean_value += (value - self._mean_value) / self._count
+        self._co_moment += time_delta * (value - self._mean_value)
+        self._time_moment += time_delta * (elapsed - self._mean_time)
+
+    @property
+    def slope(self) -> float:
+        # Units per second; NaN until the samples span some time.
+        return self._co_moment / self._time_moment if self._time_moment > 0 else math.nan
+
+
+@dataclass(frozen=True)
+class StatisticsSnapshot:
+    count: int
+    mean: float
+    std: float
+    minimum: float
+    maximum: float
+    window_count: int
+    window_mean: float
+    window_std: float
+    ripple: float  # peak-to-peak over the rolling window
+    ewma: float
+    quantiles: tuple[tuple[float, float], ...]
+    drift_per_hour: float
+
+
+class SlotStatistics:
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+    ):
+        self._running = RunningStats()
+        self._rolling = RollingStats(window)
+        self._ewma = Ewma(ewma_alpha)
+        self._quantiles = [P2Quantile(quantile) for quantile in quantiles]
+        self._drift = DriftEstimator()
+        # Fed from the acquisition thread and read from the GUI/CLI thread.
+        self._lock = threading.Lock()
+
+    def add(self, timestamp: float, value: float) -> None:
+        if not math.isfinite(value):
+            return
+        with self._lock:
+            self._running.add(value)
+            self._rolling.add(value)
+            self._ewma.add(value)
+            for estimator in self._quantiles:
+                estimator.add(value)
+            self._drift.add(timestamp, value)
+
+    def reset(self) -> None:
+        with self._lock:
+            for part in (self._running, self._rolling, self._ewma, *self._quantiles, self._drift):
+                part.reset()
+
+    def snapshot(self) -> StatisticsSnapshot:
+        with self._lock:
+            running = self._running
+            rolling = self._rolling
+            return StatisticsSnapshot(
+                count=running.count,
+                mean=running.mean if running.count else math.nan,
+                std=running.std,
+                minimum=running.minimum if running.count else math.nan,
+                maximum=running.maximum if running.count else math.nan,
+                window_count=rolling.count,
+                window_mean=rolling.mean if rolling.count else math.nan,
+                window_std=rolling.std,
+                ripple=rolling.maximum - rolling.minimum if rolling.count else math.nan,
+                ewma=self._ewma.value,
+                quantiles=tuple((estimator.quantile, estimator.value) for estimator in self._quantiles),
+                drift_per_hour=self._drift.slope * SECONDS_PER_HOUR,
+            )
+
+
+class ReadingStatistics:
+    # One SlotStatistics per measurement slot, fed directly by the Reading stream (usable as a bridge sink).
+    # Gap and unparsed readings carry no value and are skipped.
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+    ):
+        self._window = window
+        self._ewma_alpha = ewma_alpha
+        self._quantiles = quantiles
+        self._slots: dict[int, SlotStatistics] = {}
+        self._units: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add_reading(self, reading: Reading) -> None:
+        if reading.value is None:
+            return
+        slot = self._slots.get(reading.slot_index)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.setdefault(
+                    reading.slot_index, SlotStatistics(self._window, self._ewma_alpha, self._quantiles)
+                )
+                self._units[reading.slot_index] = reading.unit
+        slot.add(reading.timestamp.timestamp(), reading.value)
+
+    def slot(self, slot_index: int) -> SlotStatistics | None:
+        return self._slots.get(slot_index)
+
+    def unit(self, slot_index: int) -> str:
+        return self._units.get(slot_index, "")
+
+    def snapshots(self) -> dict[int, StatisticsSnapshot]:
+        with self._lock:
+            slots = dict(self._slots)
+        return {slot_index: slots[slot_index].snapshot() for slot_index in sorted(slots)}
+
+    def reset(self, slot_index: int | None = None) -> None:
+        with self._lock:
+            if slot_index is None:
+                self._slots.clear()
+                self._units.clear()
+            else:
+                self._slots.pop(slot_index, None)
+                self._units.pop(slot_index, None)
+
+
+def format_statistics(snapshot: StatisticsSnapshot, unit: str = "") -> str:
+    if not snapshot.count:
+        return "no samples"
+    suffix = f" {unit}" if unit else ""
+    quantiles = " ".join(f"p{quantile * 100:g}={value:.6g}" for quantile, value in snapshot.quantiles)
+    drift = "--" if math.isnan(snapshot.drift_per_hour) else f"{snapshot.drift_per_hour:+.3g}{suffix}/h"
+    return (
+        f"n={snapshot.count} mean={snapshot.mean:.6g}{suffix} sd={snapshot.std:.3g} "
+        f"min={snapshot.minimum:.6g} max={snapshot.maximum:.6g} "
+        f"ripple={snapshot.ripple:.3g} (last {snapshot.window_count}) ewma={snapshot.ewma:.6g} "
+        f"{quantiles} drift={drift}"
+    )
@@ -1,26 +1,236 @@
 from __future__ import annotations
 
 import threading
+import time
+import weakref
+from collections.abc import Sequence
 
-from dmm_app.transport import Transport
+from dmm_app.metrics import AcquisitionMetrics
+from dmm_app.transport import AsyncTransport, Transport
+
+
+# Clients that share a pooled transport must also share its lock, or their write/read pairs interleave.
+_TRANSPORT_LOCKS: weakref.WeakKeyDictionary[Transport, threading.Lock] = weakref.WeakKeyDictionary()
+_TRANSPORT_LOCKS_GUARD = threading.Lock()
+
+
+def _transport_lock(transport: Transport) -> threading.Lock:
+    with _TRANSPORT_LOCKS_GUARD:
+        lock = _TRANSPORT_LOCKS.get(transport)
+        if lock is None:
+            lock = threading.Lock()
+            _TRANSPORT_LOCKS[transport] = lock
+        return lock
 
 
 class SCPIClient:
-    def __init__(self, transport: Transport, terminator: str = "\n", encoding: str = "ascii"):
+    def __init__(
+        self,
+        transport: Transport,
+        terminator: str = "\n",
+        encoding: str = "ascii",
+        metrics: AcquisitionMetrics | None = None,
+    ):
         self._transport = transport
         self._terminator = terminator
         self._encoding = encoding
-        self._lock = threading.Lock()
+        self._lock = _transport_lock(transport)
+        self._metrics = metrics
+
+    @property
+    def transport(self) -> Transport:
+        return self._transport
+
+    @property
+    def metrics(self) -> AcquisitionMetrics | None:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: AcquisitionMetrics | None) -> None:
+        self._metrics = metrics
 
     def write(self, command: str) -> None:
         payload = f"{command}{self._terminator}".encode(self._encoding)
-        with self._lock:
-            self._transport.write(payload)
+        self._exchange(payload, 0)
 
-    def query(self, command: str) -> str:
+    def query(self, command: str, timeout_seconds: float | None = None) -> str:
+        # timeout_seconds overrides the transport's reply timeout for this query only.
         payload = f"{command}{self._terminator}".encode(self._encoding)
+        response = self._exchange(payload, 1, timeout_seconds)[0]
+        return response.decode(self._encoding, errors="replace").strip()
+
+    def query_many(self, commands: Sequence[str], compound: bool = True) -> list[str]:
+        if not commands:
+            return []
+        if compound:
+            payload = f"{_join_compound(commands)}{self._terminator}".encode(self._encoding)
+            response = self._exchange(payload, 1)[0]
+            replies = response.decode(self._encoding, errors="replace").strip().split(";")
+        else:
+            payload = "".join(f"{command}{self._terminator}" for command in commands).encode(self._encoding)
+            replies = [
+                response.decode(self._encoding, errors="replace") for response in self._exchange(payload, len(commands))
+            ]
+        if len(replies) != len(commands):
+            raise RuntimeError(f"Expected {len(commands)} replies to batched query, received {len(replies)}.")
+        return [reply.strip() for reply in replies]
+
+    def _exchange(self, payload: bytes, frames: int, timeout: float | None = None) -> list[bytes]:
+        terminator = self._terminator.encode(self._encoding)
+        metrics = self._metrics
+        if metrics is None:
+            with self._lock:
+                self._transport.write(payload)
+                return [self._transport.read_until(terminator, timeout) for _ in range(frames)]
+        return self._timed_exchange(payload, frames, terminator, metrics, timeout)
+
+    def _timed_exchange(
+        self, payload: bytes, frames: int, terminator: bytes, metrics: AcquisitionMetrics, timeout: float | None
+    ) -> list[bytes]:
+        requested = time.monotonic()
         with self._lock:
-            self._transport.write(payload)
-            response = self._transport.read_until(self._terminator.encode(self._encoding))
+            acquired = time.monotonic()
+            try:
+                self._transport.write(payload)
+                written = time.monotonic()
+                responses = []
+                first_byte = None
+                for _ in range(frames):
+                    responses.append(self._transport.read_until(terminator, timeout))
+                    if first_byte is None:
+                        first_byte = self._transport.first_byte_at
+                finished = time.monotonic()
+            except Exception:
+                metrics.errors.inc()
+                raise
+        _record_exchange(metrics, terminator, responses, requested, acquired, written, first_byte, finished)
+        return responses
+
+
+def _record_exchange(
+    metrics: AcquisitionMetrics,
+    terminator: bytes,
+    responses: list[bytes],
+    requested: float,
+    acquired: float,
+    written: float,
+    first_byte: float | None,
+    finished: float,
+) -> None:
+    metrics.lock_wait_seconds.record(acquired - requested)
+    metrics.write_seconds.record(written - acquired)
+    if not responses:
+        return
+    metrics.queries.inc()
+    metrics.reply_bytes.record(sum(len(response) for response in responses))
+    if not all(response.endswith(terminator) for response in responses):
+        metrics.timeouts.inc()
+    elif first_byte is not None:
+        # Bytes that were already buffered before the write count as an immediate reply.
+        first_byte = max(first_byte, written)
+        metrics.first_byte_seconds.record(first_byte - written)
+        metrics.read_seconds.record(finished - first_byte)
+
+
+class AsyncSCPIClient:
+    def __init__(
+        self,
+        transport: AsyncTransport,
+        terminator: str = "\n",
+        encoding: str = "ascii",
+        timeout_seconds: float | None = 1.0,
+        metrics: AcquisitionMetrics | None = None,
+    ):
+        self._transport = transport
+        self._terminator = terminator
+        self._encoding = encoding
+        self._timeout_seconds = timeout_seconds
+        self._metrics = metrics
+        # asyncio is imported where it is used: the threaded clients (and the GUI's startup) never need it.
+        import asyncio
+
+        self._lock = asyncio.Lock()
+
+    @property
+    def transport(self) -> AsyncTransport:
+        return self._transport
+
+    @property
+    def metrics(self) -> AcquisitionMetrics | None:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: AcquisitionMetrics | None) -> None:
+        self._metrics = metrics
+
+    async def write(self, command: str) -> None:
+        payload = f"{command}{self._terminator}".encode(self._encoding)
+        await self._exchange(payload, 0, None)
+
+    async def query(self, command: str, timeout_seconds: float | None = None) -> str:
+        payload = f"{command}{self._terminator}".encode(self._encoding)
+        response = (await self._exchange(payload, 1, self._timeout(timeout_seconds)))[0]
         return response.decode(self._encoding, errors="replace").strip()
 
+    async def query_many(
+        self, commands: Sequence[str], compound: bool = True, timeout_seconds: float | None = None
+    ) -> list[str]:
+        if not commands:
+            return []
+        timeout = self._timeout(timeout_seconds)
+        if compound:
+            payload = f"{_join_compound(commands)}{self._terminator}".encode(self._encoding)
+            response = (await self._exchange(payload, 1, timeout))[0]
+            replies = response.decode(self._encoding, errors="replace").strip().split(";")
+        else:
+            payload = "".join(f"{command}{self._terminator}" for command in commands).encode(self._encoding)
+            replies = [
+                response.decode(self._encoding, errors="replace")
+                for response in await self._exchange(payload, len(commands), timeout)
+            ]
+        if len(replies) != len(commands):
+            raise RuntimeError(f"Expected {len(commands)} replies to batched query, received {len(replies)}.")
+        return [reply.strip() for reply in replies]
+
+    async def _exchange(self, payload: bytes, frames: int, timeout: float | None) -> list[bytes]:
+        import asyncio
+
+        terminator = self._terminator.encode(self._encoding)
+        metrics = self._metrics
+        requested = time.monotonic()
+        async with self._lock:
+            acquired = time.monotonic()
+            try:
+                await self._transport.write(payload)
+                written = time.monotonic()
+                responses = []
+                first_byte = None
+                for _ in range(frames):
+                    responses.append(await asyncio.wait_for(self._transport.read_until(terminator), timeout=timeout))
+                    if first_byte is None:
+                        first_byte = self._transport.first_byte_at
+                finished = time.monotonic()
+            except asyncio.TimeoutError:
+                # Matches the threaded serial transport, which hands back and forgets a partial frame on timeout.
+                self._transport.discard_pending()
+                if metrics is not None:
+                    metrics.timeouts.inc()
+                raise
+            except Exception:
+                if metrics is not None:
+                    metrics.errors.inc()
+                raise
+        if metrics is not None:
+            _record_exchange(metrics, terminator, responses, requested, acquired, written, first_byte, finished)
+        return responses
+
+    def _timeout(self, timeout_seconds: float | None) -> float | None:
+        return self._timeout_seconds if timeout_seconds is None else timeout_seconds
+
+
+def _join_compound(commands: Sequence[str]) -> str:
+    # Subsequent headers are rooted with ':' so each command resolves from the top of the SCPI tree.
+    parts = [commands[0]]
+    for command in commands[1:]:
+        parts.append(command if command.startswith((":", "*")) else f":{command}")
+    return ";".join(parts)
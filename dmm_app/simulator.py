@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Final
+
+from dmm_app.commands import INSTRUMENT_PROFILES
+from dmm_app.models import InstrumentType, MeasurementFunction
+from dmm_app.transport import Transport
+
+SIMULATED_IDN: Final[dict[InstrumentType, str]] = {
+    InstrumentType.MP730889: "MULTICOMP PRO,MP730889,SIM0001,1.00",
+    InstrumentType.OWON_SPE6103: "OWON,SPE6103,SIM0001,FV:V1.0",
+}
+OVERFLOW_REPLY: Final[str] = "9.9E37"
+GARBAGE_REPLY: Final[str] = "ERR"
+# 8N1 framing: a start and stop bit around every data byte.
+BITS_PER_BYTE: Final[int] = 10
+
+_HEADER_NODE = re.compile(r"^([A-Za-z*]+?)(\d*)$")
+
+
+@dataclass(frozen=True)
+class SimulatedFaults:
+    no_reply_probability: float = 0.0
+    garbage_probability: float = 0.0
+    overflow_probability: float = 0.0
+    # The instrument drops off the bus after answering this many queries (counting *IDN?), as if unplugged.
+    # SimulatedTransport then fails every write and open with ConnectionError until `connected` is set again.
+    disconnect_after_queries: int | None = None
+
+
+@dataclass(frozen=True)
+class SimulatorSettings:
+    instrument: InstrumentType
+    latency_seconds: float = 0.0
+    baudrate: int | None = None
+    noise: float = 0.0
+    values: dict[MeasurementFunction, float] = field(
+        default_factory=lambda: {MeasurementFunction.VOLTAGE: 5.0, MeasurementFunction.CURRENT: 0.1}
+    )
+    faults: SimulatedFaults = SimulatedFaults()
+    seed: int | None = None
+
+
+def _node_matches(token: str, pattern: str) -> bool:
+    # SCPI headers accept the short form (the uppercase part of the pattern) or the full long form,
+    # case-insensitively, with an optional numeric suffix that must match exactly.
+    token_match = _HEADER_NODE.match(token)
+    pattern_match = _HEADER_NODE.match(pattern)
+    if not token_match or not pattern_match:
+        return False
+    token_word, token_suffix = token_match.groups()
+    pattern_word, pattern_suffix = pattern_match.groups()
+    if token_suffix != pattern_suffix and not (pattern_suffix == "1" and not token_suffix):
+        return False
+    short_form = "".join(char for char in pattern_word if not char.islower())
+    return token_word.upper() in (short_form.upper(), pattern_word.upper())
+
+
+def scpi_header_matches(command: str, pattern: str) -> bool:
+    command_nodes = command.strip().lstrip(":").rstrip("?").split(":")
+    pattern_nodes = pattern.lstrip(":").rstrip("?").split(":")
+    if command.strip().endswith("?") != pattern.endswith("?") or len(command_nodes) != len(pattern_nodes):
+        return False
+    return all(_node_matches(token, node) for token, node in zip(command_nodes, pattern_nodes))
+
+
+class SimulatedInstrument:
+    def __init__(self, settings: SimulatorSettings):
+        if settings.instrument not in INSTRUMENT_PROFILES:
+            raise ValueError(f"No profile for {settings.instrument}.")
+        self._settings = settings
+        self._random = random.Random(settings.seed)
+        self._mode = MeasurementFunction.VOLTAGE
+        self._lock = threading.Lock()
+        self.commands_received = 0
+        self.queries_answered = 0
+        # SPE6103 output state; measurements read zero while the output is off.
+        self.output_enabled = True
+        # MP730889 SCPI trigger model (commands.SCPI_BURST): INITiate takes sample_count readings into the buffer
+        # that FETCh? returns.
+        self.sample_count = 1
+        self.triggers = 0
+        self._samples: list[str] | None = None
+        self.connected = True
+
+    @property
+    def settings(self) -> SimulatorSettings:
+        return self._settings
+
+    def byte_seconds(self) -> float:
+        if not self._settings.baudrate:
+            return 0.0
+        return BITS_PER_BYTE / self._settings.baudrate
+
+    def handle_line(self, line: str) -> str | None:
+        # One program message may hold several `;`-separated commands; replies are joined the same way.
+        with self._lock:
+            replies: list[str] = []
+            for command in line.strip().split(";"):
+                if not command.strip():
+                    continue
+                self.commands_received += 1
+                reply = self._handle_command(command.strip())
+                if reply is not None:
+                    replies.append(reply)
+            if not replies:
+                return None
+            faults = self._settings.faults
+            if self._random.random() < faults.no_reply_probability:
+                return None
+            self.queries_answered += 1
+            limit = faults.disconnect_after_queries
+            if limit is not None and self.queries_answered >= limit:
+                self.connected = False
+            return ";".join(replies)
+
+    def _handle_command(self, command: str) -> str | None:
+        if scpi_header_matches(command, "*IDN?"):
+            return SIMULATED_IDN[self._settings.instrument]
+        if scpi_header_matches(command, "SYSTem:REMote") or scpi_header_matches(command, "SYSTem:LOCal"):
+            return None
+        if self._settings.instrument == InstrumentType.MP730889:
+            return self._handle_mp730889(command)
+        return self._handle_spe6103(command)
+
+    def _handle_mp730889(self, command: str) -> str | None:
+        if scpi_header_matches(command, "CONFigure:VOLTage:DC"):
+            self._mode = MeasurementFunction.VOLTAGE
+            return None
+        if scpi_header_matches(command, "CONFigure:CURRent:DC"):
+            self._mode = MeasurementFunction.CURRENT
+            return None
+        if scpi_header_matches(command, "MEASure1?"):
+            return self._measure(self._mode)
+        if scpi_header_matches(command, "MEASure2?"):
+            return self._format(0.0)
+        return self._handle_trigger_model(command)
+
+    def _handle_trigger_model(self, command: str) -> str | None:
+        header, _, argument = command.partition(" ")
+        if scpi_header_matches(header, "SAMPle:COUNt"):
+            if argument.strip().isdigit():
+                self.sample_count = max(1, int(argument))
+            return None
+        if scpi_header_matches(command, "INITiate"):
+            self.triggers += 1
+            self._samples = [self._measure(self._mode) for _ in range(self.sample_count)]
+            return None
+        if scpi_header_matches(command, "FETCh?"):
+            # Real instruments answer FETCh? once the burst is complete; the simulator takes its samples at INITiate.
+            # Without a trigger there is nothing to fetch and no reply, so the query times out.
+            return None if self._samples is None else ",".join(self._samples)
+        # TRIGger:SOURce, SAMPle:SOURce and SAMPle:TIMer are accepted; samples are not spaced in time.
+        return None
+
+    def _handle_spe6103(self, command: str) -> str | None:
+        if scpi_header_matches(command, "OUTPut?"):
+            return "ON" if self.output_enabled else "OFF"
+        header, _, argument = command.partition(" ")
+        if scpi_header_matches(header, "OUTPut") or scpi_header_matches(header, "OUTPut:STATe"):
+            if argument.strip().upper() in ("ON", "1", "OFF", "0"):
+                self.output_enabled = argument.strip().upper() in ("ON", "1")
+            return None
+        if scpi_header_matches(command, "MEASure:VOLTage?"):
+            return self._measure(MeasurementFunction.VOLTAGE)
+        if scpi_header_matches(command, "MEASure:CURRent?"):
+            return self._measure(MeasurementFunction.CURRENT)
+        if scpi_header_matches(command, "MEASure:POWer?"):
+            return self._format(self._value(MeasurementFunction.VOLTAGE) * self._value(MeasurementFunction.CURRENT))
+        if scpi_header_matches(command, "MEASure:ALL?"):
+            voltage = self._value(MeasurementFunction.VOLTAGE)
+            current = self._value(MeasurementFunction.CURRENT)
+            return ",".join(self._format(value) for value in (voltage, current, voltage * current))
+        return None
+
+    def _value(self, function: MeasurementFunction) -> float:
+        if not self.output_enabled:
+            return 0.0
+        nominal = self._settings.values.get(function, 0.0)
+        if not self._settings.noise:
+            return nominal
+        return nominal + self._random.gauss(0.0, self._settings.noise)
+
+    def _measure(self, function: MeasurementFunction) -> str:
+        faults = self._settings.faults
+        roll = self._random.random()
+        if roll < faults.garbage_probability:
+            return GARBAGE_REPLY
+        if roll < faults.garbage_probability + faults.overflow_probability:
+            return OVERFLOW_REPLY
+        return self._format(self._value(function))
+
+    @staticmethod
+    def _format(value: float) -> str:
+        return f"{value:.6E}"
+
+
+class SimulatedTransport(Transport):
+    def __init__(self, instrument: SimulatedInstrument, timeout_seconds: float = 1.0):
+        self._instrument = instrument
+        self._timeout_seconds = timeout_seconds
+        self._open = False
+        self._request = bytearray()
+        self._received = bytearray()
+        # Replies waiting on the simulated wire: (first byte arrives, last byte arrives, payload).
+        self._pending: list[tuple[float, float, bytes]] = []
+        self._line_free_at = 0.0
+        self._received_since: float | None = None
+        self._frame_started_at: float | None = None
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    @property
+    def instrument(self) -> SimulatedInstrument:
+        return self._instrument
+
+    def open(self) -> None:
+        if not self._instrument.connected:
+            raise ConnectionError("Simulated instrument is disconnected.")
+        self._open = True
+        self._request.clear()
+        self._received.clear()
+        self._pending.clear()
+
+    def close(self) -> None:
+        self._open = False
+
+    def write(self, payload: bytes) -> None:
+        if not self._open:
+            raise RuntimeError("Simulated connection is not open.")
+        if not self._instrument.connected:
+            self._open = False
+            raise ConnectionError("Simulated instrument is disconnected.")
+        self.bytes_written += len(payload)
+        byte_seconds = self._instrument.byte_seconds()
+        # The request occupies the line first, then the instrument thinks, then the reply is clocked out.
+        arrived_at = max(time.monotonic(), self._line_free_at) + len(payload) * byte_seconds
+        self._line_free_at = arrived_at
+        self._request += payload
+        while True:
+            index = self._request.find(b"\n")
+            if index < 0:
+                break
+            line = self._request[:index].decode("ascii", errors="replace")
+            del self._request[: index + 1]
+            reply = self._instrument.handle_line(line)
+            if reply is None:
+                continue
+            data = f"{reply}\n".encode("ascii")
+            first_at = self._line_free_at + self._instrument.settings.latency_seconds + byte_seconds
+            ready_at = first_at + (len(data) - 1) * byte_seconds
+            self._line_free_at = ready_at
+            self._pending.append((first_at, ready_at, data))
+
+    def read_until(self, terminator: bytes, timeout_seconds: float | None = None) -> bytes:
+        if not self._open:
+            raise RuntimeError("Simulated connection is not open.")
+        deadline = time.monotonic() + (self._timeout_seconds if timeout_seconds is None else timeout_seconds)
+        while True:
+            now = time.monotonic()
+            while self._pending and self._pending[0][1] <= now:
+                first_at, _, data = self._pending.pop(0)
+                if not self._received:
+                    self._received_since = first_at
+                self._received += data
+            index = self._received.find(terminator)
+            if index >= 0:
+                end = index + len(terminator)
+                frame = bytes(self._received[:end])
+                del self._received[:end]
+                return self._deliver(frame)
+            if now >= deadline:
+                # Timed out: hand back the partial frame, matching SerialTransport.
+                frame = bytes(self._received)
+                self._received.clear()
+                return self._deliver(frame)
+            wake_at = deadline if not self._pending else min(deadline, self._pending[0][1])
+            time.sleep(max(0.0, wake_at - now))
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def first_byte_at(self) -> float | None:
+        return self._frame_started_at
+
+    def _deliver(self, frame: bytes) -> bytes:
+        self.bytes_read += len(frame)
+        self._frame_started_at = self._received_since if frame else None
+        if not self._received:
+            self._received_since = None
+        return frame
+
+
+# Serves a SimulatedInstrument on a pseudo-terminal so SerialTransport (and the GUI/CLI) can open it by name.
+class PtyLoopback:
+    def __init__(self, instrument: SimulatedInstrument):
+        if os.name != "posix":
+            raise RuntimeError("Pty loopback requires a POSIX system.")
+        self._instrument = instrument
+        self._master_fd: int | None = None
+        self._slave_fd: int | None = None
+        self._port = ""
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    def start(self) -> str:
+        import tty
+
+        self._master_fd, self._slave_fd = os.openpty()
+        # Raw mode: no echo or newline translation, so bytes reach the client exactly as the device sent them.
+        tty.setraw(self._slave_fd)
+        self._port = os.ttyname(self._slave_fd)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._serve, name="pty-loopback", daemon=True)
+        self._thread.start()
+        return self._port
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master_fd = None
+        self._slave_fd = None
+
+    def __enter__(self) -> PtyLoopback:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _line_speed_matches(self) -> bool:
+        import termios
+
+        baudrate = self._instrument.settings.baudrate
+        if baudrate is None:
+            return True
+        try:
+            configured = termios.tcgetattr(self._slave_fd)[5]
+        except termios.error:
+            return True
+        return configured == getattr(termios, f"B{baudrate}", configured)
+
+    def _serve(self) -> None:
+        import select
+
+        request = bytearray()
+        byte_seconds = self._instrument.byte_seconds()
+        latency = self._instrument.settings.latency_seconds
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self._master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._master_fd, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            request += data
+            while True:
+                index = request.find(b"\n")
+                if index < 0:
+                    break
+                line = request[:index].decode("ascii", errors="replace")
+                del request[: index + 1]
+                reply = self._instrument.handle_line(line)
+                if reply is None:
+                    continue
+                payload = f"{reply}\n".encode("ascii")
+                if not self._line_speed_matches():
+                    # A real device at the wrong baud rate produces framing garbage with no terminator.
+                    payload = bytes(byte | 0x80 for byte in payload.rstrip(b"\n"))
+                delay = latency + (len(line) + 1 + len(payload)) * byte_seconds
+                if delay:
+                    time.sleep(delay)
+                os.write(self._master_fd, payload)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a simulated instrument on a pseudo-terminal.")
+    parser.add_argument("--instrument", choices=[item.name.lower() for item in InstrumentType], required=True)
+    parser.add_argument("--latency", type=float, default=0.005, help="Per-query processing delay in seconds")
+    parser.add_argument("--baud", type=int, default=9600, help="Emulated line rate; 0 disables byte timing")
+    parser.add_argument("--noise", type=float, default=0.0, help="Gaussian noise standard deviation")
+    parser.add_argument("--no-reply", type=float, default=0.0, help="Probability a query gets no reply")
+    parser.add_argument("--garbage", type=float, default=0.0, help="Probability a reading is non-numeric")
+    parser.add_argument("--overflow", type=float, default=0.0, help="Probability a reading is 9.9E37")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    settings = SimulatorSettings(
+        instrument=InstrumentType[args.instrument.upper()],
+        latency_seconds=args.latency,
+        baudrate=args.baud or None,
+        noise=args.noise,
+        faults=SimulatedFaults(
+            no_reply_probability=args.no_reply,
+            garbage_probability=args.garbage,
+            overflow_probability=args.overflow,
+        ),
+        seed=args.seed,
+    )
+    loopback = PtyLoopback(SimulatedInstrument(settings))
+    port = loopback.start()
+    print(f"Simulated {settings.instrument.value} on {port} (Ctrl+C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loopback.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
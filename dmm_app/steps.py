@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Generator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar, Union
+
+if TYPE_CHECKING:
+    from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+
+T = TypeVar("T")
+
+
+# Logic shared by the threaded and asyncio paths (poll cycles, reconnect, alarm actions) is written once as a
+# generator that yields these requests instead of doing I/O. A driver carries each one out, blocking or awaiting,
+# and sends back the result; an exception is thrown back into the generator at the yield.
+@dataclass(frozen=True)
+class Write:
+    command: str
+
+
+@dataclass(frozen=True)
+class Query:
+    command: str
+    timeout_seconds: float | None = None
+
+
+@dataclass(frozen=True)
+class QueryMany:
+    commands: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Wait:
+    # Sleep up to `seconds`; the result is True if the owner was woken (stopped, or told to retry) first.
+    seconds: float
+
+
+@dataclass(frozen=True)
+class Reopen:
+    # Reopen the transport after a lost connection, on `port` if the device node was renamed.
+    port: str | None = None
+
+
+@dataclass(frozen=True)
+class Recover:
+    # Run the session's reconnect; the result is True once the connection is back.
+    reason: str
+
+
+Step = Union[Write, Query, QueryMany, Wait, Reopen, Recover]
+Steps = Generator[Step, Any, T]
+
+
+def run_steps(steps: Steps[T], execute: Callable[[Step], Any]) -> T:
+    result: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            step = steps.send(result) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            result, error = execute(step), None
+        except Exception as exc:
+            result, error = None, exc
+
+
+async def run_steps_async(steps: Steps[T], execute: Callable[[Step], Awaitable[Any]]) -> T:
+    result: Any = None
+    error: Exception | None = None
+    while True:
+        try:
+            step = steps.send(result) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            result, error = await execute(step), None
+        except Exception as exc:
+            result, error = None, exc
+
+
+def scpi_step(scpi: SCPIClient, step: Step) -> Any:
+    if isinstance(step, Query):
+        return scpi.query(step.command, timeout_seconds=step.timeout_seconds)
+    if isinstance(step, QueryMany):
+        return scpi.query_many(list(step.commands))
+    if isinstance(step, Write):
+        return scpi.write(step.command)
+    raise TypeError(f"Unexpected step: {step!r}")
+
+
+async def scpi_step_async(scpi: AsyncSCPIClient, step: Step) -> Any:
+    if isinstance(step, Query):
+        return await scpi.query(step.command, timeout_seconds=step.timeout_seconds)
+    if isinstance(step, QueryMany):
+        return await scpi.query_many(list(step.commands))
+    if isinstance(step, Write):
+        return await scpi.write(step.command)
+    raise TypeError(f"Unexpected step: {step!r}")
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import os
+import socket
+import threading
+import time
 from abc import ABC, abstractmethod
+from dataclasses import replace
 from typing import Final
 
-from dmm_app.models import SerialSettings
+from dmm_app.models import SerialPortInfo, SerialSettings, SocketSettings
 
-try:
-    import serial
-    from serial.tools import list_ports
-except ImportError:  # pragma: no cover - import guard for environments without pyserial
-    serial = None
-    list_ports = None
+SERIAL_BAUD_RATES: Final[tuple[int, ...]] = (1200, 2400, 4800, 9600, 19200, 38400, 57600, 115200)
+
+
+def _import_pyserial():
+    # Deferred until a port is listed or opened, so importing this module (and starting the GUI) stays cheap.
+    try:
+        import serial
+        from serial.tools import list_ports
+    except ImportError:  # pragma: no cover - import guard for environments without pyserial
+        return None, None
+    return serial, list_ports
 
 
 class Transport(ABC):
@@ -27,7 +37,8 @@ class Transport(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def read_until(self, terminator: bytes) -> bytes:
+    def read_until(self, terminator: bytes, timeout_seconds: float | None = None) -> bytes:
+        # timeout_seconds overrides the configured reply timeout for this frame (e.g. a long burst fetch).
         raise NotImplementedError
 
     @property
@@ -35,19 +46,100 @@ class Transport(ABC):
     def is_open(self) -> bool:
         raise NotImplementedError
 
+    @property
+    def first_byte_at(self) -> float | None:
+        # time.monotonic() at which the first byte of the last frame returned by read_until arrived, when known.
+        return None
+
+
+class _ReceiveBuffer:
+    def __init__(self, chunk_size: int = 4096):
+        self._data = bytearray()
+        self._scanned = 0
+        self._pending_since: float | None = None
+        self.frame_started_at: float | None = None
+        self._chunk = bytearray(chunk_size)
+        self._chunk_view = memoryview(self._chunk)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._scanned = 0
+        self._pending_since = None
+
+    def chunk(self, size: int | None = None) -> memoryview:
+        if size is not None and size > len(self._chunk):
+            self._chunk_view.release()
+            self._chunk = bytearray(size)
+            self._chunk_view = memoryview(self._chunk)
+        return self._chunk_view if size is None else self._chunk_view[:size]
+
+    def commit(self, count: int) -> None:
+        if count and self._pending_since is None:
+            self._pending_since = time.monotonic()
+        self._data += self._chunk_view[:count]
+
+    def take_until(self, terminator: bytes) -> bytes | None:
+        # Resume scanning where the previous call stopped so long partial frames are not rescanned.
+        index = self._data.find(terminator, self._scanned)
+        if index < 0:
+            self._scanned = max(0, len(self._data) - len(terminator) + 1)
+            return None
+        end = index + len(terminator)
+        with memoryview(self._data) as view:
+            frame = bytes(view[:end])
+        del self._data[:end]
+        self._scanned = 0
+        self.frame_started_at = self._pending_since
+        if not self._data:
+            self._pending_since = None
+        return frame
+
+    def take_all(self) -> bytes:
+        frame = bytes(self._data)
+        self.frame_started_at = self._pending_since
+        self.clear()
+        return frame
+
 
 class SerialTransport(Transport):
-    def __init__(self, settings: SerialSettings):
-        self._settings: Final[SerialSettings] = settings
+    def __init__(self, settings: SerialSettings, read_chunk_size: int = 4096):
+        self._settings = settings
         self._connection = None
+        self._buffer = _ReceiveBuffer(read_chunk_size)
+
+    def retarget(self, port: str) -> None:
+        # Same line settings on another device node; takes effect on the next open().
+        self.close()
+        self._settings = replace(self._settings, port=port)
 
     @staticmethod
     def list_serial_ports() -> list[str]:
+        _, list_ports = _import_pyserial()
         if list_ports is None:
             return []
         return [port.device for port in list_ports.comports()]
 
+    @staticmethod
+    def describe_serial_ports() -> list[SerialPortInfo]:
+        _, list_ports = _import_pyserial()
+        if list_ports is None:
+            return []
+        return [
+            SerialPortInfo(
+                device=port.device,
+                serial_number=port.serial_number or None,
+                description=port.description or "",
+                vid=port.vid,
+                pid=port.pid,
+            )
+            for port in list_ports.comports()
+        ]
+
     def open(self) -> None:
+        serial, _ = _import_pyserial()
         if serial is None:
             raise RuntimeError("pyserial is not installed. Install dependencies first.")
         if self._connection and self._connection.is_open:
@@ -60,22 +152,345 @@ class SerialTransport(Transport):
             stopbits=self._settings.stopbits,
             timeout=self._settings.timeout_seconds,
         )
+        self._buffer.clear()
 
     def close(self) -> None:
         if self._connection and self._connection.is_open:
             self._connection.close()
+        self._buffer.clear()
 
     def write(self, payload: bytes) -> None:
         if not self._connection or not self._connection.is_open:
             raise RuntimeError("Serial connection is not open.")
         self._connection.write(payload)
 
-    def read_until(self, terminator: bytes) -> bytes:
+    def read_until(self, terminator: bytes, timeout_seconds: float | None = None) -> bytes:
         if not self._connection or not self._connection.is_open:
             raise RuntimeError("Serial connection is not open.")
-        return self._connection.read_until(expected=terminator)
+        frame = self._buffer.take_until(terminator)
+        deadline = time.monotonic() + (self._settings.timeout_seconds if timeout_seconds is None else timeout_seconds)
+        while frame is None:
+            # Drain everything already received in one call; block for a single byte only when idle. An idle
+            # read returns after the port's own timeout, so a longer deadline simply takes several of them.
+            waiting = self._connection.in_waiting
+            count = self._connection.readinto(self._buffer.chunk(max(1, waiting)))
+            if count:
+                self._buffer.commit(count)
+                frame = self._buffer.take_until(terminator)
+            if frame is None and time.monotonic() >= deadline:
+                # Timed out: hand back the partial frame, matching pyserial's read_until.
+                return self._buffer.take_all()
+        return frame
 
     @property
     def is_open(self) -> bool:
         return bool(self._connection and self._connection.is_open)
 
+    @property
+    def first_byte_at(self) -> float | None:
+        return self._buffer.frame_started_at
+
+
+class SocketTransport(Transport):
+    def __init__(self, settings: SocketSettings, read_chunk_size: int = 4096):
+        self._settings: Final[SocketSettings] = settings
+        self._socket: socket.socket | None = None
+        self._active = False
+        self._buffer = _ReceiveBuffer(read_chunk_size)
+
+    @property
+    def settings(self) -> SocketSettings:
+        return self._settings
+
+    def open(self) -> None:
+        if self._active and self._socket is not None:
+            return
+        self._connect()
+        self._active = True
+
+    def close(self) -> None:
+        self._active = False
+        self._drop()
+
+    def write(self, payload: bytes) -> None:
+        if not self._active:
+            raise RuntimeError("Socket connection is not open.")
+        if self._socket is None:
+            self._connect()
+        try:
+            self._socket.sendall(payload)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            # The instrument dropped an idle connection; reopen once and resend the whole message.
+            self._drop()
+            self._connect()
+            self._socket.sendall(payload)
+
+    def read_until(self, terminator: bytes, timeout_seconds: float | None = None) -> bytes:
+        if not self._active:
+            raise RuntimeError("Socket connection is not open.")
+        frame = self._buffer.take_until(terminator)
+        if frame is not None:
+            return frame
+        if timeout_seconds is None:
+            return self._receive(terminator, self._settings.timeout_seconds)
+        # settimeout is a syscall, so the socket keeps the configured timeout and only a longer wait swaps it.
+        if self._socket is not None:
+            self._socket.settimeout(timeout_seconds)
+        try:
+            return self._receive(terminator, timeout_seconds)
+        finally:
+            if self._socket is not None:
+                self._socket.settimeout(self._settings.timeout_seconds)
+
+    def _receive(self, terminator: bytes, timeout: float) -> bytes:
+        frame = None
+        while frame is None:
+            if self._socket is None:
+                raise ConnectionError(f"Connection to {self._address} was lost.")
+            try:
+                count = self._socket.recv_into(self._buffer.chunk())
+            except socket.timeout as exc:
+                # Discard the partial frame and the connection with it: the rest of the late reply would
+                # otherwise be read as the answer to the next query. The next write reconnects.
+                self._drop()
+                raise TimeoutError(f"No reply from {self._address} within {timeout} s.") from exc
+            if not count:
+                # Leave the transport active so the next write reconnects transparently.
+                self._drop()
+                raise ConnectionError(f"{self._address} closed the connection.")
+            self._buffer.commit(count)
+            frame = self._buffer.take_until(terminator)
+        return frame
+
+    @property
+    def is_open(self) -> bool:
+        return self._active
+
+    @property
+    def first_byte_at(self) -> float | None:
+        return self._buffer.frame_started_at
+
+    @property
+    def _address(self) -> str:
+        return f"{self._settings.host}:{self._settings.port}"
+
+    def _connect(self) -> None:
+        connection = socket.create_connection(
+            (self._settings.host, self._settings.port), timeout=self._settings.connect_timeout_seconds
+        )
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._settings.keepalive:
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        connection.settimeout(self._settings.timeout_seconds)
+        self._socket = connection
+        self._buffer.clear()
+
+    def _drop(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+        self._buffer.clear()
+
+
+class SocketConnectionPool:
+    def __init__(self):
+        self._transports: dict[str, SocketTransport] = {}
+        self._references: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(settings: SocketSettings) -> str:
+        return f"{settings.host}:{settings.port}"
+
+    def acquire(self, settings: SocketSettings) -> SocketTransport:
+        key = self.key(settings)
+        with self._lock:
+            transport = self._transports.get(key)
+            if transport is None:
+                transport = SocketTransport(settings)
+                self._transports[key] = transport
+                self._references[key] = 0
+            if not transport.is_open:
+                transport.open()
+            self._references[key] += 1
+            return transport
+
+    def release(self, transport: SocketTransport) -> None:
+        key = self.key(transport.settings)
+        with self._lock:
+            if self._transports.get(key) is not transport:
+                transport.close()
+                return
+            self._references[key] -= 1
+            if self._references[key] <= 0:
+                del self._transports[key]
+                del self._references[key]
+                transport.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for transport in self._transports.values():
+                transport.close()
+            self._transports.clear()
+            self._references.clear()
+
+
+SOCKET_POOL: Final[SocketConnectionPool] = SocketConnectionPool()
+
+SOCKET_ADDRESS_PREFIX: Final[str] = "tcp://"
+
+
+def parse_socket_address(address: str) -> SocketSettings | None:
+    text = address.strip()
+    if not text.lower().startswith(SOCKET_ADDRESS_PREFIX):
+        return None
+    host, _, port = text[len(SOCKET_ADDRESS_PREFIX) :].rstrip("/").rpartition(":")
+    if not host:
+        host, port = port, ""
+    if not host:
+        raise ValueError(f"Missing host in socket address: {address}")
+    try:
+        return SocketSettings(host=host.strip("[]"), port=int(port) if port else 5025)
+    except ValueError as exc:
+        raise ValueError(f"Invalid port in socket address: {address}") from exc
+
+
+class AsyncTransport(ABC):
+    @abstractmethod
+    async def open(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def write(self, payload: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read_until(self, terminator: bytes) -> bytes:
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def is_open(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    def first_byte_at(self) -> float | None:
+        # time.monotonic() at which the first byte of the last frame returned by read_until arrived, when known.
+        return None
+
+    def discard_pending(self) -> None:
+        # Called when a read_until is cancelled by a timeout: drops the partial frame it left buffered, so it is
+        # not glued to the front of the next reply.
+        pass
+
+
+class AsyncSerialTransport(AsyncTransport):
+    def __init__(self, settings: SerialSettings, read_chunk_size: int = 4096):
+        self._settings = settings
+        self._connection = None
+        self._fd: int | None = None
+        self._buffer = _ReceiveBuffer(read_chunk_size)
+
+    async def open(self) -> None:
+        serial, _ = _import_pyserial()
+        if serial is None:
+            raise RuntimeError("pyserial is not installed. Install dependencies first.")
+        if self._connection and self._connection.is_open:
+            return
+        # timeout=0 puts the port in non-blocking mode; the event loop's reader/writer callbacks do the waiting.
+        self._connection = serial.Serial(
+            port=self._settings.port,
+            baudrate=self._settings.baudrate,
+            bytesize=self._settings.bytesize,
+            parity=self._settings.parity,
+            stopbits=self._settings.stopbits,
+            timeout=0,
+            write_timeout=0,
+        )
+        try:
+            self._fd = self._connection.fileno()
+        except Exception as exc:  # pragma: no cover - platform dependency
+            self._connection.close()
+            self._connection = None
+            raise RuntimeError("Async serial transport requires a file-descriptor based serial port.") from exc
+        self._buffer.clear()
+
+    async def close(self) -> None:
+        if self._connection and self._connection.is_open:
+            self._connection.close()
+        self._fd = None
+        self._buffer.clear()
+
+    def retarget(self, port: str) -> None:
+        # As SerialTransport.retarget; the caller closes the port first.
+        self._settings = replace(self._settings, port=port)
+
+    async def write(self, payload: bytes) -> None:
+        self._ensure_open()
+        view = memoryview(payload)
+        while view:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                written = 0
+            view = view[written:]
+            if view:
+                await self._wait_ready(writable=True)
+
+    async def read_until(self, terminator: bytes) -> bytes:
+        self._ensure_open()
+        frame = self._buffer.take_until(terminator)
+        while frame is None:
+            await self._wait_ready(writable=False)
+            try:
+                count = os.readv(self._fd, [self._buffer.chunk()])
+            except BlockingIOError:
+                continue
+            if not count:
+                raise ConnectionError("Serial device closed the connection.")
+            self._buffer.commit(count)
+            frame = self._buffer.take_until(terminator)
+        return frame
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._connection and self._connection.is_open)
+
+    @property
+    def first_byte_at(self) -> float | None:
+        return self._buffer.frame_started_at
+
+    def discard_pending(self) -> None:
+        self._buffer.clear()
+
+    def _ensure_open(self) -> None:
+        if not self._connection or not self._connection.is_open or self._fd is None:
+            raise RuntimeError("Serial connection is not open.")
+
+    async def _wait_ready(self, writable: bool) -> None:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def _wake() -> None:
+            if not ready.done():
+                ready.set_result(None)
+
+        if writable:
+            loop.add_writer(self._fd, _wake)
+        else:
+            loop.add_reader(self._fd, _wake)
+        try:
+            await ready
+        finally:
+            if writable:
+                loop.remove_writer(self._fd)
+            else:
+                loop.remove_reader(self._fd)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+
+from dmm_app.columnar import MirroredColumns
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - import guard for environments without numpy
+    np = None
+
+# 16 bytes per point, stored twice (see MirroredColumns): 32 MiB per row once full, which takes about 12 days at
+# one reading per second. Storage starts at DEFAULT_TREND_INITIAL_POINTS and doubles as points arrive.
+DEFAULT_TREND_CAPACITY = 1 << 20
+DEFAULT_TREND_INITIAL_POINTS = 4096
+TREND_AVAILABLE = np is not None
+
+
+class TrendBuffer:
+    def __init__(self, capacity: int = DEFAULT_TREND_CAPACITY, initial_points: int = DEFAULT_TREND_INITIAL_POINTS):
+        if np is None:
+            raise RuntimeError("numpy is not installed. Install dependencies first.")
+        if capacity < 1:
+            raise ValueError("Trend buffer must hold at least one point.")
+        self._capacity = capacity
+        self._columns = MirroredColumns({"time": "float64", "value": "float64"}, min(initial_points, capacity))
+        self._last_time = -math.inf
+        self._version = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        # Points kept before the oldest are overwritten; less is allocated until the buffer has filled up.
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self._columns.nbytes
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._columns.clear()
+        self._last_time = -math.inf
+        self._version += 1
+        self._generation += 1
+
+    def append(self, timestamp: float, value: float | None) -> None:
+        with self._lock:
+            if timestamp < self._last_time:
+                # Time went backwards (a replayed log after live data, or the clock stepped back between runs).
+                # Decimation searches the times and needs them ascending, so the trace starts over.
+                self._clear()
+            columns = self._columns
+            if len(columns) == columns.capacity < self._capacity:
+                columns.resize(min(columns.capacity * 2, self._capacity))
+            columns.append((timestamp, math.nan if value is None else value))
+            self._last_time = timestamp
+            self._version += 1
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        # Callers should hold `lock` while using the views if a producer may be appending.
+        columns = self._columns.window()
+        return columns["time"], columns["value"]
+
+    def time_span(self) -> tuple[float, float] | None:
+        with self._lock:
+            if not len(self._columns):
+                return None
+            times, _ = self.arrays()
+            return float(times[0]), float(times[-1])
+
+
+@dataclass(frozen=True)
+class DecimatedTrace:
+    times: np.ndarray
+    minimums: np.ndarray
+    maximums: np.ndarray
+
+
+class MinMaxDecimator:
+    def __init__(self):
+        self._bucket_seconds = 0.0
+        self._first_bucket = 0
+        self._minimums = None
+        self._maximums = None
+        self._open_bucket = 0
+        self._generation = -1
+
+    def reset(self) -> None:
+        self._minimums = None
+        self._maximums = None
+
+    def decimate(self, buffer: TrendBuffer, start: float, span: float, width: int) -> DecimatedTrace:
+        width = max(1, width)
+        bucket_seconds = span / width
+        first = math.floor(start / bucket_seconds)
+        last = first + width
+
+        with buffer.lock:
+            times, values = buffer.arrays()
+            if buffer.generation != self._generation or bucket_seconds != self._bucket_seconds:
+                self.reset()
+                self._generation = buffer.generation
+                self._bucket_seconds = bucket_seconds
+
+            cached = self._minimums
+            if cached is None or first >= self._first_bucket + len(cached) or last <= self._first_bucket:
+                minimums, maximums = self._compute(times, values, first, last)
+            else:
+                # Buckets sit on an absolute time grid, so panning and live scrolling at a fixed zoom only
+                # compute buckets that are new or were still receiving samples at the previous frame.
+                parts_min: list[np.ndarray] = []
+                parts_max: list[np.ndarray] = []
+                if first < self._first_bucket:
+                    low_min, low_max = self._compute(times, values, first, self._first_bucket)
+                    parts_min.append(low_min)
+                    parts_max.append(low_max)
+                cached_last = self._first_bucket + len(cached)
+                keep_from = max(first, self._first_bucket)
+                keep_to = min(cached_last, self._open_bucket, last)
+                if keep_to > keep_from:
+                    parts_min.append(self._minimums[keep_from - self._first_bucket : keep_to - self._first_bucket])
+                    parts_max.append(self._maximums[keep_from - self._first_bucket : keep_to - self._first_bucket])
+                refresh_from = max(keep_to, keep_from)
+                fresh_min, fresh_max = self._compute(times, values, refresh_from, last)
+                parts_min.append(fresh_min)
+                parts_max.append(fresh_max)
+                minimums = np.concatenate(parts_min)
+                maximums = np.concatenate(parts_max)
+
+            if len(times):
+                self._open_bucket = math.floor(float(times[-1]) / bucket_seconds)
+
+        self._first_bucket = first
+        self._minimums = minimums
+        self._maximums = maximums
+        centers = (first + np.arange(width) + 0.5) * bucket_seconds
+        return DecimatedTrace(times=centers, minimums=minimums, maximums=maximums)
+
+    def _compute(self, times: np.ndarray, values: np.ndarray, first: int, last: int) -> tuple[np.ndarray, np.ndarray]:
+        count = max(0, last - first)
+        minimums = np.full(count, np.nan)
+        maximums = np.full(count, np.nan)
+        if not count or not len(times):
+            return minimums, maximums
+        edges = (first + np.arange(count + 1)) * self._bucket_seconds
+        bounds = np.searchsorted(times, edges)
+        lo, hi = bounds[0], bounds[-1]
+        if lo == hi:
+            return minimums, maximums
+        starts = bounds[:-1] - lo
+        occupied = bounds[1:] > bounds[:-1]
+        window = values[lo:hi]
+        # fmin/fmax skip NaN (non-numeric replies) unless a whole bucket is NaN.
+        minimums[occupied] = np.fmin.reduceat(window, starts[occupied])
+        maximums[occupied] = np.fmax.reduceat(window, starts[occupied])
+        return minimums, maximums
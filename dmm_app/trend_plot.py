@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+
+from PySide6.QtCore import QLineF, QPointF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from dmm_app.trend import DEFAULT_TREND_CAPACITY, MinMaxDecimator, TrendBuffer
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - import guard for environments without numpy
+    np = None
+
+FRAME_INTERVAL_MS = 16
+MIN_SPAN_SECONDS = 1.0
+MAX_SPAN_SECONDS = 7 * 24 * 3600.0
+
+
+class TrendPlot(QWidget):
+    def __init__(self, capacity: int = DEFAULT_TREND_CAPACITY, span_seconds: float = 60.0):
+        super().__init__()
+        self.setMinimumHeight(70)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setToolTip("Wheel: zoom time axis. Drag: pan. Double-click: follow live data.")
+        self._buffer = TrendBuffer(capacity)
+        self._decimator = MinMaxDecimator()
+        self._span_seconds = span_seconds
+        self._follow_live = True
+        self._view_end = 0.0
+        self._drag_origin: float | None = None
+        self._drag_view_end = 0.0
+        self._drawn_state: tuple | None = None
+
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self._on_frame)
+        self._frame_timer.start()
+
+    @property
+    def buffer(self) -> TrendBuffer:
+        return self._buffer
+
+    def clear(self) -> None:
+        self._buffer.clear()
+        self._follow_live = True
+        self.update()
+
+    def _view_window(self) -> tuple[float, float] | None:
+        span = self._buffer.time_span()
+        if span is None:
+            return None
+        if self._follow_live:
+            self._view_end = span[1]
+        return self._view_end - self._span_seconds, self._span_seconds
+
+    def _on_frame(self) -> None:
+        # Repaint only when new samples arrived or the view moved; idle plots cost nothing per frame.
+        state = (self._buffer.version, self._span_seconds, self._follow_live, self._view_end, self.width())
+        if state != self._drawn_state:
+            self.update()
+
+    def paintEvent(self, event) -> None:  # noqa: N802
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(250, 250, 250))
+        painter.setPen(QPen(QColor(200, 200, 200)))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        window = self._view_window()
+        self._drawn_state = (self._buffer.version, self._span_seconds, self._follow_live, self._view_end, self.width())
+        if window is None:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No data")
+            return
+
+        start, span = window
+        width = max(1, self.width() - 2)
+        trace = self._decimator.decimate(self._buffer, start, span, width)
+        occupied = ~np.isnan(trace.minimums)
+        if not occupied.any():
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No numeric data in view")
+            return
+
+        low = float(np.min(trace.minimums[occupied]))
+        high = float(np.max(trace.maximums[occupied]))
+        if math.isclose(low, high):
+            low, high = low - 0.5, high + 0.5
+        margin = 6
+        height = max(1, self.height() - 2 * margin)
+        scale = height / (high - low)
+
+        lines = []
+        for column in np.flatnonzero(occupied):
+            x = float(column) + 1.0
+            top = margin + (high - float(trace.maximums[column])) * scale
+            bottom = margin + (high - float(trace.minimums[column])) * scale
+            lines.append(QLineF(QPointF(x, top), QPointF(x, bottom + 0.5)))
+        painter.setPen(QPen(QColor(30, 90, 180), 1))
+        painter.drawLines(lines)
+
+        painter.setPen(QPen(QColor(90, 90, 90)))
+        painter.drawText(4, margin + 10, f"{high:.6g}")
+        painter.drawText(4, self.height() - margin, f"{low:.6g}")
+        label = f"{self._span_seconds:.0f} s" + ("" if self._follow_live else " (paused)")
+        painter.drawText(
+            self.rect().adjusted(0, 2, -4, 0), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop, label
+        )
+
+    def wheelEvent(self, event) -> None:  # noqa: N802
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        self._span_seconds = min(MAX_SPAN_SECONDS, max(MIN_SPAN_SECONDS, self._span_seconds * factor))
+        self.update()
+
+    def mousePressEvent(self, event) -> None:  # noqa: N802
+        if event.button() == Qt.MouseButton.LeftButton and self._view_window() is not None:
+            self._drag_origin = event.position().x()
+            self._drag_view_end = self._view_end
+
+    def mouseMoveEvent(self, event) -> None:  # noqa: N802
+        if self._drag_origin is None:
+            return
+        seconds_per_pixel = self._span_seconds / max(1, self.width())
+        self._follow_live = False
+        self._view_end = self._drag_view_end - (event.position().x() - self._drag_origin) * seconds_per_pixel
+        self.update()
+
+    def mouseReleaseEvent(self, event) -> None:  # noqa: N802
+        self._drag_origin = None
+
+    def mouseDoubleClickEvent(self, event) -> None:  # noqa: N802
+        self._follow_live = True
+        self.update()
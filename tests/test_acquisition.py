@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+
+from dmm_app.acquisition import AcquisitionManager, SessionConfig
+from dmm_app.commands import SCPI_BURST_SAMPLE_SECONDS
+from dmm_app.models import InstrumentType, MeasurementFunction, SerialSettings
+from dmm_app.poller import AsyncPollingWorker
+from dmm_app.simulator import PtyLoopback, SimulatedInstrument, SimulatedTransport, SimulatorSettings
+from dmm_app.steps import Query
+from dmm_app.transport import AsyncSerialTransport
+
+VOLTAGE, CURRENT = MeasurementFunction.VOLTAGE, MeasurementFunction.CURRENT
+
+
+@pytest.fixture
+def manager():
+    # Two simulated instruments on different ports, each answering with its own voltage.
+    instruments = {
+        port: SimulatedInstrument(SimulatorSettings(InstrumentType.OWON_SPE6103, values=values))
+        for port, values in [("sim0", {VOLTAGE: 5.0, CURRENT: 0.1}), ("sim1", {VOLTAGE: 12.0, CURRENT: 2.0})]
+    }
+    readings, errors = [], []
+    lock = threading.Lock()
+
+    def on_reading(reading):
+        with lock:
+            readings.append(reading)
+
+    manager = AcquisitionManager(
+        on_reading=on_reading,
+        on_error=lambda name, err: errors.append((name, err)),
+        transport_factory=lambda settings: SimulatedTransport(instruments[settings.port]),
+    )
+    manager.readings, manager.errors = readings, errors
+    yield manager
+    manager.close()
+
+
+def _config(name, port, *functions):
+    return SessionConfig(
+        name=name,
+        instrument=InstrumentType.OWON_SPE6103,
+        settings=SerialSettings(port=port, baudrate=9600),
+        functions=functions,
+    )
+
+
+def _poll(manager, count):
+    manager.start(0.05)
+    deadline = time.monotonic() + 5.0
+    while len(manager.readings) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.stop()
+
+
+def test_two_sessions_poll_into_one_stream(manager):
+    first = manager.add_session(_config("psu-a", "sim0", VOLTAGE, CURRENT))
+    second = manager.add_session(_config("psu-b", "sim1", VOLTAGE))
+    # Rows are numbered across sessions.
+    assert [request.slot_index for request in first.requests + second.requests] == [0, 1, 2]
+
+    _poll(manager, 9)
+    assert manager.errors == []
+    values = {reading.slot_index: reading.value for reading in manager.readings}
+    assert values == {0: 5.0, 1: 0.1, 2: 12.0}
+    assert float(manager.request("psu-b", Query("MEAS:VOLT?"))) == 12.0
+
+
+def test_reconfigure_renumbers_later_sessions(manager):
+    manager.add_session(_config("psu-a", "sim0", VOLTAGE))
+    second = manager.add_session(_config("psu-b", "sim1", CURRENT))
+    assert [request.slot_index for request in second.requests] == [1]
+
+    manager.reconfigure_session("psu-a", functions=(VOLTAGE, CURRENT))
+    assert [request.slot_index for request in second.requests] == [2]
+    _poll(manager, 6)
+    assert {reading.slot_index: reading.value for reading in manager.readings} == {0: 5.0, 1: 0.1, 2: 2.0}
+
+    with pytest.raises(ValueError):
+        manager.reconfigure_session("psu-b", settings=SerialSettings(port="sim0", baudrate=9600))
+    with pytest.raises(KeyError):
+        manager.session("psu-c")
+
+
+def test_rejects_duplicate_ports(manager):
+    manager.add_session(_config("psu-a", "sim0", VOLTAGE))
+    with pytest.raises(ValueError, match="already in use"):
+        manager.add_session(_config("psu-b", "sim0", VOLTAGE))
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a pty")
+def test_async_sessions_share_the_event_loop():
+    readings = []
+    manager = AcquisitionManager(
+        on_reading=readings.append,
+        on_error=lambda name, err: readings.append(err),
+        async_transport_factory=AsyncSerialTransport,
+    )
+    loopbacks = [
+        PtyLoopback(SimulatedInstrument(SimulatorSettings(InstrumentType.OWON_SPE6103, values={VOLTAGE: value})))
+        for value in (5.0, 12.0)
+    ]
+    try:
+        for index, loopback in enumerate(loopbacks):
+            manager.add_session(_config(f"psu-{index}", loopback.start(), VOLTAGE))
+        manager.start(0.05)
+        assert all(isinstance(session.worker, AsyncPollingWorker) for session in manager.sessions)
+        deadline = time.monotonic() + 5.0
+        while len(readings) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.stop()
+        assert {reading.slot_index: reading.value for reading in readings} == {0: 5.0, 1: 12.0}
+        assert float(manager.request("psu-1", Query("MEAS:VOLT?"))) == 12.0
+    finally:
+        manager.close()
+        for loopback in loopbacks:
+            loopback.stop()
+
+
+def test_scpi_burst_buffers_samples_per_cycle():
+    instrument = SimulatedInstrument(SimulatorSettings(InstrumentType.MP730889, values={VOLTAGE: 3.3}))
+    readings = []
+    manager = AcquisitionManager(
+        on_reading=readings.append,
+        on_error=lambda name, err: readings.append(err),
+        transport_factory=lambda settings: SimulatedTransport(instrument),
+    )
+    config = SessionConfig(
+        name="dmm",
+        instrument=InstrumentType.MP730889,
+        settings=SerialSettings(port="sim0", baudrate=9600),
+        functions=(VOLTAGE,),
+        burst_samples=5,
+        scpi_burst=True,
+    )
+    try:
+        session = manager.add_session(config)
+        assert "SAMPle:COUNt 5" in session.setup_commands
+        manager.start(0.5)
+        deadline = time.monotonic() + 5.0
+        while len(readings) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.stop()
+    finally:
+        manager.close()
+
+    assert instrument.sample_count == 5
+    assert instrument.triggers >= 1
+    burst = readings[:5]
+    assert [reading.value for reading in burst] == [3.3] * 5
+    # Each sample is stamped at its place in the burst, SCPI_BURST_SAMPLE_SECONDS apart.
+    steps = [(later.timestamp - earlier.timestamp).total_seconds() for earlier, later in zip(burst, burst[1:])]
+    assert steps == pytest.approx([SCPI_BURST_SAMPLE_SECONDS] * 4)
+
+
+def test_scpi_burst_needs_a_single_function(manager):
+    config = replace(_config("psu-a", "sim0", VOLTAGE, CURRENT), burst_samples=5, scpi_burst=True)
+    with pytest.raises(ValueError, match="single measurement function"):
+        manager.add_session(config)
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from dmm_app.bridge import ReadingBridge
+from dmm_app.models import ALARM_RESPONSE_PREFIX, GAP_RESPONSE_PREFIX, InstrumentType, MeasurementFunction, Reading
+
+
+def _reading(value: float | None, raw_response: str | None = None, slot_index: int = 0) -> Reading:
+    return Reading(
+        timestamp=datetime.now(),
+        slot_index=slot_index,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103",
+        function=MeasurementFunction.VOLTAGE,
+        raw_response=raw_response if raw_response is not None else f"{value}",
+        value=value,
+        unit="V",
+    )
+
+
+def test_alarm_marker_does_not_replace_latest_value():
+    bridge = ReadingBridge()
+    seen = []
+    bridge.set_sink("log", seen.append)
+    bridge.publish_reading(_reading(5.0))
+    bridge.publish_reading(_reading(None, f"{ALARM_RESPONSE_PREFIX} limit tripped"))
+    frame = bridge.drain()
+    assert frame.latest[0].value == 5.0
+    assert [reading.is_alarm for reading in frame.recent] == [False, True]
+    assert len(seen) == 2
+    assert frame.stats.coalesced == 0
+
+
+def test_full_event_queue_keeps_critical_events_and_counts_drops():
+    bridge = ReadingBridge(event_limit=3)
+    bridge.publish_event("error", "port closed")
+    for attempt in range(4):
+        bridge.publish_event("discovery", attempt)
+    bridge.publish_event("alarm", "tripped")
+    bridge.publish_event("alarm", "cleared")
+    frame = bridge.drain()
+    assert frame.events == [("error", "port closed"), ("alarm", "tripped"), ("alarm", "cleared")]
+    assert frame.stats.dropped_events == 4
+
+
+def test_non_critical_event_dropped_when_queue_holds_only_critical_ones():
+    bridge = ReadingBridge(event_limit=1)
+    bridge.publish_event("error", "first")
+    bridge.publish_event("discovery", "done")
+    frame = bridge.drain()
+    assert frame.events == [("error", "first")]
+    assert frame.stats.dropped_events == 1
+
+
+def test_coalesced_events_are_not_counted_as_drops():
+    bridge = ReadingBridge(event_limit=1)
+    for index in range(5):
+        bridge.publish_event("cycle", index, coalesce=True)
+    frame = bridge.drain()
+    assert frame.events == [("cycle", 4)]
+    assert frame.stats.dropped_events == 0
+
+
+def test_event_flood_keeps_recovery_and_port_events():
+    bridge = ReadingBridge(event_limit=4)
+    bridge.publish_event("recovery", "lost")
+    bridge.publish_event("port", "removed")
+    for index in range(100):
+        bridge.publish_event("discovery", index)
+    bridge.publish_event("recovery", "recovered")
+    frame = bridge.drain()
+    kinds = [kind for kind, _ in frame.events]
+    assert kinds[:2] == ["recovery", "port"]
+    assert ("recovery", "recovered") in frame.events
+    assert frame.stats.dropped_events == 100 - kinds.count("discovery")
+
+
+def test_reading_flood_keeps_gap_and_alarm_markers():
+    bridge = ReadingBridge(recent_limit=8)
+    bridge.publish_reading(_reading(None, f"{GAP_RESPONSE_PREFIX} connection lost"))
+    bridge.publish_reading(_reading(None, f"{ALARM_RESPONSE_PREFIX} limit tripped"))
+    for index in range(100):
+        bridge.publish_reading(_reading(float(index), slot_index=index % 2))
+    frame = bridge.drain()
+    assert len(frame.recent) == 8
+    assert [reading.is_gap for reading in frame.recent[:2]] == [True, False]
+    assert frame.recent[1].is_alarm
+    assert [reading.value for reading in frame.recent[2:]] == [94.0, 95.0, 96.0, 97.0, 98.0, 99.0]
+    assert frame.stats.dropped == 94
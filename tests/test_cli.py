@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from dmm_app import cli
+from dmm_app.models import GAP_RESPONSE_PREFIX, InstrumentType
+from dmm_app.simulator import SimulatedFaults, SimulatedInstrument, SimulatedTransport, SimulatorSettings
+
+
+@pytest.fixture
+def unplugging_instrument(monkeypatch):
+    # Answers *IDN? and two readings, then drops off the bus for good.
+    instrument = SimulatedInstrument(
+        SimulatorSettings(InstrumentType.OWON_SPE6103, faults=SimulatedFaults(disconnect_after_queries=3))
+    )
+    monkeypatch.setattr(cli, "_open_transport", lambda settings: SimulatedTransport(instrument))
+    return instrument
+
+
+@pytest.mark.parametrize(
+    ("options", "message"),
+    [
+        (["--no-reconnect"], "Simulated instrument is disconnected."),
+        (["--reconnect-attempts", "2"], "Connection could not be restored"),
+    ],
+)
+def test_lost_connection_exits_non_zero(unplugging_instrument, tmp_path, capsys, options, message):
+    output = tmp_path / "run.csv"
+    started = time.monotonic()
+    exit_code = cli.main(
+        ["--instrument", "owon_spe6103", "--port", "sim0", "--interval", "200", "--quiet", "--output", str(output)]
+        + options
+    )
+    # --duration 0 would otherwise wait for a signal.
+    assert time.monotonic() - started < 5.0
+    assert exit_code == 1
+    assert message in capsys.readouterr().err
+    rows = output.read_text().splitlines()[1:]
+    assert len([row for row in rows if GAP_RESPONSE_PREFIX not in row]) == 2
+    assert any(GAP_RESPONSE_PREFIX in row for row in rows) == ("--no-reconnect" not in options)
+
+
+def test_scpi_burst_logs_every_sample(monkeypatch, tmp_path):
+    instrument = SimulatedInstrument(SimulatorSettings(InstrumentType.MP730889))
+    monkeypatch.setattr(cli, "_open_transport", lambda settings: SimulatedTransport(instrument))
+    output = tmp_path / "run.csv"
+    exit_code = cli.main(
+        ["--instrument", "mp730889", "--port", "sim0", "--interval", "500", "--duration", "0.3", "--quiet"]
+        + ["--scpi-burst", "--samples", "3", "--output", str(output)]
+    )
+    assert exit_code == 0
+    assert instrument.sample_count == 3
+    rows = output.read_text().splitlines()[1:]
+    assert len(rows) == 3 * instrument.triggers
+
+
+def test_scpi_burst_rejects_several_functions(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(
+            ["--instrument", "owon_spe6103", "--port", "sim0", "--scpi-burst"]
+            + ["--function", "voltage", "--function", "current"]
+        )
+    assert "single measurement function" in capsys.readouterr().err
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from dmm_app.columnar_log import (
+    CATEGORY_COLUMNS,
+    RAW_TEXT_COLUMN,
+    ColumnarLogger,
+    read_columnar_log,
+    read_columnar_readings,
+)
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+
+
+def _reading(value, raw_response, second=0):
+    return Reading(
+        timestamp=datetime(2026, 10, 17, 12, 0, second),
+        slot_index=0,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103,0,1.0",
+        function=MeasurementFunction.VOLTAGE,
+        raw_response=raw_response,
+        value=value,
+        unit="V",
+    )
+
+
+def test_round_trip_keeps_reply_text(tmp_path):
+    path = str(tmp_path / "run.npylog")
+    logger = ColumnarLogger(path)
+    logger.write_readings(
+        [
+            _reading(5.0, "+5.00000000E+00"),
+            _reading(None, "#GAP lost", 1),
+            _reading(0.1234567890123456, "0.1234567890123456", 2),
+        ]
+    )
+    logger.close()
+    readings = list(read_columnar_readings(path))
+    assert [reading.raw_response for reading in readings] == ["+5.00000000E+00", "#GAP lost", "0.1234567890123456"]
+    assert [reading.value for reading in readings] == [5.0, None, 0.1234567890123456]
+    assert readings[0].timestamp == datetime(2026, 10, 17, 12, 0, 0)
+
+
+def test_older_chunks_without_reply_text_fall_back_to_value(tmp_path):
+    path = tmp_path / "old.npylog"
+    logger = ColumnarLogger(str(path))
+    logger.write_reading(_reading(5.0, "+5.00000000E+00"))
+    logger.close()
+    chunk_path = next(path.glob("chunk-*.npz"))
+    with np.load(chunk_path) as chunk:
+        columns = {name: chunk[name] for name in chunk.files if name != RAW_TEXT_COLUMN}
+    np.savez_compressed(chunk_path, **columns)
+
+    logger = ColumnarLogger(str(path))
+    logger.write_reading(_reading(6.0, "+6.00000000E+00", 1))
+    logger.close()
+    assert [reading.raw_response for reading in read_columnar_readings(str(path))] == ["5", "+6.00000000E+00"]
+    columns = read_columnar_log(str(path))
+    assert RAW_TEXT_COLUMN not in columns and all(name in columns for name in CATEGORY_COLUMNS)
+    assert columns["value"].tolist() == [5.0, 6.0]
+
+
+def test_flush_cuts_a_chunk_once_it_is_old_enough(tmp_path):
+    path = tmp_path / "slow.npylog"
+    logger = ColumnarLogger(str(path), max_chunk_seconds=0.05)
+    logger.write_reading(_reading(1.0, "1.0"))
+    logger.flush()
+    assert not list(path.glob("chunk-*.npz"))
+    time.sleep(0.06)
+    logger.flush()
+    assert len(list(path.glob("chunk-*.npz"))) == 1
+    logger.close()
+
+
+def test_reopening_continues_after_the_highest_chunk(tmp_path):
+    path = tmp_path / "run.npylog"
+    logger = ColumnarLogger(str(path), chunk_rows=1)
+    for second in range(3):
+        logger.write_reading(_reading(float(second), f"{second}.0", second))
+    logger.close()
+    # A gap in the numbering (a chunk removed by hand) must not make the next run reuse a number.
+    (path / "chunk-000000.npz").unlink()
+    logger = ColumnarLogger(str(path), chunk_rows=1)
+    logger.write_reading(_reading(3.0, "3.0", 3))
+    logger.close()
+    assert sorted(chunk.name for chunk in path.glob("chunk-*.npz")) == [
+        "chunk-000001.npz",
+        "chunk-000002.npz",
+        "chunk-000003.npz",
+    ]
+    assert [reading.value for reading in read_columnar_readings(str(path))] == [1.0, 2.0, 3.0]
+
+
+def test_chunks_are_read_in_numeric_order(tmp_path):
+    path = tmp_path / "run.npylog"
+    logger = ColumnarLogger(str(path), chunk_rows=1)
+    logger.write_reading(_reading(1.0, "1.0"))
+    logger.close()
+    # Past a million chunks the name outgrows its padding and sorts before chunk-999999 by name.
+    (path / "chunk-000000.npz").rename(path / "chunk-999999.npz")
+    logger = ColumnarLogger(str(path), chunk_rows=1)
+    logger.write_reading(_reading(2.0, "2.0", 1))
+    logger.close()
+    assert (path / "chunk-1000000.npz").exists()
+    assert [reading.value for reading in read_columnar_readings(str(path))] == [1.0, 2.0]
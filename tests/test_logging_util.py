@@ -0,0 +1,66 @@
+import queue
+import threading
+from datetime import datetime
+
+from dmm_app.logging_util import BackgroundLogger, CsvLogger, read_csv_log
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+
+
+def _reading(index):
+    return Reading(
+        timestamp=datetime(2026, 10, 17, 12, 0, 0, index % 1_000_000),
+        slot_index=0,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103,0,1.0",
+        function=MeasurementFunction.VOLTAGE,
+        raw_response=f"{index}",
+        value=float(index),
+        unit="V",
+    )
+
+
+def test_writes_after_close_are_rejected_and_counted(tmp_path):
+    path = tmp_path / "run.csv"
+    logger = BackgroundLogger(CsvLogger(str(path)))
+    logger.write_reading(_reading(0))
+    logger.close()
+    logger.write_reading(_reading(1))
+    logger.close()
+    assert logger.stats.written == 1
+    assert logger.stats.dropped == 1
+    assert [reading.value for reading in read_csv_log(str(path))] == [0.0]
+
+
+class _PausingQueue(queue.Queue):
+    # Holds the first non-blocking put until released, as if the producer were preempted right after
+    # checking that the logger is open.
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def put_nowait(self, item):
+        if not self.entered.is_set():
+            self.entered.set()
+            self.release.wait(timeout=5.0)
+        super().put_nowait(item)
+
+
+def test_close_waits_for_a_producer_that_passed_the_open_check(tmp_path):
+    path = tmp_path / "run.csv"
+    # A short flush period so the writer thread moves on to the swapped-in queue quickly.
+    logger = BackgroundLogger(CsvLogger(str(path)), flush_seconds=0.05)
+    paused = logger._queue = _PausingQueue()
+    producer = threading.Thread(target=logger.write_reading, args=(_reading(0),))
+    producer.start()
+    assert paused.entered.wait(timeout=5.0)
+    closer = threading.Thread(target=logger.close)
+    closer.start()
+    closer.join(timeout=0.2)
+    # The reading has passed the closed check, so close() must let it in ahead of the sentinel.
+    assert closer.is_alive()
+    paused.release.set()
+    producer.join()
+    closer.join()
+    assert logger.stats.written == 1
+    assert [reading.value for reading in read_csv_log(str(path))] == [0.0]
@@ -0,0 +1,49 @@
+import threading
+
+from dmm_app.metrics import AcquisitionMetrics, Histogram
+
+
+def test_histogram_buckets_and_summary():
+    histogram = Histogram("h", "help", lowest=1.0, octaves=4, buckets_per_octave=1)
+    for value in (0.5, 1.0, 3.0, 100.0):
+        histogram.record(value)
+    snapshot = histogram.snapshot()
+    assert snapshot.counts == (2, 0, 1, 0, 0, 1)
+    assert snapshot.count == 4 and snapshot.total == 104.5 and snapshot.maximum == 100.0
+    assert snapshot.percentile(0.5) == 1.0
+
+
+def test_concurrent_writers_lose_no_samples():
+    metrics = AcquisitionMetrics()
+    writers, samples = 4, 20_000
+    start = threading.Barrier(writers + 1)
+    snapshots = []
+
+    def write() -> None:
+        start.wait()
+        for _ in range(samples):
+            metrics.cycle_seconds.record(0.001)
+            metrics.queries.inc()
+
+    threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    while any(thread.is_alive() for thread in threads):
+        snapshots.append(metrics.cycle_seconds.snapshot())
+    for thread in threads:
+        thread.join()
+
+    final = metrics.cycle_seconds.snapshot()
+    assert final.count == sum(final.counts) == writers * samples
+    assert metrics.queries.value == writers * samples
+    # Snapshots taken while writers run are internally consistent.
+    assert all(snapshot.count == sum(snapshot.counts) for snapshot in snapshots)
+
+
+def test_reset_clears_histograms_and_counters():
+    metrics = AcquisitionMetrics()
+    metrics.record_cycle(0.01, 0.002, missed_ticks=3)
+    metrics.reset()
+    assert metrics.cycle_seconds.snapshot().count == 0
+    assert metrics.skipped_ticks.value == 0
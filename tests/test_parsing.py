@@ -0,0 +1,109 @@
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from dmm_app.models import InstrumentType, MeasurementFunction, Timebase
+from dmm_app.parsing import binary_block_bounds, is_overflow, parse_ascii_values, parse_binary_block
+from dmm_app.poller import PollRequest, _make_burst_readings
+
+# Replies as recorded from instruments (READ?/FETCh? on multi-sample buffers, FORMat REAL,32 traces).
+ASCII_BURST = "+1.23456789E+00,+1.23456790E+00,+1.23456788E+00\n"
+ASCII_WITH_OVERLOAD = "+2.500000E-03,+9.90000000E+37,-9.90000000E+37,+2.400000E-03\n"
+
+
+def _definite_block(values: list[float], fmt: str = "<f") -> bytes:
+    data = struct.pack(fmt[0] + fmt[1] * len(values), *values)
+    length = str(len(data)).encode()
+    return b"#" + str(len(length)).encode() + length + data + b"\n"
+
+
+def test_ascii_comma_separated_list():
+    values = parse_ascii_values(ASCII_BURST)
+    assert values.dtype == np.float64
+    assert values.tolist() == pytest.approx([1.23456789, 1.2345679, 1.23456788])
+
+
+def test_ascii_whitespace_and_mixed_separators():
+    values = parse_ascii_values(b" 1.0  2.0\t3.0, 4.0 ,5.0\r\n")
+    assert values.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_ascii_overflow_sentinel_becomes_nan():
+    values = parse_ascii_values(ASCII_WITH_OVERLOAD)
+    assert values[0] == pytest.approx(2.5e-3)
+    assert math.isnan(values[1]) and math.isnan(values[2])
+    assert values[3] == pytest.approx(2.4e-3)
+    assert is_overflow(9.9e37) and is_overflow(-9.9e37) and not is_overflow(1e37)
+
+
+def test_ascii_unparsable_token_becomes_nan():
+    values = parse_ascii_values("1.5,ERR,2.5")
+    assert values[0] == 1.5 and math.isnan(values[1]) and values[2] == 2.5
+
+
+def test_ascii_empty_reply():
+    assert len(parse_ascii_values("\n")) == 0
+
+
+def test_definite_block():
+    payload = _definite_block([1.5, -2.25, 3.0])
+    assert binary_block_bounds(payload) == (4, 12)
+    assert parse_binary_block(payload).tolist() == [1.5, -2.25, 3.0]
+
+
+def test_definite_block_big_endian_doubles():
+    payload = _definite_block([0.125, 1e-6], fmt=">d")
+    assert parse_binary_block(payload, dtype=">f8").tolist() == [0.125, 1e-6]
+
+
+def test_indefinite_block_runs_to_newline():
+    data = struct.pack("<3f", 1.0, 2.0, 4.0)
+    payload = b"#0" + data + b"\n"
+    assert binary_block_bounds(payload) == (2, len(data))
+    assert parse_binary_block(payload).tolist() == [1.0, 2.0, 4.0]
+
+
+def test_binary_block_overflow_sentinel_becomes_nan():
+    values = parse_binary_block(_definite_block([1.0, 9.9e37]))
+    assert values[0] == 1.0 and math.isnan(values[1])
+
+
+def test_binary_block_is_zero_copy_view():
+    payload = _definite_block([1.0, 2.0, 3.0, 4.0])
+    values = parse_binary_block(payload)
+    assert np.shares_memory(values, np.frombuffer(payload, dtype=np.uint8))
+
+
+def test_binary_block_integer_dtype_is_not_masked():
+    payload = _definite_block([7, -3], fmt="<i")
+    assert parse_binary_block(payload, dtype="<i4").tolist() == [7, -3]
+
+
+@pytest.mark.parametrize(
+    "payload, message",
+    [
+        (b"1234", "start with '#'"),
+        (b"#A12", "digit count"),
+        (b"#41", "truncated"),
+        (b"#18abcd", "declares 8 bytes"),
+    ],
+)
+def test_malformed_blocks(payload, message):
+    with pytest.raises(ValueError, match=message):
+        binary_block_bounds(payload)
+
+
+def test_block_length_must_match_item_size():
+    with pytest.raises(ValueError, match="multiple of 4"):
+        parse_binary_block(b"#13abc\n")
+
+
+def test_burst_reply_uses_vectorized_parser():
+    request = PollRequest(0, MeasurementFunction.VOLTAGE, "FETCh?", "V", burst_samples=3)
+    readings = _make_burst_readings(
+        Timebase.now(), InstrumentType.MP730889, "IDN", request, ASCII_WITH_OVERLOAD, 0.0, 0.0
+    )
+    assert [reading.value for reading in readings] == [pytest.approx(2.5e-3), None, None, pytest.approx(2.4e-3)]
+    assert readings[1].raw_response == "+9.90000000E+37"
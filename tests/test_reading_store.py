@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import numpy as np
+
+from dmm_app.columnar import MirroredColumns, numeric_reply
+from dmm_app.columnar_log import ColumnarLogger, read_columnar_readings
+from dmm_app.models import InstrumentType, MeasurementFunction, Reading
+from dmm_app.reading_store import ReadingStore
+
+
+def _reading(index, value=None, raw_response=None, slot=0):
+    value = 1.0 + index * 0.001 if value is None and raw_response is None else value
+    return Reading(
+        timestamp=datetime(2026, 10, 17, 12, 0, 0, index * 1000),
+        slot_index=slot,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103,0,1.0",
+        function=MeasurementFunction.VOLTAGE,
+        raw_response=raw_response if raw_response is not None else f"{value:.12g}",
+        value=value,
+        unit="V",
+    )
+
+
+def test_round_trip_rebuilds_readings():
+    store = ReadingStore(max_rows=16)
+    original = [_reading(0), _reading(1, raw_response="#GAP lost"), _reading(2, value=0.1234567890123456)]
+    store.extend(original)
+    rebuilt = list(store.readings())
+    assert rebuilt[:2] == original[:2]
+    # Numeric replies are rebuilt from the value with the same precision as the .npylog reader.
+    assert rebuilt[2].raw_response == "0.123456789012"
+    assert rebuilt[2].value == 0.1234567890123456
+
+
+def test_store_and_log_rebuild_the_same_readings(tmp_path):
+    value = 0.1234567890123456
+    readings = [_reading(0, value=value, raw_response=numeric_reply(value)), _reading(1, raw_response="ERR timeout")]
+    path = str(tmp_path / "run.npylog")
+    logger = ColumnarLogger(path)
+    logger.write_readings(readings)
+    logger.close()
+    store = ReadingStore()
+    store.extend(readings)
+    assert list(store.readings()) == list(read_columnar_readings(path))
+
+
+def test_grows_by_doubling_then_wraps():
+    store = ReadingStore(max_rows=10, initial_rows=4)
+    assert store.capacity == 4
+    store.extend(_reading(index) for index in range(5))
+    assert store.capacity == 8
+    store.extend(_reading(index) for index in range(5, 13))
+    assert store.capacity == 10
+    assert len(store) == 10
+    view = store.view()
+    assert view.value.tolist() == [1.0 + index * 0.001 for index in range(3, 13)]
+    assert [reading.timestamp.microsecond for reading in store.readings(0, 2)] == [3000, 4000]
+
+
+def test_view_is_zero_copy_and_slot_series_selects_one_slot():
+    store = ReadingStore(max_rows=8, initial_rows=8)
+    store.extend(_reading(index, slot=index % 2) for index in range(6))
+    view = store.view(1, 4)
+    assert len(view) == 3
+    assert np.shares_memory(view.value, store.view().value)
+    assert view.labels("unit") == ["V", "V", "V"]
+    times, values = store.slot_series(1)
+    assert values.tolist() == [1.001, 1.003, 1.005]
+    assert times[0] == _reading(1).timestamp.timestamp()
+
+
+def test_mirrored_columns_resize_keeps_newest_rows():
+    columns = MirroredColumns({"a": "int64", "b": "float64"}, 4)
+    for index in range(6):
+        columns.append((index, index / 2))
+    assert columns.window()["a"].tolist() == [2, 3, 4, 5]
+    columns.resize(3)
+    assert columns.window()["a"].tolist() == [3, 4, 5]
+    columns.append((6, 3.0))
+    assert columns.window()["a"].tolist() == [4, 5, 6]
+    assert columns.window(-1)["b"].tolist() == [3.0]
+    columns.resize(8)
+    columns.append((7, 3.5))
+    assert columns.window()["a"].tolist() == [4, 5, 6, 7]
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+
+from dmm_app.alarms import AlarmEngine, LimitRule
+from dmm_app.models import ALARM_RESPONSE_PREFIX, InstrumentType, MeasurementFunction, Reading
+from dmm_app.steps import Query, Write, run_steps, run_steps_async
+
+
+class _Client:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.written = []
+
+    def write(self, command):
+        if self.fail:
+            raise ConnectionError("port gone")
+        self.written.append(command)
+
+
+class _AsyncClient(_Client):
+    async def write(self, command):
+        super().write(command)
+
+
+def _reading(value, second=0):
+    return Reading(
+        timestamp=datetime(2026, 10, 17, 12, 0, second),
+        slot_index=0,
+        instrument=InstrumentType.OWON_SPE6103,
+        device_idn="OWON,SPE6103,0,1.0",
+        function=MeasurementFunction.CURRENT,
+        raw_response=f"{value}",
+        value=value,
+        unit="A",
+    )
+
+
+def _engine():
+    rule = LimitRule(name="overcurrent", function=MeasurementFunction.CURRENT, high=1.5, safe_state=True)
+    return AlarmEngine([rule], safe_state_commands=("OUTPut OFF",))
+
+
+def test_drivers_send_results_and_throw_errors_back():
+    def steps():
+        reply = yield Query("A?")
+        try:
+            yield Write("FAIL")
+        except ConnectionError as exc:
+            return reply, str(exc)
+
+    def execute(step):
+        if isinstance(step, Write):
+            raise ConnectionError("lost")
+        return "A-reply"
+
+    async def execute_async(step):
+        return execute(step)
+
+    assert run_steps(steps(), execute) == ("A-reply", "lost")
+    assert asyncio.run(run_steps_async(steps(), execute_async)) == ("A-reply", "lost")
+
+
+def test_alarm_evaluation_is_the_same_threaded_and_async():
+    threaded, threaded_client = _engine(), _Client()
+    awaited, async_client = _engine(), _AsyncClient()
+    for second, value in enumerate([1.0, 2.0, 2.5, 1.0]):
+        reading = _reading(value, second)
+        markers = threaded.evaluate(reading, 0.0, threaded_client)
+        async_markers = asyncio.run(awaited.evaluate_async(reading, 0.0, async_client))
+        assert [marker.raw_response.split("(")[0] for marker in markers] == [
+            marker.raw_response.split("(")[0] for marker in async_markers
+        ]
+    assert threaded_client.written == async_client.written == ["OUTPut OFF"]
+
+
+def test_failed_safe_state_write_does_not_latch():
+    engine, client = _engine(), _Client(fail=True)
+    (marker,) = engine.evaluate(_reading(2.0), 0.0, client)
+    assert marker.raw_response.startswith(ALARM_RESPONSE_PREFIX)
+    assert "port gone" in marker.raw_response
+    assert engine.tripped() == []
+    client.fail = False
+    engine.evaluate(_reading(2.0, 1), 0.0, client)
+    assert client.written == ["OUTPut OFF"]
+    assert engine.tripped() == [("overcurrent", 0)]
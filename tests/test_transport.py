@@ -0,0 +1,277 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from dmm_app.commands import INSTRUMENT_PROFILES
+from dmm_app.models import InstrumentType, SerialSettings, SocketSettings
+from dmm_app.recovery import SessionRecovery
+from dmm_app.scpi import AsyncSCPIClient, SCPIClient
+from dmm_app.simulator import PtyLoopback, SimulatedInstrument, SimulatorSettings
+from dmm_app.transport import AsyncSerialTransport, SerialTransport, SocketConnectionPool, SocketTransport
+
+
+class _FakeInstrument:
+    # Loopback SCPI server. `reply` maps one received command line to the chunks sent back; each chunk goes out
+    # in its own send() after a short pause, so the client sees it in a separate recv(). A number in the list
+    # is an extra pause in seconds; None closes the connection.
+    def __init__(self, reply):
+        self._reply = reply
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        # close() does not wake a blocked accept() on Linux; poll for the stop flag instead.
+        self._listener.settimeout(0.05)
+        self._stopped = threading.Event()
+        self.connections = 0
+        self.received: list[str] = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def settings(self) -> SocketSettings:
+        return SocketSettings(host="127.0.0.1", port=self._listener.getsockname()[1], timeout_seconds=0.3)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=2.0)
+        self._listener.close()
+
+    def _serve(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                connection, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            connection.settimeout(None)
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection: socket.socket) -> None:
+        pending = b""
+        with connection:
+            while not self._stopped.is_set():
+                try:
+                    data = connection.recv(4096)
+                except OSError:
+                    return
+                if not data:
+                    return
+                pending += data
+                while b"\n" in pending:
+                    line, pending = pending.split(b"\n", 1)
+                    command = line.decode()
+                    self.received.append(command)
+                    for chunk in self._reply(command):
+                        if chunk is None:
+                            return
+                        if isinstance(chunk, float):
+                            time.sleep(chunk)
+                            continue
+                        time.sleep(0.02)
+                        try:
+                            connection.sendall(chunk)
+                        except OSError:
+                            return
+
+
+@pytest.fixture
+def instrument(request):
+    server = _FakeInstrument(request.param)
+    yield server
+    server.close()
+
+
+def _split_reply(command: str) -> list[bytes]:
+    if command == "MEAS:VOLT?":
+        return [b"+1.23", b"4567", b"E+00\n"]
+    if command == "TWO?":
+        return [b"1\n2\n"]
+    return []
+
+
+def _echo_reply(command: str) -> list[bytes]:
+    # Only queries are answered, like an instrument.
+    if not command.endswith("?"):
+        return []
+    return [f"{command.rstrip('?')}-reply\n".encode()]
+
+
+def _stalling_reply(command: str) -> list[bytes | float]:
+    # The reply stalls mid-frame past the client timeout (0.3 s), then finishes late on the same connection.
+    if command == "SLOW?":
+        return [b"+9.87", 0.5, b"65E+00\n"]
+    if command == "FETC?":
+        return [0.5, b"1,2,3\n"]
+    return _echo_reply(command)
+
+
+def _power_supply_reply(command: str) -> list[bytes | float | None]:
+    if command == "*IDN?":
+        return [b"OWON,SPE6103,0,1.0\n"]
+    if command == "HANGUP?":
+        return [None]
+    return _echo_reply(command)
+
+
+@pytest.mark.parametrize("instrument", [_split_reply], indirect=True)
+def test_frame_split_across_recv_calls(instrument):
+    transport = SocketTransport(instrument.settings)
+    transport.open()
+    try:
+        transport.write(b"MEAS:VOLT?\n")
+        assert transport.read_until(b"\n") == b"+1.234567E+00\n"
+        assert transport.first_byte_at is not None
+    finally:
+        transport.close()
+
+
+@pytest.mark.parametrize("instrument", [_split_reply], indirect=True)
+def test_two_frames_in_one_recv_are_returned_separately(instrument):
+    transport = SocketTransport(instrument.settings)
+    transport.open()
+    try:
+        transport.write(b"TWO?\n")
+        assert transport.read_until(b"\n") == b"1\n"
+        assert transport.read_until(b"\n") == b"2\n"
+    finally:
+        transport.close()
+
+
+@pytest.mark.parametrize("instrument", [_echo_reply], indirect=True)
+def test_pipelined_queries_keep_reply_order(instrument):
+    transport = SocketTransport(instrument.settings)
+    transport.open()
+    try:
+        client = SCPIClient(transport)
+        commands = ["MEAS:VOLT?", "MEAS:CURR?", "MEAS:POW?"]
+        assert client.query_many(commands, compound=False) == ["MEAS:VOLT-reply", "MEAS:CURR-reply", "MEAS:POW-reply"]
+        assert instrument.received == commands
+    finally:
+        transport.close()
+
+
+@pytest.mark.parametrize("instrument", [_stalling_reply], indirect=True)
+def test_timeout_discards_partial_frame_and_late_tail(instrument):
+    transport = SocketTransport(instrument.settings)
+    transport.open()
+    try:
+        client = SCPIClient(transport)
+        with pytest.raises(TimeoutError):
+            client.query("SLOW?")
+        # Let the late tail arrive; it must not be read as the next reply.
+        time.sleep(0.4)
+        assert transport.is_open
+        assert client.query("MEAS:VOLT?") == "MEAS:VOLT-reply"
+        assert instrument.connections == 2
+    finally:
+        transport.close()
+
+
+@pytest.mark.parametrize("instrument", [_echo_reply], indirect=True)
+def test_pool_shares_one_connection_until_last_release(instrument):
+    pool = SocketConnectionPool()
+    first = pool.acquire(instrument.settings)
+    second = pool.acquire(instrument.settings)
+    try:
+        assert first is second
+        assert SCPIClient(first).query("A?") == "A-reply"
+        assert SCPIClient(second).query("B?") == "B-reply"
+        assert instrument.connections == 1
+        pool.release(first)
+        assert second.is_open
+        assert SCPIClient(second).query("C?") == "C-reply"
+    finally:
+        pool.release(second)
+    assert not second.is_open
+    third = pool.acquire(instrument.settings)
+    try:
+        assert third is not first
+        assert SCPIClient(third).query("D?") == "D-reply"
+        assert instrument.connections == 2
+    finally:
+        pool.close_all()
+    assert not third.is_open
+
+
+@pytest.mark.parametrize("instrument", [_power_supply_reply], indirect=True)
+def test_recovery_keeps_pooled_socket_shared(instrument):
+    pool = SocketConnectionPool()
+    transport = pool.acquire(instrument.settings)
+    pool.acquire(instrument.settings)
+    recovering, other = SCPIClient(transport), SCPIClient(transport)
+    recovery = SessionRecovery(recovering, INSTRUMENT_PROFILES[InstrumentType.OWON_SPE6103], ["SYST:REM"])
+    try:
+        # A connection that is still up is reused, not torn down under the other session.
+        assert recovery.recover("glitch", threading.Event())
+        assert other.query("A?") == "A-reply"
+        assert instrument.connections == 1
+
+        with pytest.raises(ConnectionError):
+            recovering.query("HANGUP?")
+        assert recovery.recover("lost", threading.Event())
+        assert other.query("B?") == "B-reply"
+        assert instrument.connections == 2
+        assert transport.is_open
+    finally:
+        pool.close_all()
+
+
+@pytest.mark.parametrize("instrument", [_stalling_reply], indirect=True)
+def test_query_timeout_override_waits_longer_once(instrument):
+    transport = SocketTransport(instrument.settings)
+    transport.open()
+    try:
+        client = SCPIClient(transport)
+        assert client.query("FETC?", timeout_seconds=2.0) == "1,2,3"
+        with pytest.raises(TimeoutError):
+            client.query("FETC?")
+    finally:
+        transport.close()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a pty")
+def test_serial_query_timeout_override():
+    loopback = PtyLoopback(SimulatedInstrument(SimulatorSettings(InstrumentType.OWON_SPE6103, latency_seconds=0.4)))
+    port = loopback.start()
+    transport = SerialTransport(SerialSettings(port=port, baudrate=115200, timeout_seconds=0.2))
+    transport.open()
+    try:
+        client = SCPIClient(transport)
+        assert client.query("*IDN?", timeout_seconds=2.0).startswith("OWON")
+        # Without the override the configured 0.2 s applies and the serial read times out empty.
+        assert client.query("*IDN?") == ""
+    finally:
+        transport.close()
+        loopback.stop()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs a pty")
+def test_async_timeout_discards_partial_frame():
+    import tty
+
+    master_fd, slave_fd = os.openpty()
+    tty.setraw(slave_fd)
+    transport = AsyncSerialTransport(SerialSettings(port=os.ttyname(slave_fd), baudrate=115200))
+
+    async def exchange() -> str:
+        await transport.open()
+        try:
+            client = AsyncSCPIClient(transport, timeout_seconds=0.2)
+            # The reply stalls mid-frame; the fragment must not become the start of the next reply.
+            os.write(master_fd, b"+9.87")
+            with pytest.raises(asyncio.TimeoutError):
+                await client.query("SLOW?")
+            os.write(master_fd, b"B-reply\n")
+            return await client.query("B?")
+        finally:
+            await transport.close()
+
+    try:
+        assert asyncio.run(exchange()) == "B-reply"
+    finally:
+        os.close(master_fd)
+        os.close(slave_fd)
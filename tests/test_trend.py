@@ -0,0 +1,42 @@
+import numpy as np
+
+from dmm_app.trend import MinMaxDecimator, TrendBuffer
+
+
+def test_grows_on_demand_up_to_capacity():
+    buffer = TrendBuffer(capacity=10, initial_points=4)
+    idle_bytes = buffer.nbytes
+    for index in range(6):
+        buffer.append(float(index), index * 2.0)
+    assert buffer.capacity == 10
+    assert buffer.nbytes == 2 * idle_bytes
+    for index in range(6, 13):
+        buffer.append(float(index), index * 2.0)
+    assert len(buffer) == 10
+    times, values = buffer.arrays()
+    assert times.tolist() == [float(index) for index in range(3, 13)]
+    assert values[-1] == 24.0
+
+
+def test_default_buffer_starts_small():
+    assert TrendBuffer().nbytes < TrendBuffer(capacity=1 << 20, initial_points=1 << 20).nbytes // 100
+
+
+def test_time_going_backwards_restarts_the_trace_and_the_decimator():
+    buffer = TrendBuffer()
+    decimator = MinMaxDecimator()
+    for second in range(100, 110):
+        buffer.append(float(second), 5.0)
+    trace = decimator.decimate(buffer, 100.0, 10.0, 10)
+    assert np.nanmax(trace.maximums) == 5.0
+
+    generation = buffer.generation
+    # A replayed log (or a clock stepped back) starts earlier than what is already plotted.
+    for second in range(50, 60):
+        buffer.append(float(second), 1.0)
+    assert buffer.generation == generation + 1
+    assert buffer.time_span() == (50.0, 59.0)
+    trace = decimator.decimate(buffer, 50.0, 10.0, 10)
+    assert trace.minimums.tolist() == [1.0] * 10
+    trace = decimator.decimate(buffer, 100.0, 10.0, 10)
+    assert np.isnan(trace.maximums).all()